@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索后端
+定义 SearchBackend 接口，提供 scholarly 实现和基于本地录制结果页的回放实现
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+try:
+    from typing import Protocol
+except ImportError:  # Python < 3.8
+    Protocol = object
+
+
+# Google Scholar 每个结果页固定返回 10 条
+PAGE_SIZE = 10
+
+
+class ResultPage:
+    """一个搜索结果页"""
+
+    def __init__(self, pubs: List[Dict], start_index: int = 0,
+                 total_results: Optional[int] = None, has_next: Optional[bool] = None):
+        """
+        Args:
+            pubs: 该页的论文对象（scholarly 格式的字典）
+            start_index: 该页第一条结果的位置
+            total_results: 搜索结果总数（Google Scholar 显示的估计值）
+            has_next: 是否还有下一页（默认按是否满页判断）
+        """
+        self.pubs = list(pubs)
+        self.start_index = start_index
+        self.total_results = total_results
+        self.has_next = len(self.pubs) >= PAGE_SIZE if has_next is None else has_next
+
+    def __len__(self):
+        return len(self.pubs)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.pubs)
+
+    def to_dict(self) -> Dict:
+        return {
+            'start_index': self.start_index,
+            'total_results': self.total_results,
+            'has_next': self.has_next,
+            'pubs': self.pubs,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ResultPage':
+        return cls(data.get('pubs', []), data.get('start_index', 0),
+                   data.get('total_results'), data.get('has_next'))
+
+
+class SearchBackend(Protocol):
+    """
+    搜索后端接口
+
+    所有方法都是阻塞调用，爬取引擎会在线程池中执行它们。
+    """
+
+    name: str
+
+    def search(self, query: str, start_index: int = 0, year_low: Optional[int] = None,
+               year_high: Optional[int] = None) -> ResultPage:
+        """获取一个搜索结果页"""
+        ...
+
+    def fill(self, pub: Dict) -> Dict:
+        """补全单篇论文的详细信息（完整摘要、出版商等）"""
+        ...
+
+    def cited_by(self, pub: Dict, start_index: int = 0) -> ResultPage:
+        """获取引用该论文的文献（一个结果页）"""
+        ...
+
+
+class ScholarlyBackend:
+    """基于 scholarly（直接访问 Google Scholar）的后端"""
+
+    name = 'scholarly'
+
+    def __init__(self):
+        from scholarly import scholarly
+        self._scholarly = scholarly
+
+    def search(self, query: str, start_index: int = 0, year_low: Optional[int] = None,
+               year_high: Optional[int] = None) -> ResultPage:
+        search_query = self._scholarly.search_pubs(
+            query, start_index=start_index, year_low=year_low, year_high=year_high)
+        # 只取当前页，避免迭代器自动翻页
+        pubs = list(islice(search_query, PAGE_SIZE))
+        return ResultPage(pubs, start_index, search_query.total_results)
+
+    def fill(self, pub: Dict) -> Dict:
+        return self._scholarly.fill(pub)
+
+    def cited_by(self, pub: Dict, start_index: int = 0) -> ResultPage:
+        cites_id = pub.get('cites_id')
+        if not cites_id:
+            return ResultPage([], start_index, 0, has_next=False)
+        search_query = self._scholarly.search_citedby(','.join(cites_id), start_index=start_index)
+        pubs = list(islice(search_query, PAGE_SIZE))
+        return ResultPage(pubs, start_index, search_query.total_results)
+
+
+def page_key(kind: str, query: str, start_index: int = 0,
+             year_low: Optional[int] = None, year_high: Optional[int] = None) -> str:
+    """结果页在录制目录中的文件名（不含扩展名）"""
+    raw = json.dumps([kind, query, year_low, year_high], ensure_ascii=False)
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+    return f"{kind}_{digest}_{start_index}"
+
+
+def pub_key(pub: Dict) -> str:
+    """论文在录制目录中的标识"""
+    cites_id = pub.get('cites_id')
+    if cites_id:
+        return ','.join(cites_id)
+    return pub.get('bib', {}).get('title', '')
+
+
+class ReplayBackend:
+    """
+    回放后端
+
+    从磁盘读取录制好的结果页，按配置的延迟模拟网络耗时，用于离线测试和性能测量。
+    录制目录由 RecordingBackend 生成。
+    """
+
+    name = 'replay'
+
+    def __init__(self, fixtures_dir: str, latency: float = 0.0, jitter: float = 0.0,
+                 strict: bool = False):
+        """
+        Args:
+            fixtures_dir: 录制目录
+            latency: 每个请求的固定延迟（秒）
+            jitter: 额外的随机延迟上限（秒）
+            strict: 找不到录制页时是否报错（否则视为没有更多结果）
+        """
+        if not os.path.isdir(fixtures_dir):
+            raise FileNotFoundError(f"录制目录不存在: {fixtures_dir}")
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.strict = strict
+        self.requests = 0
+
+    def _wait(self):
+        self.requests += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _load(self, name: str):
+        path = os.path.join(self.fixtures_dir, name + '.json')
+        if not os.path.exists(path):
+            if self.strict:
+                raise KeyError(f"没有录制的结果页: {name}")
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def search(self, query: str, start_index: int = 0, year_low: Optional[int] = None,
+               year_high: Optional[int] = None) -> ResultPage:
+        self._wait()
+        data = self._load(page_key('search', query, start_index, year_low, year_high))
+        if data is None:
+            return ResultPage([], start_index, has_next=False)
+        return ResultPage.from_dict(data)
+
+    def fill(self, pub: Dict) -> Dict:
+        self._wait()
+        data = self._load(page_key('fill', pub_key(pub)))
+        return data if data is not None else pub
+
+    def cited_by(self, pub: Dict, start_index: int = 0) -> ResultPage:
+        self._wait()
+        data = self._load(page_key('citedby', pub_key(pub), start_index))
+        if data is None:
+            return ResultPage([], start_index, has_next=False)
+        return ResultPage.from_dict(data)
+
+
+class RecordingBackend:
+    """
+    录制后端
+
+    包装另一个后端，把每个结果页和补全结果写入录制目录，供 ReplayBackend 回放。
+    """
+
+    def __init__(self, inner: SearchBackend, fixtures_dir: str):
+        self.inner = inner
+        self.name = f"recording({inner.name})"
+        self.fixtures_dir = fixtures_dir
+        os.makedirs(fixtures_dir, exist_ok=True)
+
+    def _save(self, name: str, data: Dict):
+        path = os.path.join(self.fixtures_dir, name + '.json')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    def search(self, query: str, start_index: int = 0, year_low: Optional[int] = None,
+               year_high: Optional[int] = None) -> ResultPage:
+        page = self.inner.search(query, start_index, year_low, year_high)
+        self._save(page_key('search', query, start_index, year_low, year_high), page.to_dict())
+        return page
+
+    def fill(self, pub: Dict) -> Dict:
+        key = page_key('fill', pub_key(pub))
+        filled = self.inner.fill(pub)
+        self._save(key, filled)
+        return filled
+
+    def cited_by(self, pub: Dict, start_index: int = 0) -> ResultPage:
+        page = self.inner.cited_by(pub, start_index)
+        self._save(page_key('citedby', pub_key(pub), start_index), page.to_dict())
+        return page
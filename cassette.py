@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+请求录制与回放（cassette）
+录制爬虫发出的每个 HTTP 请求的原始响应，之后逐字节回放，实现无网络的确定性重跑
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+
+
+class CassetteMiss(KeyError):
+    """回放时找不到对应请求的录制"""
+
+    def __str__(self):
+        return f"回放记录中没有该请求: {self.args[0]}"
+
+
+class Cassette:
+    """
+    原始响应录制目录
+
+    目录结构:
+        index.jsonl        每行一条 {"url", "file", "bytes", "time"}，追加写入
+        responses/<sha1>   响应正文（UTF-8 原始字节）
+    """
+
+    INDEX_FILE = 'index.jsonl'
+    RESPONSES_DIR = 'responses'
+
+    def __init__(self, directory: str, mode: str = 'replay'):
+        """
+        Args:
+            directory: 录制目录
+            mode: 'record'（录制）或 'replay'（回放）
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError("mode 必须是 'record' 或 'replay'")
+        self.directory = directory
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._index: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        if mode == 'record':
+            os.makedirs(os.path.join(directory, self.RESPONSES_DIR), exist_ok=True)
+        elif not os.path.isdir(directory):
+            raise FileNotFoundError(f"录制目录不存在: {directory}")
+        self._load_index()
+
+    @staticmethod
+    def _file_name(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _load_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 录制中断时最后一行可能不完整
+                    continue
+                # 同一 URL 多次录制时以最后一次为准
+                self._index[entry['url']] = entry['file']
+
+    def __len__(self):
+        return len(self._index)
+
+    def record(self, url: str, text: str):
+        """保存一个响应"""
+        data = text.encode('utf-8')
+        name = self._file_name(url)
+        path = os.path.join(self.directory, self.RESPONSES_DIR, name)
+        with self._lock:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with open(os.path.join(self.directory, self.INDEX_FILE), 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'url': url, 'file': name, 'bytes': len(data),
+                                    'time': time.time()}, ensure_ascii=False) + '\n')
+            self._index[url] = name
+            self.recorded += 1
+
+    def play(self, url: str) -> str:
+        """
+        读取录制的响应
+
+        Raises:
+            CassetteMiss: 没有录制该请求
+        """
+        name = self._index.get(url)
+        if name is None:
+            with self._lock:
+                self.misses += 1
+            raise CassetteMiss(url)
+        with open(os.path.join(self.directory, self.RESPONSES_DIR, name), 'rb') as f:
+            data = f.read()
+        with self._lock:
+            self.hits += 1
+        return data.decode('utf-8')
+
+    def summary(self) -> str:
+        if self.mode == 'record':
+            return f"录制 {self.recorded} 个响应到 {self.directory}"
+        return f"回放 {self.hits} 个响应（未命中 {self.misses} 个）: {self.directory}"
+
+
+_active: Optional[Cassette] = None
+
+
+def get_active() -> Optional[Cassette]:
+    """当前生效的录制/回放（未启用时为 None）"""
+    return _active
+
+
+def activate(cassette: Optional[Cassette]):
+    """
+    启用录制或回放（None 表示关闭）
+
+    对所有经过 scholarly 页面请求的流量生效，包括代理通道。
+    """
+    global _active
+    import transport
+    transport.install()
+    _active = cassette
@@ -14,12 +14,55 @@ DEFAULT_MAX_RESULTS = 50
 # 默认最小引用量
 DEFAULT_MIN_CITATIONS = 0
 
-# 请求之间的延迟（秒）
+# 请求之间的延迟（秒）：同一出口（直连或单个代理）的平均请求间隔
 REQUEST_DELAY = 2
 
+# 令牌桶限速：每 RATE_LIMIT_WINDOW 秒最多 RATE_LIMIT_REQUESTS 个请求
+# RATE_LIMIT_REQUESTS 为 None 时按 REQUEST_DELAY 推导（窗口 / 延迟）
+RATE_LIMIT_REQUESTS = None
+RATE_LIMIT_WINDOW = 60
+
+# 每个出口允许的突发请求数
+RATE_LIMIT_BURST = 3
+
+# AIMD 自适应限速：成功时每次提速 AIMD_INCREASE（次/秒），被拦截时速率乘以 AIMD_DECREASE
+AIMD_INCREASE = 0.02
+AIMD_DECREASE = 0.5
+AIMD_MIN_RATE = 1 / 60   # 最低每分钟 1 个请求
+AIMD_MAX_RATE = None     # 最高速率（次/秒），None 表示按 REQUEST_DELAY 推导（1 / 延迟）
+
+# 单个结果页被拦截（验证码 / 429）后的最大重试次数
+BLOCK_MAX_RETRIES = 3
+
+# 补全详情（完整摘要、出版商等）时同时进行的补全请求数
+FILL_WORKERS = 4
+
+# 单次搜索的请求预算（结果页与补全详情请求的总数）。None 表示按目标数量推算：
+# 凑够目标数量至少需要的请求数乘以 REQUEST_BUDGET_SLACK（与原来按 3 倍数量抓取相同），
+# 且不少于 REQUEST_BUDGET_MIN。有本地筛选条件时，按在线估计的筛选通过率预计无法在预算内
+# 凑够目标数量则提前停止
+REQUEST_BUDGET = None
+REQUEST_BUDGET_SLACK = 3.0
+REQUEST_BUDGET_MIN = 5
+
+# 按年份切分：单个查询可翻到的结果数上限（约 1000 条），超过时把年份范围对半切分；
+# 没有起始年份时，SLICE_FIRST_YEAR 及以前的文献合并为一个切片
+SLICE_RESULT_CAP = 1000
+SLICE_FIRST_YEAR = 1990
+
+# 查询规划：Google Scholar 查询长度上限；超出时在“拆分成多个查询”和“本地筛选会议/期刊”
+# 之间按预计页数选择（VENUE_SELECTIVITY 为会议/期刊条件通过率的先验估计，
+# SPLIT_OVERLAP 为拆分后各查询结果的重复比例）
+MAX_QUERY_LENGTH = 256
+VENUE_SELECTIVITY = 0.2
+SPLIT_OVERLAP = 0.1
+
 # 是否默认使用代理
 USE_PROXY_BY_DEFAULT = False
 
+# 同时进行中的结果页请求数上限（异步抓取引擎）
+MAX_CONCURRENCY = 3
+
 
 # ==================== 输出配置 ====================
 
@@ -29,6 +72,53 @@ OUTPUT_DIR = "results"
 # CSV文件编码
 CSV_ENCODING = "utf-8-sig"  # 使用 utf-8-sig 以便 Excel 正确识别中文
 
+# 结果在内存中占用的上限（MB，--max-memory）。超出时文献写入临时分段，
+# 排序（外部归并排序）和导出直接在分段上进行；None 表示不限制
+MAX_MEMORY_MB = None
+
+# 临时分段的上级目录（None 表示系统临时目录）
+SPILL_DIR = None
+
+# 运行记录目录（用于 --resume 继续中断的运行）
+JOURNAL_DIR = "runs"
+
+# 抓取任务队列数据库（job_queue.py，多个 worker 共享）
+JOB_QUEUE_PATH = "runs/jobs.sqlite3"
+
+# 任务租约时长（秒），worker 每隔三分之一租约时长续约一次
+JOB_LEASE_SECONDS = 300
+
+# 单个任务最多尝试次数
+JOB_MAX_ATTEMPTS = 3
+
+# 结果页缓存（重复运行相同检索时直接读取，不再访问 Google Scholar）
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_PATH = "cache/pages.sqlite3"
+
+# 搜索结果页有效期（秒），引用量会随时间变化
+PAGE_CACHE_TTL = 7 * 24 * 3600
+
+# 补全结果（摘要、出版商）有效期（秒）
+PAGE_CACHE_FILL_TTL = 30 * 24 * 3600
+
+# 缓存总大小上限（MB），超出时淘汰最久未使用的条目
+PAGE_CACHE_MAX_MB = 200
+
+# 失败记录（负缓存）：失败或被限制访问的查询 / 代理在冷却期内不再请求
+NEGATIVE_CACHE_ENABLED = True
+NEGATIVE_CACHE_PATH = "cache/failures.sqlite3"
+
+# 第一次失败后的冷却时间（秒），连续失败时翻倍，不超过 NEGATIVE_CACHE_MAX
+NEGATIVE_CACHE_BASE = 300
+NEGATIVE_CACHE_MAX = 6 * 3600
+
+# 原始页面存储：按内容哈希压缩保存抓取到的 HTML，用于审计和重新解析（python raw_store.py reparse）
+RAW_STORE_ENABLED = True
+RAW_STORE_DIR = "raw_pages"
+
+# 压缩格式: "gzip"（较快）或 "lzma"（压缩率更高）
+RAW_STORE_CODEC = "gzip"
+
 
 # ==================== 预设关键字列表 ====================
 
@@ -112,6 +202,27 @@ CUSTOM_PROXY = {
     'https': None,  # 例如: 'http://127.0.0.1:7890'
 }
 
+# 额外的自定义代理列表（与 CUSTOM_PROXY 一起加入代理池）
+PROXY_LIST = []  # 例如: ['http://10.0.0.2:3128', 'http://10.0.0.3:3128']
+
+# 代理池：最多加载的免费代理数量
+FREE_PROXY_LIMIT = 20
+
+# 代理池：检测地址、超时（秒）、连续失败多少次后停用
+PROXY_CHECK_URL = "http://httpbin.org/ip"
+PROXY_TIMEOUT = 5.0
+PROXY_MAX_FAILURES = 3
+
+# 最多同时使用的代理通道数，以及每个通道同时进行的请求数
+PROXY_MAX_LANES = 8
+LANE_CONCURRENCY = 1
+
+# 代理预检：通过 PREFLIGHT_MIN_READY 个代理或超过 PREFLIGHT_DEADLINE 秒即开始搜索，
+# 其余代理在后台继续检测（PREFLIGHT_WORKERS 个线程并发）
+PREFLIGHT_MIN_READY = 2
+PREFLIGHT_DEADLINE = 10.0
+PREFLIGHT_WORKERS = 16
+
 
 # ==================== 高级检索配置 ====================
 
@@ -155,77 +266,107 @@ class AdvancedSearchConfig:
         """
         将配置转换为Google Scholar查询字符串
         
+        检索词经过规范化（小写、去重、排序），语义相同的配置得到相同的查询字符串。
+        
         Args:
             base_keyword: 基础关键字
             
         Returns:
             构建的查询字符串
         """
-        query_parts = [base_keyword]
-        
-        # 添加作者筛选
-        if self.authors:
-            author_queries = [f'author:"{author}"' for author in self.authors]
-            query_parts.append(f"({' OR '.join(author_queries)})")
-        
-        # 添加额外关键字
-        if self.additional_keywords:
-            if self.keyword_mode == "AND":
-                query_parts.extend(self.additional_keywords)
-            else:
-                query_parts.append(f"({' OR '.join(self.additional_keywords)})")
+        from query_planner import build_query
+        return build_query(base_keyword, self)
+    
+    def canonical_key(self, base_keyword):
+        """
+        关键字 + 配置的规范形式哈希（与列表顺序、重复项、大小写无关）
         
-        # 添加排除词
-        for exclude in self.exclude_keywords:
-            query_parts.append(f"-{exclude}")
+        Args:
+            base_keyword: 基础关键字
+            
+        Returns:
+            sha1 十六进制字符串
+        """
+        from query_planner import canonical_hash
+        return canonical_hash(base_keyword, self)
+    
+    def plan(self, base_keyword, max_results=50):
+        """
+        生成查询执行计划：能在服务器端执行的条件（年份、作者、会议/期刊、排除词）
+        下推到请求中，必要时拆分成多个查询
         
-        return " ".join(query_parts)
+        Args:
+            base_keyword: 基础关键字
+            max_results: 目标文献数量（用于估算抓取成本）
+            
+        Returns:
+            QueryPlan 对象（见 query_planner.py）
+        """
+        from query_planner import plan_query
+        return plan_query(base_keyword, self, max_results)
     
-    def matches_filters(self, paper_info):
+    def has_local_filters(self, skip=()):
+        """
+        是否有需要在本地检查的筛选条件（与 matches_filters 检查的字段相同）
+
+        Args:
+            skip: 已由服务器执行、本地跳过的字段
+
+        Returns:
+            matches_filters 是否可能筛掉文献
+        """
+        active = {
+            'year': bool(self.year_start or self.year_end),
+            'citations': bool(self.citations_min or self.citations_max),
+            'publisher': bool(self.publishers),
+            'venue': bool(self.venues),
+            'authors': bool(self.authors),
+        }
+        return any(on and field not in skip for field, on in active.items())
+
+    def matches_filters(self, paper_info, skip=()):
         """
         检查论文是否符合筛选条件
         
         Args:
-            paper_info: 论文信息字典
+            paper_info: 文献记录（Paper，或旧格式的字典）
+            skip: 跳过检查的字段（例如补全详情前暂不检查的 'publisher'）
             
         Returns:
             是否符合条件
         """
-        # 检查年份范围
-        if self.year_start or self.year_end:
-            year = paper_info.get('year', 'N/A')
-            if year != 'N/A':
-                try:
-                    year_int = int(year)
-                    if self.year_start and year_int < self.year_start:
-                        return False
-                    if self.year_end and year_int > self.year_end:
-                        return False
-                except (ValueError, TypeError):
-                    pass
+        from paper import as_paper
+        paper = as_paper(paper_info)
+        
+        # 检查年份范围（年份缺失的不筛掉）
+        if (self.year_start or self.year_end) and 'year' not in skip and paper.year is not None:
+            if self.year_start and paper.year < self.year_start:
+                return False
+            if self.year_end and paper.year > self.year_end:
+                return False
         
         # 检查引用量范围
-        citations = paper_info.get('citations', 0)
-        if self.citations_min and citations < self.citations_min:
-            return False
-        if self.citations_max and citations > self.citations_max:
-            return False
+        if 'citations' not in skip:
+            if self.citations_min and paper.citations < self.citations_min:
+                return False
+            if self.citations_max and paper.citations > self.citations_max:
+                return False
         
         # 检查发表机构
-        if self.publishers:
-            publisher = paper_info.get('publisher', '').lower()
+        if self.publishers and 'publisher' not in skip:
+            publisher = (paper.publisher or '').lower()
             if not any(pub.lower() in publisher for pub in self.publishers):
                 return False
         
         # 检查会议/期刊
-        if self.venues:
-            venue = paper_info.get('venue', '').lower()
+        if self.venues and 'venue' not in skip:
+            venue = (paper.venue or '').lower()
             if not any(v.lower() in venue for v in self.venues):
                 return False
         
         # 检查作者（在结果中二次筛选）
-        if self.authors:
-            authors_str = paper_info.get('authors', '').lower()
+        if self.authors and 'authors' not in skip:
+            authors_str = paper.authors_text.lower()
             if not any(author.lower() in authors_str for author in self.authors):
                 return False
         
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+失败记录（负缓存）
+记住失败或被限制访问的查询和代理，按指数退避计算冷却时间。
+冷却期内批量调度跳过或推迟这些查询、抓取通道不再使用这些代理，
+避免在已知会失败的请求上消耗访问次数
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+
+DEFAULT_FAILURE_PATH = "cache/failures.sqlite3"
+
+# 第一次失败后的冷却时间（秒），之后每次连续失败翻倍
+DEFAULT_BASE_COOLDOWN = 300
+
+# 冷却时间上限（秒）
+DEFAULT_MAX_COOLDOWN = 6 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS failures (
+    scope      TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    label      TEXT,
+    failures   INTEGER NOT NULL,
+    last_error TEXT,
+    until      REAL NOT NULL,
+    updated    REAL NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+"""
+
+# 记录范围
+QUERY = 'query'
+PROXY = 'proxy'
+
+
+def format_duration(seconds: float) -> str:
+    """把秒数显示为 “N 秒” / “N 分钟” / “N 小时 M 分钟” 形式"""
+    if seconds < 60:
+        return f"{max(1, int(round(seconds)))} 秒"
+    minutes = int(round(seconds / 60))
+    if minutes < 60:
+        return f"{minutes} 分钟"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} 小时 {minutes} 分钟" if minutes else f"{hours} 小时"
+
+
+class FailureCache:
+    """
+    SQLite 失败记录
+
+    同一查询 / 代理连续失败 n 次后冷却 base * 2^(n-1) 秒（不超过上限），成功一次即清除记录。
+    多个进程可以共享同一个文件。
+    """
+
+    def __init__(self, path: Optional[str] = None, base_cooldown: Optional[float] = None,
+                 max_cooldown: Optional[float] = None, settings=None):
+        """
+        Args:
+            path: 数据库文件（默认 config.NEGATIVE_CACHE_PATH）
+            base_cooldown: 第一次失败后的冷却时间（秒，默认 config.NEGATIVE_CACHE_BASE）
+            max_cooldown: 冷却时间上限（秒，默认 config.NEGATIVE_CACHE_MAX）
+            settings: 配置模块（默认 config）
+        """
+        if settings is None:
+            import config as settings
+        self.path = path or getattr(settings, 'NEGATIVE_CACHE_PATH', DEFAULT_FAILURE_PATH)
+        self.base_cooldown = base_cooldown or getattr(
+            settings, 'NEGATIVE_CACHE_BASE', DEFAULT_BASE_COOLDOWN)
+        self.max_cooldown = max_cooldown or getattr(
+            settings, 'NEGATIVE_CACHE_MAX', DEFAULT_MAX_COOLDOWN)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # 有失败记录的键：成功时只有这些键需要写数据库
+        self._known = set(self._conn.execute("SELECT scope, key FROM failures").fetchall())
+
+    def cooldown_for(self, failures: int) -> float:
+        """连续失败 failures 次后的冷却时间（秒）"""
+        return min(self.max_cooldown, self.base_cooldown * 2 ** max(0, failures - 1))
+
+    def record_failure(self, scope: str, key: str, error: str = '',
+                       label: Optional[str] = None) -> float:
+        """
+        记录一次失败
+
+        Args:
+            scope: 记录范围（QUERY / PROXY）
+            key: 查询的规范哈希或代理地址
+            error: 错误说明
+            label: 显示名称（例如关键字）
+
+        Returns:
+            冷却时间（秒）
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT failures FROM failures WHERE scope = ? AND key = ?",
+                                     (scope, key)).fetchone()
+            failures = (row[0] if row else 0) + 1
+            cooldown = self.cooldown_for(failures)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO failures (scope, key, label, failures, last_error, "
+                "until, updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (scope, key, label or key, failures, error[:500], now + cooldown, now))
+            self._known.add((scope, key))
+        return cooldown
+
+    def record_success(self, scope: str, key: str):
+        """成功后清除失败记录"""
+        if (scope, key) not in self._known:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM failures WHERE scope = ? AND key = ?", (scope, key))
+            self._known.discard((scope, key))
+
+    def remaining(self, scope: str, key: str) -> float:
+        """剩余冷却时间（秒），不在冷却期时为 0"""
+        with self._lock:
+            row = self._conn.execute("SELECT until FROM failures WHERE scope = ? AND key = ?",
+                                     (scope, key)).fetchone()
+        return max(0.0, row[0] - time.time()) if row else 0.0
+
+    def get(self, scope: str, key: str) -> Optional[Dict]:
+        """失败记录（failures / last_error / until 等），没有记录时为 None"""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM failures WHERE scope = ? AND key = ?",
+                                        (scope, key))
+            row = cursor.fetchone()
+            columns = [c[0] for c in cursor.description]
+        return dict(zip(columns, row)) if row else None
+
+    def entries(self, scope: Optional[str] = None, active_only: bool = True) -> List[Dict]:
+        """失败记录列表（默认只返回仍在冷却期的记录），按冷却结束时间排列"""
+        query = "SELECT * FROM failures WHERE 1 = 1"
+        params: list = []
+        if scope is not None:
+            query += " AND scope = ?"
+            params.append(scope)
+        if active_only:
+            query += " AND until > ?"
+            params.append(time.time())
+        with self._lock:
+            cursor = self._conn.execute(query + " ORDER BY until", params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def clear(self, scope: Optional[str] = None) -> int:
+        """清除失败记录，返回清除的条数"""
+        with self._lock:
+            if scope is None:
+                removed = self._conn.execute("DELETE FROM failures").rowcount
+                self._known.clear()
+            else:
+                removed = self._conn.execute(
+                    "DELETE FROM failures WHERE scope = ?", (scope,)).rowcount
+                self._known = {k for k in self._known if k[0] != scope}
+        return removed
+
+    def compact(self) -> int:
+        """
+        删除冷却结束已超过冷却时间上限的记录（此后再失败按第一次失败计算），并重新打包数据库
+
+        Returns:
+            删除的条数
+        """
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM failures WHERE until <= ?",
+                (time.time() - self.max_cooldown,)).rowcount
+            self._conn.execute("VACUUM")
+            self._known = set(self._conn.execute("SELECT scope, key FROM failures").fetchall())
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+抓取预算
+在线估计本地筛选的通过率，预测凑够目标数量还需要多少请求，超出预算时提前停止；
+未指定预算时按目标数量推算
+"""
+
+import math
+
+
+# 未指定预算时：凑够目标数量至少需要的请求数乘以 DEFAULT_SLACK，且不少于 DEFAULT_MIN_LIMIT
+# （与原来按目标数量的 3 倍抓取的负载相同）
+DEFAULT_SLACK = 3.0
+DEFAULT_MIN_LIMIT = 5
+
+
+def default_limit(target: int, page_size: int = 10, fill_details: bool = False,
+                  fill_cost: int = 2, slack: float = DEFAULT_SLACK,
+                  minimum: int = DEFAULT_MIN_LIMIT) -> int:
+    """
+    按目标数量推算请求预算
+
+    Args:
+        target: 目标文献数量
+        page_size: 每个结果页的文献数
+        fill_details: 是否补全详情（每篇文献额外 fill_cost 个请求）
+        fill_cost: 补全一篇文献详情需要的请求数
+        slack: 为本地筛选掉的文献预留的倍数
+        minimum: 预算下限
+
+    Returns:
+        请求预算
+    """
+    needed = math.ceil(target / page_size)
+    if fill_details:
+        needed += target * fill_cost
+    return max(minimum, math.ceil(needed * slack))
+
+
+class FetchBudget:
+    """
+    一次搜索的请求预算
+
+    通过率用 Beta 分布估计（先验为均匀分布）。是否提前停止按乐观估计（均值加
+    z 倍标准差）判断：即使按乐观通过率也无法在预算内凑够目标数量时才停止，
+    避免样本较少时过早放弃。没有本地筛选时通过率恒为 1，不做预测，只在用完预算后停止。
+    """
+
+    def __init__(self, target: int, limit: int, page_size: int = 10,
+                 fill_cost: int = 2, z: float = 2.0, min_scanned: int = 10,
+                 filtering: bool = True):
+        """
+        Args:
+            target: 目标文献数量
+            limit: 请求预算（结果页和补全详情请求的总数）
+            page_size: 每个结果页的文献数
+            fill_cost: 补全一篇文献详情需要的请求数
+            z: 乐观估计使用的标准差倍数
+            min_scanned: 至少判定多少篇后才允许提前停止
+            filtering: 是否有本地筛选条件（没有时每篇文献都通过）
+        """
+        self.target = target
+        self.limit = limit
+        self.page_size = page_size
+        self.fill_cost = fill_cost
+        self.z = z
+        self.min_scanned = min_scanned
+        self.filtering = filtering
+        self.scanned = 0
+        self.filled = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def on_scanned(self):
+        """取出一篇待筛选的文献"""
+        self.scanned += 1
+
+    def on_filled(self):
+        """发起一次补全详情"""
+        self.filled += 1
+
+    def observe(self, accepted: bool):
+        """记录一篇文献的最终筛选结果"""
+        if accepted:
+            self.accepted += 1
+        else:
+            self.rejected += 1
+
+    @property
+    def acceptance(self) -> float:
+        """通过率估计（后验均值）"""
+        return (self.accepted + 1) / (self.accepted + self.rejected + 2)
+
+    @property
+    def acceptance_upper(self) -> float:
+        """通过率的乐观估计"""
+        a = self.accepted + 1
+        b = self.rejected + 1
+        sd = math.sqrt(a * b / ((a + b) ** 2 * (a + b + 1)))
+        return min(1.0, self.acceptance + self.z * sd)
+
+    @property
+    def cost_per_scanned(self) -> float:
+        """每篇文献平均消耗的请求数（结果页分摊 + 补全详情）"""
+        fill_share = self.filled / self.scanned if self.scanned else 0.0
+        return 1.0 / self.page_size + self.fill_cost * fill_share
+
+    def projected_requests(self, collected: int, optimistic: bool = False) -> int:
+        """
+        凑够目标数量预计还需要的请求数
+
+        Args:
+            collected: 已得到（或正在补全）的文献数
+            optimistic: 是否按乐观通过率估计
+        """
+        remaining = max(0, self.target - collected)
+        if remaining == 0:
+            return 0
+        rate = self.acceptance_upper if optimistic else self.acceptance
+        return math.ceil(remaining / rate * self.cost_per_scanned)
+
+    def exhausted(self, spent: int) -> bool:
+        """预算是否已用完"""
+        return spent >= self.limit
+
+    def affords(self, spent: int, cost: int = 1) -> bool:
+        """再发出 cost 个请求是否仍在预算内"""
+        return spent + cost <= self.limit
+
+    def should_stop(self, collected: int, spent: int) -> bool:
+        """
+        有本地筛选条件、且按乐观估计也无法在预算内凑够目标数量时返回 True
+
+        Args:
+            collected: 已得到（或正在补全）的文献数
+            spent: 已发出的请求数
+        """
+        if not self.filtering or self.scanned < self.min_scanned:
+            return False
+        return spent + self.projected_requests(collected, optimistic=True) > self.limit
+
+    def report(self, collected: int, spent: int) -> str:
+        """通过率与请求数估计"""
+        text = (f"筛选通过率估计 {self.acceptance:.1%}（已判定 {self.accepted + self.rejected} 篇，"
+                f"通过 {self.accepted} 篇），已用 {spent}/{self.limit} 个请求")
+        if collected < self.target:
+            text += f"，凑够 {self.target} 篇预计还需 {self.projected_requests(collected)} 个请求"
+        return text
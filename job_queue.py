@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+抓取任务队列
+以 SQLite 为本地后端保存 关键字 × 高级检索配置 × 年份切片 的抓取任务。
+任意数量的 worker 进程通过租约（lease）领取任务，运行期间定期续约（heartbeat）；
+worker 崩溃后租约过期，任务自动回到队列由其他 worker 接手
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import AdvancedSearchConfig
+from query_planner import canonical_hash
+from failure_cache import QUERY, format_duration
+
+
+DEFAULT_QUEUE_PATH = "runs/jobs.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key       TEXT NOT NULL UNIQUE,
+    batch         TEXT NOT NULL,
+    keyword       TEXT NOT NULL,
+    config        TEXT,
+    year_low      INTEGER,
+    year_high     INTEGER,
+    max_results   INTEGER NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    not_before    REAL,
+    result_count  INTEGER,
+    output        TEXT,
+    error         TEXT,
+    created       REAL NOT NULL,
+    updated       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (batch, status, lease_expires);
+"""
+
+
+def default_worker_id() -> str:
+    """worker 标识：主机名 + 进程号"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def config_to_dict(config: Optional[AdvancedSearchConfig]) -> Optional[Dict]:
+    return dict(vars(config)) if config is not None else None
+
+
+def config_from_dict(data: Optional[Dict]) -> Optional[AdvancedSearchConfig]:
+    if data is None:
+        return None
+    config = AdvancedSearchConfig()
+    for key, value in data.items():
+        if hasattr(config, key):
+            setattr(config, key, value)
+    return config
+
+
+class Job:
+    """队列中的一个抓取任务"""
+
+    def __init__(self, row: sqlite3.Row):
+        self.id = row['id']
+        self.key = row['job_key']
+        self.batch = row['batch']
+        self.keyword = row['keyword']
+        self.config_data = json.loads(row['config']) if row['config'] else None
+        self.year_low = row['year_low']
+        self.year_high = row['year_high']
+        self.max_results = row['max_results']
+        self.status = row['status']
+        self.attempts = row['attempts']
+        self.lease_owner = row['lease_owner']
+        self.lease_expires = row['lease_expires']
+        self.not_before = row['not_before']
+        self.result_count = row['result_count']
+        self.output = row['output']
+        self.error = row['error']
+
+    def advanced_config(self) -> Optional[AdvancedSearchConfig]:
+        """任务的高级检索配置（年份切片覆盖配置中的年份范围）"""
+        config = config_from_dict(self.config_data)
+        if self.year_low is None and self.year_high is None:
+            return config
+        if config is None:
+            config = AdvancedSearchConfig()
+        config.year_start = self.year_low
+        config.year_end = self.year_high
+        return config
+
+    @property
+    def label(self) -> str:
+        text = f"'{self.keyword}'"
+        if self.config_data and self.config_data.get('_name'):
+            text += f" [{self.config_data['_name']}]"
+        if self.year_low is not None or self.year_high is not None:
+            text += f" ({self.year_low or '不限'}-{self.year_high or '不限'})"
+        return text
+
+    def __repr__(self):
+        return f"Job(#{self.id} {self.label}, {self.status}, attempts={self.attempts})"
+
+
+class JobQueue:
+    """
+    基于 SQLite 的任务队列
+
+    多个进程可以同时使用同一个数据库文件（WAL 模式），领取任务在写事务中完成，
+    同一任务在租约有效期内只会被一个 worker 持有。跨主机使用时数据库需放在
+    支持文件锁的共享存储上。
+    """
+
+    def __init__(self, path: Optional[str] = None, lease_seconds: Optional[float] = None,
+                 max_attempts: Optional[int] = None):
+        """
+        Args:
+            path: 数据库文件（默认 config.JOB_QUEUE_PATH）
+            lease_seconds: 租约时长（秒），worker 需在到期前续约
+            max_attempts: 单个任务最多尝试次数，超过后标记为失败
+        """
+        import config as crawler_config
+        self.path = path or getattr(crawler_config, 'JOB_QUEUE_PATH', DEFAULT_QUEUE_PATH)
+        self.lease_seconds = lease_seconds or getattr(crawler_config, 'JOB_LEASE_SECONDS', 300)
+        self.max_attempts = max_attempts or getattr(crawler_config, 'JOB_MAX_ATTEMPTS', 3)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'not_before' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN not_before REAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每个线程使用独立连接（心跳线程与工作线程并发访问）
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def job_key(batch: str, keyword: str, config: Optional[AdvancedSearchConfig],
+                max_results: int, year_low: Optional[int], year_high: Optional[int]) -> str:
+        """任务键：同一批次中语义相同的 关键字 + 配置 + 数量 + 年份切片 得到相同的键"""
+        return canonical_hash(keyword, config, batch, max_results, year_low, year_high)
+
+    def enqueue(self, batch: str, keyword: str, config: Optional[AdvancedSearchConfig] = None,
+                max_results: int = 50, year_low: Optional[int] = None,
+                year_high: Optional[int] = None, name: Optional[str] = None) -> bool:
+        """
+        加入一个任务（同一批次中语义相同的任务只加入一次）
+
+        Args:
+            batch: 批次名
+            keyword: 搜索关键字
+            config: 高级检索配置
+            max_results: 目标文献数量
+            year_low: 年份切片起始年份
+            year_high: 年份切片结束年份
+            name: 配置名称（用于显示，例如配置文件名）
+
+        Returns:
+            是否为新任务
+        """
+        data = config_to_dict(config)
+        if data is not None and name:
+            data['_name'] = name
+        key = self.job_key(batch, keyword, config, max_results, year_low, year_high)
+        now = time.time()
+        cursor = self._connect().execute(
+            "INSERT OR IGNORE INTO jobs (job_key, batch, keyword, config, year_low, year_high, "
+            "max_results, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, batch, keyword, json.dumps(data, ensure_ascii=False) if data else None,
+             year_low, year_high, max_results, now, now))
+        return cursor.rowcount > 0
+
+    def lease(self, worker_id: str, batch: Optional[str] = None) -> Optional[Job]:
+        """
+        领取一个待执行的任务（包括租约已过期的任务；推迟到以后执行的任务不领取）
+
+        Args:
+            worker_id: worker 标识
+            batch: 只领取该批次的任务（None 表示任意批次）
+
+        Returns:
+            领取到的任务，队列为空时为 None
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            query = ("SELECT * FROM jobs WHERE ((status = 'pending' AND "
+                     "(not_before IS NULL OR not_before <= ?)) OR "
+                     "(status = 'leased' AND lease_expires < ?))")
+            params: List = [now, now]
+            if batch is not None:
+                query += " AND batch = ?"
+                params.append(batch)
+            row = conn.execute(query + " ORDER BY id LIMIT 1", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row['attempts'] >= self.max_attempts:
+                # 多次租约过期（worker 反复崩溃）的任务不再重试
+                conn.execute("UPDATE jobs SET status = 'failed', lease_owner = NULL, "
+                             "error = COALESCE(error, '租约多次过期'), updated = ? WHERE id = ?",
+                             (now, row['id']))
+                conn.execute("COMMIT")
+                return self.lease(worker_id, batch)
+            conn.execute("UPDATE jobs SET status = 'leased', attempts = attempts + 1, "
+                         "lease_owner = ?, lease_expires = ?, updated = ? WHERE id = ?",
+                         (worker_id, now + self.lease_seconds, now, row['id']))
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return Job(row)
+
+    def heartbeat(self, job: Job, worker_id: str) -> bool:
+        """
+        续约
+
+        Returns:
+            是否仍持有该任务（租约过期后被其他 worker 领取时为 False）
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET lease_expires = ?, updated = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (now + self.lease_seconds, now, job.id, worker_id))
+        return cursor.rowcount > 0
+
+    def complete(self, job: Job, worker_id: str, result_count: int,
+                 output: Optional[str] = None) -> bool:
+        """标记任务完成"""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'done', result_count = ?, output = ?, error = NULL, "
+            "lease_owner = NULL, lease_expires = NULL, updated = ? "
+            "WHERE id = ? AND lease_owner = ?",
+            (result_count, output, time.time(), job.id, worker_id))
+        return cursor.rowcount > 0
+
+    def fail(self, job: Job, worker_id: str, error: str,
+             retry_after: Optional[float] = None) -> bool:
+        """
+        任务执行失败：未达到最多尝试次数时放回队列，否则标记为失败
+
+        Args:
+            job: 任务
+            worker_id: worker 标识
+            error: 错误说明
+            retry_after: 至少等待多少秒后才能再次领取（例如查询的冷却时间）
+
+        Returns:
+            是否会重试
+        """
+        retry = job.attempts < self.max_attempts
+        now = time.time()
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+            "not_before = ?, updated = ? WHERE id = ? AND lease_owner = ?",
+            ('pending' if retry else 'failed', error,
+             now + retry_after if retry and retry_after else None, now, job.id, worker_id))
+        return retry
+
+    def defer(self, job: Job, worker_id: str, until: float, reason: str):
+        """推迟任务到 until（时间戳）之后再执行，不计入尝试次数"""
+        self._connect().execute(
+            "UPDATE jobs SET status = 'pending', attempts = MAX(attempts - 1, 0), error = ?, "
+            "lease_owner = NULL, lease_expires = NULL, not_before = ?, updated = ? "
+            "WHERE id = ? AND lease_owner = ?",
+            (reason, until, time.time(), job.id, worker_id))
+
+    def next_ready(self, batch: Optional[str] = None) -> Optional[float]:
+        """推迟的任务中最早可以执行的时间，没有推迟的任务时为 None"""
+        query = "SELECT MIN(not_before) AS t FROM jobs WHERE status = 'pending' AND not_before > ?"
+        params: List = [time.time()]
+        if batch is not None:
+            query += " AND batch = ?"
+            params.append(batch)
+        return self._connect().execute(query, params).fetchone()['t']
+
+    def release(self, job: Job, worker_id: str):
+        """放弃租约（worker 被中断时），任务回到队列且不计入尝试次数"""
+        self._connect().execute(
+            "UPDATE jobs SET status = 'pending', attempts = MAX(attempts - 1, 0), "
+            "lease_owner = NULL, lease_expires = NULL, updated = ? "
+            "WHERE id = ? AND lease_owner = ?",
+            (time.time(), job.id, worker_id))
+
+    def requeue_failed(self, batch: Optional[str] = None) -> int:
+        """把失败的任务放回队列（重置尝试次数，不再推迟）"""
+        query = ("UPDATE jobs SET status = 'pending', attempts = 0, error = NULL, "
+                 "not_before = NULL, updated = ? WHERE status = 'failed'")
+        params: List = [time.time()]
+        if batch is not None:
+            query += " AND batch = ?"
+            params.append(batch)
+        return self._connect().execute(query, params).rowcount
+
+    def jobs(self, batch: Optional[str] = None) -> List[Job]:
+        query = "SELECT * FROM jobs"
+        params: List = []
+        if batch is not None:
+            query += " WHERE batch = ?"
+            params.append(batch)
+        return [Job(row) for row in self._connect().execute(query + " ORDER BY id", params)]
+
+    def stats(self, batch: Optional[str] = None) -> Dict[str, int]:
+        """各状态的任务数（deferred 为 pending 中被推迟、暂时不能领取的任务数）"""
+        query = ("SELECT status, COUNT(*) AS n, COALESCE(SUM(not_before > ?), 0) AS deferred "
+                 "FROM jobs")
+        params: List = [time.time()]
+        if batch is not None:
+            query += " WHERE batch = ?"
+            params.append(batch)
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0, 'deferred': 0}
+        for row in self._connect().execute(query + " GROUP BY status", params):
+            counts[row['status']] = row['n']
+            if row['status'] == 'pending':
+                counts['deferred'] = row['deferred']
+        return counts
+
+    def batches(self) -> List[str]:
+        return [row['batch'] for row in self._connect().execute(
+            "SELECT batch FROM jobs GROUP BY batch ORDER BY MIN(id)")]
+
+
+def year_slices(year_start: int, year_end: int, step: int = 1) -> List[tuple]:
+    """把年份范围切成每 step 年一段，例如 (2018, 2023, 2) → [(2018, 2019), (2020, 2021), (2022, 2023)]"""
+    return [(low, min(low + step - 1, year_end)) for low in range(year_start, year_end + 1, step)]
+
+
+class _Heartbeat:
+    """后台线程定期续约；租约丢失时设置 lost 标记"""
+
+    def __init__(self, queue: JobQueue, job: Job, worker_id: str):
+        self.queue = queue
+        self.job = job
+        self.worker_id = worker_id
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='job-heartbeat')
+
+    def _run(self):
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            if not self.queue.heartbeat(self.job, self.worker_id):
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class SearchFailed(RuntimeError):
+    """任务的搜索出错（与“没有结果”区分）"""
+
+
+def run_job(crawler, job: Job, output_dir: str) -> tuple:
+    """
+    执行单个任务：搜索、排序并导出 CSV
+
+    已完成的请求记录在该任务专属的运行记录（job_<key>）中，任务被重新领取时直接重放；
+    任务成功后删除该记录。
+
+    Returns:
+        (文献数, 输出文件)；没有结果时为 (0, None)
+
+    Raises:
+        SearchFailed: 搜索出错（运行记录保留，重试时继续）
+    """
+    from journal import CrawlJournal
+
+    config = job.advanced_config()
+    journal = CrawlJournal(f"job_{job.key[:16]}", create=True)
+    papers = crawler.search_papers(job.keyword, max_results=job.max_results,
+                                   advanced_config=config, journal=journal)
+    error = getattr(crawler, 'last_error', None)
+    if error:
+        raise SearchFailed(error)
+    search_id = crawler.search_key(job.keyword, job.max_results, config)
+    if not papers:
+        journal.finish_search(search_id, 0)
+        journal.remove()
+        return 0, None
+
+    if config is not None:
+        papers = crawler.sort_papers(papers, config.sort_by, config.sort_order)
+    else:
+        papers = crawler.sort_by_citations(papers)
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    parts = [job.batch, job.keyword.replace(' ', '_').replace('/', '_')]
+    if job.config_data and job.config_data.get('_name'):
+        parts.append(job.config_data['_name'])
+    if job.year_low is not None or job.year_high is not None:
+        parts.append(f"{job.year_low or ''}-{job.year_high or ''}")
+    output_file = os.path.join(output_dir, f"{'_'.join(parts)}_{timestamp}.csv")
+    crawler.export_to_csv(papers, output_file, job.keyword)
+    journal.finish_search(search_id, len(papers), output_file)
+    journal.remove()
+    return len(papers), output_file
+
+
+def run_worker(queue: JobQueue, crawler=None, batch: Optional[str] = None,
+               worker_id: Optional[str] = None, wait: bool = False,
+               poll_interval: float = 10.0, max_jobs: Optional[int] = None) -> int:
+    """
+    worker 主循环：领取任务 → 执行 → 标记完成 / 失败
+
+    查询仍在失败冷却期（见 failure_cache.py）的任务推迟到冷却结束后执行；
+    搜索失败的任务按冷却时间推迟重试。
+
+    Args:
+        queue: 任务队列
+        crawler: ScholarCrawler 实例（默认新建，不使用代理）
+        batch: 只处理该批次（None 表示任意批次）
+        worker_id: worker 标识（默认 主机名:进程号）
+        wait: 队列为空时是否继续等待新任务（以及被推迟的任务）
+        poll_interval: 等待新任务时的轮询间隔（秒）
+        max_jobs: 最多执行的任务数
+
+    Returns:
+        完成的任务数
+    """
+    import config as crawler_config
+    if crawler is None:
+        from scholar_crawler import ScholarCrawler
+        crawler = ScholarCrawler()
+    worker_id = worker_id or default_worker_id()
+    output_dir = getattr(crawler_config, 'OUTPUT_DIR', 'results')
+
+    completed = 0
+    while max_jobs is None or completed < max_jobs:
+        job = queue.lease(worker_id, batch)
+        if job is None:
+            if not wait:
+                break
+            next_ready = queue.next_ready(batch)
+            delay = poll_interval
+            if next_ready is not None:
+                delay = min(poll_interval, max(0.0, next_ready - time.time()))
+            time.sleep(delay)
+            continue
+
+        failures = getattr(crawler, 'failures', None)
+        query_key = canonical_hash(job.keyword, job.advanced_config())
+        if failures is not None:
+            failure = failures.get(QUERY, query_key)
+            if failure and failure['until'] > time.time():
+                queue.defer(job, worker_id, failure['until'],
+                            f"冷却中: {failure['last_error']}")
+                print(f"⏸ 跳过任务 #{job.id} {job.label}：该查询已连续失败 "
+                      f"{failure['failures']} 次，"
+                      f"{format_duration(failure['until'] - time.time())}后再执行")
+                continue
+
+        stats = queue.stats(batch)
+        print(f"\n[{worker_id}] 任务 #{job.id} {job.label}"
+              f"（第 {job.attempts} 次尝试，剩余 {stats['pending']} 个待执行）")
+        print("-"*60)
+        try:
+            with _Heartbeat(queue, job, worker_id) as heartbeat:
+                count, output = run_job(crawler, job, output_dir)
+            if heartbeat.lost:
+                print(f"⚠ 任务 #{job.id} 的租约已被其他 worker 接管，结果不再提交")
+                continue
+            queue.complete(job, worker_id, count, output)
+            completed += 1
+        except SearchFailed as e:
+            # 搜索出错时查询已记入失败记录：按冷却时间推迟重试
+            cooldown = failures.remaining(QUERY, query_key) if failures is not None else 0
+            retry = queue.fail(job, worker_id, str(e), retry_after=cooldown or None)
+            when = f'{format_duration(cooldown)}后重试' if cooldown else '稍后重试'
+            print(f"❌ 任务 #{job.id} 搜索失败（{when if retry else '不再重试'}）")
+        except KeyboardInterrupt:
+            queue.release(job, worker_id)
+            print(f"\n⚠ 已中断，任务 #{job.id} 已放回队列")
+            raise
+        except Exception as e:
+            retry = queue.fail(job, worker_id, f"{type(e).__name__}: {e}")
+            print(f"❌ 任务 #{job.id} 失败: {e}（{'稍后重试' if retry else '不再重试'}）")
+
+    return completed
+
+
+def print_status(queue: JobQueue, batch: Optional[str] = None, verbose: bool = False):
+    """打印队列状态"""
+    batches = [batch] if batch else queue.batches()
+    if not batches:
+        print("📭 队列为空")
+        return
+    for name in batches:
+        stats = queue.stats(name)
+        total = stats['pending'] + stats['leased'] + stats['done'] + stats['failed']
+        pending = f"待执行 {stats['pending']}"
+        if stats['deferred']:
+            pending += f"（冷却中 {stats['deferred']}）"
+        print(f"📦 批次 {name}: 共 {total} 个任务 | {pending} | "
+              f"执行中 {stats['leased']} | 完成 {stats['done']} | 失败 {stats['failed']}")
+        if verbose:
+            now = time.time()
+            for job in queue.jobs(name):
+                detail = job.output or job.error or job.lease_owner or ''
+                if job.status == 'pending' and job.not_before and job.not_before > now:
+                    detail = f"[{format_duration(job.not_before - now)}后执行] {detail}"
+                print(f"   #{job.id:<4} {job.status:<8} {job.label} {detail}")
+
+
+def main():
+    """主函数 - 任务队列工具"""
+    import argparse
+    import config
+    from config_manager import ConfigManager
+
+    parser = argparse.ArgumentParser(
+        description='抓取任务队列 - 多个 worker 进程（或主机）并行抓取',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  python job_queue.py enqueue cv_batch --category cv --max 100
+  python job_queue.py enqueue cv_batch --keywords "object detection" --config configs/cv_top_conferences.json --years 2018-2023 --step 2
+  python job_queue.py work --batch cv_batch          # 可在多个终端 / 主机上同时运行
+  python job_queue.py status --verbose
+  python job_queue.py cooldown                      # 查看失败冷却中的查询和代理
+        """
+    )
+    parser.add_argument('--db', type=str, default=None,
+                        help='队列数据库文件 (默认: config.JOB_QUEUE_PATH)')
+    subparsers = parser.add_subparsers(dest='command', help='子命令')
+
+    # enqueue 命令
+    enqueue_parser = subparsers.add_parser('enqueue', help='加入任务（关键字 × 配置 × 年份切片）')
+    enqueue_parser.add_argument('batch', help='批次名')
+    enqueue_parser.add_argument('--keywords', help='关键字列表（逗号分隔）')
+    enqueue_parser.add_argument('--category', help='预设关键字类别 (ai/cv/nlp/recsys/dm/bigdata/all)')
+    enqueue_parser.add_argument('--config', action='append', default=[],
+                                help='高级检索配置文件（可重复指定）')
+    enqueue_parser.add_argument('--max', type=int, default=50, help='每个任务的最大文献数量 (默认: 50)')
+    enqueue_parser.add_argument('--years', help='年份范围，例如 2018-2023（按 --step 切片）')
+    enqueue_parser.add_argument('--step', type=int, default=1, help='每个年份切片的年数 (默认: 1)')
+
+    # work 命令
+    work_parser = subparsers.add_parser('work', help='启动 worker 领取并执行任务')
+    work_parser.add_argument('--batch', help='只处理该批次')
+    work_parser.add_argument('--proxy', action='store_true', help='使用代理')
+    work_parser.add_argument('--wait', action='store_true', help='队列为空时继续等待新任务')
+    work_parser.add_argument('--max-jobs', type=int, default=None, help='最多执行的任务数')
+    work_parser.add_argument('--worker-id', default=None, help='worker 标识 (默认: 主机名:进程号)')
+
+    # status 命令
+    status_parser = subparsers.add_parser('status', help='查看队列状态')
+    status_parser.add_argument('--batch', help='只显示该批次')
+    status_parser.add_argument('--verbose', action='store_true', help='显示每个任务')
+
+    # requeue 命令
+    requeue_parser = subparsers.add_parser('requeue', help='把失败的任务放回队列')
+    requeue_parser.add_argument('--batch', help='只处理该批次')
+
+    # cooldown 命令
+    cooldown_parser = subparsers.add_parser('cooldown', help='查看处于失败冷却期的查询和代理')
+    cooldown_parser.add_argument('--clear', action='store_true', help='清除所有失败记录')
+
+    args = parser.parse_args()
+    queue = JobQueue(args.db)
+
+    if args.command == 'enqueue':
+        keywords = []
+        if args.keywords:
+            keywords.extend(k.strip() for k in args.keywords.split(',') if k.strip())
+        if args.category:
+            keywords.extend(config.get_all_keywords() if args.category == 'all'
+                            else config.get_keywords_by_category(args.category))
+        if not keywords:
+            print("❌ 请通过 --keywords 或 --category 指定关键字")
+            return
+
+        manager = ConfigManager()
+        configs = [(None, None)]
+        if args.config:
+            configs = [(manager.load_config(path), os.path.splitext(os.path.basename(path))[0])
+                       for path in args.config]
+
+        slices = [(None, None)]
+        if args.years:
+            start, _, end = args.years.partition('-')
+            slices = year_slices(int(start), int(end or start), max(1, args.step))
+
+        added = 0
+        total = 0
+        for keyword in keywords:
+            for advanced_config, name in configs:
+                for year_low, year_high in slices:
+                    total += 1
+                    added += queue.enqueue(args.batch, keyword, advanced_config, args.max,
+                                           year_low, year_high, name)
+        print(f"✓ 批次 {args.batch}: 新增 {added} 个任务（{total - added} 个已存在）")
+        print_status(queue, args.batch)
+
+    elif args.command == 'work':
+        from scholar_crawler import ScholarCrawler
+        crawler = ScholarCrawler(use_proxy=args.proxy)
+        try:
+            done = run_worker(queue, crawler, args.batch, args.worker_id,
+                              wait=args.wait, max_jobs=args.max_jobs)
+        except KeyboardInterrupt:
+            return
+        finally:
+            crawler.close()
+        print(f"\n✓ worker 完成 {done} 个任务")
+        print_status(queue, args.batch)
+
+    elif args.command == 'status':
+        print_status(queue, args.batch, args.verbose)
+
+    elif args.command == 'requeue':
+        count = queue.requeue_failed(args.batch)
+        print(f"✓ 已将 {count} 个失败任务放回队列")
+
+    elif args.command == 'cooldown':
+        from failure_cache import FailureCache
+        failures = FailureCache()
+        if args.clear:
+            print(f"✓ 已清除 {failures.clear()} 条失败记录")
+            return
+        entries = failures.entries()
+        if not entries:
+            print("✓ 没有处于冷却期的查询或代理")
+            return
+        now = time.time()
+        for entry in entries:
+            kind = '查询' if entry['scope'] == QUERY else '代理'
+            print(f"⏸ {kind} {entry['label']}: 连续失败 {entry['failures']} 次，"
+                  f"还剩 {format_duration(entry['until'] - now)} | {entry['last_error']}")
+
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+运行记录（crawl journal）
+每次运行一个追加写入的 JSONL 文件，记录抓取到的结果页、补全结果、筛选出的文献
+和进度。运行中断后用 --resume RUN_ID 继续：已记录的请求直接从记录中读取，不再访问网络
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from backends import ResultPage, SearchBackend, page_key, pub_key
+from paper import Paper
+from symbols import SymbolTable
+
+
+DEFAULT_JOURNAL_DIR = "runs"
+
+
+def new_run_id() -> str:
+    """生成运行编号，例如 20240101_120000_3f2a"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:4]}"
+
+
+class CrawlJournal:
+    """
+    单次运行的记录文件 <directory>/<run_id>.jsonl
+
+    每行一条记录，type 字段区分：
+        run     运行参数（第一行）
+        search  一次搜索开始（search 为搜索编号）
+        page    抓取到的结果页
+        fill    补全详情的结果
+        cursor  筛选进度（已扫描 / 已获取的文献数）
+        paper   通过筛选的文献（会议/期刊、出版商和作者记为符号编号）
+        symbols 新出现的符号（start 为第一个符号的编号），写在引用它们的 paper 之前
+        done    一次搜索完成
+    """
+
+    def __init__(self, run_id: Optional[str] = None, directory: Optional[str] = None,
+                 create: bool = False):
+        """
+        Args:
+            run_id: 运行编号（None 表示新建运行）
+            directory: 记录目录（默认 config.JOURNAL_DIR）
+            create: 指定的运行编号不存在时是否新建（否则报错）
+        """
+        if directory is None:
+            try:
+                import config
+                directory = getattr(config, 'JOURNAL_DIR', DEFAULT_JOURNAL_DIR)
+            except ImportError:
+                directory = DEFAULT_JOURNAL_DIR
+        self.run_id = run_id or new_run_id()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{self.run_id}.jsonl")
+        self.resumed = run_id is not None and not (create and not os.path.exists(self.path))
+        self.params: Dict = {}
+        # 结果页和补全结果只保留 键 → 记录在文件中的偏移，需要时从文件读出
+        self._pages: Dict[str, int] = {}
+        self._fills: Dict[str, int] = {}
+        # 每次搜索已记录的文献数（文献本身只在文件中，需要时重新读出）
+        self._paper_counts: Dict[str, int] = {}
+        self._cursors: Dict[str, Dict] = {}
+        self._done: Dict[str, Dict] = {}
+        # 本次运行的符号表：文献记录中重复的字符串只写一次
+        self.symbols = SymbolTable()
+        self._lock = threading.Lock()
+
+        if self.resumed:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"运行记录不存在: {self.path}")
+            self._load()
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+    def _load(self):
+        self._repair_tail()
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for raw in f:
+                line_offset, offset = offset, offset + len(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    # 中断时最后一行可能不完整
+                    continue
+                kind = entry.get('type')
+                if kind == 'run':
+                    self.params = entry.get('params', {})
+                elif kind == 'page':
+                    self._pages[entry['key']] = line_offset
+                elif kind == 'fill':
+                    self._fills[entry['key']] = line_offset
+                elif kind == 'search':
+                    # 未完成的搜索会从头重放，之前记录的文献作废
+                    self._paper_counts[entry['search']] = 0
+                elif kind == 'symbols':
+                    self.symbols.load(entry['start'], entry['values'])
+                elif kind == 'paper':
+                    search_id = entry['search']
+                    self._paper_counts[search_id] = self._paper_counts.get(search_id, 0) + 1
+                elif kind == 'cursor':
+                    self._cursors[entry['search']] = entry
+                elif kind == 'done':
+                    self._done[entry['search']] = entry
+
+    def _repair_tail(self):
+        """
+        修复中断时只写了一部分的最后一行
+
+        最后一行没有换行符时：内容完整则补上换行符，否则截掉。
+        继续运行时追加的记录因此从新的一行开始，不会接在残缺的行后面而无法读出。
+        """
+        with open(self.path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if not size:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # 向前找到最后一个换行符
+            start = size
+            while start > 0:
+                step = min(start, 65536)
+                f.seek(start - step)
+                newline = f.read(step).rfind(b'\n')
+                start -= step
+                if newline >= 0:
+                    start += newline + 1
+                    break
+            f.seek(start)
+            tail = f.read()
+            try:
+                json.loads(tail.decode('utf-8'))
+                f.write(b'\n')
+            except ValueError:
+                f.truncate(start)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _append(self, entry: Dict, sync: bool = False) -> int:
+        with self._lock:
+            return self._write([entry], sync)[0]
+
+    def _write(self, entries: List[Dict], sync: bool = False) -> List[int]:
+        """
+        一次写入若干条记录（调用方持有 self._lock）
+
+        sync 为 True 时写入后 fsync：运行、搜索的开始和结束以及每页之后的进度是检查点，
+        落盘后连同之前写入的记录一起在断电或系统崩溃后仍然保留。
+
+        Returns:
+            每条记录在文件中的偏移
+        """
+        lines = [(json.dumps(entry, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+                 for entry in entries]
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            offsets = []
+            for line in lines:
+                offsets.append(offset)
+                offset += len(line)
+            f.write(b''.join(lines))
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        return offsets
+
+    def _read_at(self, offset: int) -> Dict:
+        """读出文件中 offset 处的一条记录"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline().decode('utf-8'))
+
+    def _encode_paper(self, paper: Paper) -> Dict:
+        """文献记录的 JSON 形式，会议/期刊、出版商和作者记为符号编号"""
+        data = paper.to_dict()
+        data['venue'] = self.symbols.encode(paper.venue)
+        data['publisher'] = self.symbols.encode(paper.publisher)
+        data['authors'] = self.symbols.encode_all(paper.authors)
+        return data
+
+    def _decode_paper(self, data: Dict) -> Paper:
+        """从 JSON 恢复文献记录（也兼容直接保存字符串的旧记录）"""
+        data = dict(data)
+        for field in ('venue', 'publisher'):
+            if isinstance(data.get(field), int):
+                data[field] = self.symbols.decode(data[field])
+        if isinstance(data.get('authors'), list):
+            data['authors'] = self.symbols.decode_all(data['authors'])
+        return Paper.from_dict(data).intern(self.symbols)
+
+    # ---------- 运行与搜索 ----------
+
+    def start_run(self, kind: str, params: Dict):
+        """记录运行参数（新建运行时调用一次）"""
+        self.params = dict(params, kind=kind)
+        self._append({'type': 'run', 'run_id': self.run_id, 'time': time.time(),
+                      'params': self.params}, sync=True)
+
+    def begin_search(self, search_id: str, params: Optional[Dict] = None):
+        with self._lock:
+            self._paper_counts[search_id] = 0
+        self._append({'type': 'search', 'search': search_id, 'time': time.time(),
+                      'params': params or {}}, sync=True)
+
+    def is_done(self, search_id: str) -> bool:
+        return search_id in self._done
+
+    def done_info(self, search_id: str) -> Optional[Dict]:
+        return self._done.get(search_id)
+
+    def finish_search(self, search_id: str, count: int, output: Optional[str] = None):
+        entry = {'type': 'done', 'search': search_id, 'count': count, 'output': output,
+                 'time': time.time()}
+        with self._lock:
+            self._done[search_id] = entry
+        self._append(entry, sync=True)
+
+    def papers(self, search_id: str) -> List[Paper]:
+        """某次搜索已记录的文献"""
+        return list(self.iter_papers(search_id))
+
+    def paper_count(self, search_id: str) -> int:
+        """某次搜索已记录的文献数"""
+        return self._paper_counts.get(search_id, 0)
+
+    def iter_papers(self, search_id: str) -> Iterator[Paper]:
+        """
+        从记录文件中逐篇读出某次搜索已记录的文献（不在内存中保留）
+
+        只读出该搜索最后一次开始之后记录的文献（之前未完成的部分已作废）。
+        """
+        if not self._paper_counts.get(search_id):
+            return
+        starts = sum(1 for entry in self._read_entries(search_id)
+                     if entry.get('type') == 'search')
+        seen = 0
+        for entry in self._read_entries(search_id):
+            kind = entry.get('type')
+            if kind == 'search':
+                seen += 1
+            elif kind == 'paper' and seen == starts:
+                yield self._decode_paper(entry['paper'])
+
+    def _read_entries(self, search_id: str) -> Iterator[Dict]:
+        """记录文件中属于某次搜索的记录"""
+        marker = json.dumps(search_id, ensure_ascii=False)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if marker not in line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get('search') == search_id:
+                    yield entry
+
+    def cursor(self, search_id: str) -> Optional[Dict]:
+        """某次搜索最后记录的进度"""
+        return self._cursors.get(search_id)
+
+    # ---------- 请求与进度 ----------
+
+    def get_page(self, key: str) -> Optional[ResultPage]:
+        offset = self._pages.get(key)
+        if offset is None:
+            return None
+        return ResultPage.from_dict(self._read_at(offset)['page'])
+
+    def record_page(self, key: str, page: ResultPage):
+        entry = {'type': 'page', 'key': key, 'page': page.to_dict()}
+        with self._lock:
+            self._pages[key] = self._write([entry])[0]
+
+    def get_fill(self, key: str) -> Optional[Dict]:
+        offset = self._fills.get(key)
+        if offset is None:
+            return None
+        return self._read_at(offset)['pub']
+
+    def record_fill(self, key: str, pub: Dict):
+        entry = {'type': 'fill', 'key': key, 'pub': pub}
+        with self._lock:
+            self._fills[key] = self._write([entry])[0]
+
+    def record_cursor(self, search_id: str, scanned: int, collected: int):
+        entry = {'type': 'cursor', 'search': search_id, 'scanned': scanned,
+                 'collected': collected}
+        with self._lock:
+            self._cursors[search_id] = entry
+        self._append(entry, sync=True)
+
+    def record_paper(self, search_id: str, paper_info: Paper):
+        with self._lock:
+            self._paper_counts[search_id] = self._paper_counts.get(search_id, 0) + 1
+            start = len(self.symbols)
+            entries = [{'type': 'paper', 'search': search_id,
+                        'paper': self._encode_paper(paper_info)}]
+            if len(self.symbols) > start:
+                entries.insert(0, {'type': 'symbols', 'start': start,
+                                   'values': self.symbols.values[start:]})
+            self._write(entries)
+
+    def remove(self):
+        """删除记录文件（运行正常完成、不再需要继续时调用）"""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def summary(self) -> str:
+        return (f"运行记录 {self.run_id}: {len(self._pages)} 个结果页, "
+                f"{len(self._fills)} 个补全结果, {len(self._done)} 次搜索已完成")
+
+
+class JournalBackend:
+    """
+    记录/重放后端
+
+    包装另一个后端：已记录的请求直接返回记录内容，其余请求转发给内层后端并写入记录。
+    peek_search / peek_fill 供抓取引擎在不占用限速令牌的情况下读取记录。
+    """
+
+    def __init__(self, inner: SearchBackend, journal: CrawlJournal):
+        self.inner = inner
+        self.journal = journal
+        self.name = f"journal({inner.name})"
+        self.replayed = 0
+
+    def peek_search(self, query: str, start_index: int = 0, year_low: Optional[int] = None,
+                    year_high: Optional[int] = None) -> Optional[ResultPage]:
+        key = page_key('search', query, start_index, year_low, year_high)
+        page = self.journal.get_page(key)
+        if page is not None:
+            self.replayed += 1
+            return page
+        # 内层后端（例如缓存）无需访问网络即可给出的结果同样写入记录
+        peek = getattr(self.inner, 'peek_search', None)
+        page = peek(query, start_index, year_low, year_high) if peek else None
+        if page is not None:
+            self.journal.record_page(key, page)
+        return page
+
+    def peek_fill(self, pub: Dict) -> Optional[Dict]:
+        key = page_key('fill', pub_key(pub))
+        filled = self.journal.get_fill(key)
+        if filled is not None:
+            self.replayed += 1
+            return filled
+        peek = getattr(self.inner, 'peek_fill', None)
+        filled = peek(pub) if peek else None
+        if filled is not None:
+            self.journal.record_fill(key, filled)
+        return filled
+
+    def search(self, query: str, start_index: int = 0, year_low: Optional[int] = None,
+               year_high: Optional[int] = None) -> ResultPage:
+        page = self.peek_search(query, start_index, year_low, year_high)
+        if page is None:
+            page = self.inner.search(query, start_index, year_low, year_high)
+            self.journal.record_page(
+                page_key('search', query, start_index, year_low, year_high), page)
+        return page
+
+    def fill(self, pub: Dict) -> Dict:
+        filled = self.peek_fill(pub)
+        if filled is None:
+            key = page_key('fill', pub_key(pub))
+            filled = self.inner.fill(pub)
+            self.journal.record_fill(key, filled)
+        return filled
+
+    def cited_by(self, pub: Dict, start_index: int = 0) -> ResultPage:
+        return self.inner.cited_by(pub, start_index)
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+结果页缓存
+把抓取到的搜索结果页和补全结果保存在本地 SQLite 数据库中，按查询和翻页位置索引。
+每条缓存有各自的过期时间，总大小超过上限时按最近最少使用（LRU）淘汰。
+重复运行相同的检索时直接读取缓存，不再访问 Google Scholar
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from backends import ResultPage, SearchBackend, page_key, pub_key
+
+
+DEFAULT_CACHE_PATH = "cache/pages.sqlite3"
+
+# 搜索结果页的默认有效期（秒）：引用量等数据会变化
+DEFAULT_SEARCH_TTL = 7 * 24 * 3600
+
+# 补全结果的默认有效期（秒）：摘要、出版商等基本不变
+DEFAULT_FILL_TTL = 30 * 24 * 3600
+
+# 缓存总大小上限（MB）
+DEFAULT_MAX_MB = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key      TEXT PRIMARY KEY,
+    kind     TEXT NOT NULL,
+    data     TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    created  REAL NOT NULL,
+    expires  REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed);
+CREATE INDEX IF NOT EXISTS pages_expires ON pages (expires);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class PageCache:
+    """
+    SQLite 结果页缓存
+
+    多个进程可以共享同一个缓存文件（WAL 模式）。hits / misses 为本实例的命中计数，
+    累计计数保存在数据库中（见 stats）。
+    """
+
+    def __init__(self, path: Optional[str] = None, search_ttl: Optional[float] = None,
+                 fill_ttl: Optional[float] = None, max_mb: Optional[float] = None,
+                 settings=None):
+        """
+        Args:
+            path: 缓存数据库文件（默认 config.PAGE_CACHE_PATH）
+            search_ttl: 搜索结果页有效期（秒，默认 config.PAGE_CACHE_TTL）
+            fill_ttl: 补全结果有效期（秒，默认 config.PAGE_CACHE_FILL_TTL）
+            max_mb: 缓存总大小上限（MB，默认 config.PAGE_CACHE_MAX_MB）
+            settings: 配置模块（默认 config）
+        """
+        if settings is None:
+            import config as settings
+        self.path = path or getattr(settings, 'PAGE_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.search_ttl = search_ttl or getattr(settings, 'PAGE_CACHE_TTL', DEFAULT_SEARCH_TTL)
+        self.fill_ttl = fill_ttl or getattr(settings, 'PAGE_CACHE_FILL_TTL', DEFAULT_FILL_TTL)
+        max_mb = max_mb or getattr(settings, 'PAGE_CACHE_MAX_MB', DEFAULT_MAX_MB)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 抓取在线程池中进行，所有线程共用一个连接，由锁保护
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def _count(self, name: str):
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[Dict]:
+        """
+        读取一条缓存（已过期视为未命中）
+
+        Args:
+            key: 缓存键
+            count_miss: 未命中时是否计入 misses（只是预读、随后还会正式请求时传 False）
+
+        Returns:
+            缓存的数据，未命中时为 None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM pages WHERE key = ? AND expires > ?", (key, now)).fetchone()
+            if row is None:
+                if count_miss:
+                    self.misses += 1
+                    self._count('misses')
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE pages SET accessed = ? WHERE key = ?", (now, key))
+            self._count('hits')
+        return json.loads(row[0])
+
+    def put(self, key: str, data: Dict, ttl: float):
+        """
+        写入一条缓存，超出大小上限时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键（backends.page_key）
+            data: 可 JSON 序列化的数据
+            ttl: 有效期（秒）
+        """
+        text = json.dumps(data, ensure_ascii=False, default=str)
+        size = len(text.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, kind, data, size, created, expires, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, key.split('_', 1)[0], text, size, now, now + ttl, now))
+            self._total_bytes += size - (old[0] if old else 0)
+            self.stored += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """淘汰过期条目，仍超出上限时按最近访问时间从旧到新淘汰（调用方持有锁）"""
+        self._conn.execute("DELETE FROM pages WHERE expires <= ?", (time.time(),))
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        # 淘汰到上限的 90%，避免每次写入都触发淘汰
+        target = self.max_bytes * 0.9
+        if self._total_bytes <= target:
+            return
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM pages ORDER BY accessed"):
+            if self._total_bytes - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM pages WHERE key = ?", doomed)
+        self._total_bytes -= freed
+        self.evicted += len(doomed)
+
+    def expire(self) -> int:
+        """删除所有过期条目，返回删除的条数"""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM pages WHERE expires <= ?", (time.time(),)).rowcount
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        return removed
+
+    def stats(self) -> Dict:
+        """缓存条目数、大小和累计命中情况"""
+        now = time.time()
+        with self._lock:
+            entries, size, expired = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), "
+                "COALESCE(SUM(expires <= ?), 0) FROM pages", (now,)).fetchone()
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        return {
+            'entries': entries,
+            'bytes': size,
+            'expired': expired,
+            'max_bytes': self.max_bytes,
+            'hits': counters.get('hits', 0),
+            'misses': counters.get('misses', 0),
+        }
+
+    # 年龄分布的分组（秒）
+    AGE_BUCKETS = ((3600, '1 小时内'), (24 * 3600, '1 天内'), (7 * 24 * 3600, '1 周内'),
+                   (30 * 24 * 3600, '30 天内'), (None, '更早'))
+
+    def age_histogram(self) -> List[Tuple[str, int, int]]:
+        """
+        按写入时间分组的条目数和大小
+
+        Returns:
+            [(分组名, 条目数, 字节数), ...]
+        """
+        now = time.time()
+        histogram = []
+        lower = 0
+        with self._lock:
+            for upper, name in self.AGE_BUCKETS:
+                query = "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages WHERE created <= ?"
+                params = [now - lower]
+                if upper is not None:
+                    query += " AND created > ?"
+                    params.append(now - upper)
+                count, size = self._conn.execute(query, params).fetchone()
+                histogram.append((name, count, size))
+                lower = upper
+        return histogram
+
+    def vacuum(self) -> int:
+        """重新打包数据库文件（含 WAL 日志），返回释放的字节数"""
+        before = self.file_size()
+        with self._lock:
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return before - self.file_size()
+
+    def file_size(self) -> int:
+        """数据库文件和 WAL 日志占用的磁盘空间（字节）"""
+        return sum(os.path.getsize(path) for path in (self.path, self.path + '-wal')
+                   if os.path.exists(path))
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = f"{self.hits / total:.0%}" if total else "-"
+        text = f"缓存命中 {self.hits}/{total}（{rate}），写入 {self.stored} 条"
+        if self.evicted:
+            text += f"，淘汰 {self.evicted} 条"
+        return text
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedBackend:
+    """
+    缓存后端
+
+    包装另一个后端：缓存中未过期的结果页直接返回，其余请求转发给内层后端并写入缓存。
+    peek_search / peek_fill 供抓取引擎在不占用限速令牌的情况下读取缓存。
+    """
+
+    def __init__(self, inner: SearchBackend, cache: PageCache):
+        self.inner = inner
+        self.cache = cache
+        self.name = f"cached({inner.name})"
+
+    def peek_search(self, query: str, start_index: int = 0, year_low: Optional[int] = None,
+                    year_high: Optional[int] = None) -> Optional[ResultPage]:
+        data = self.cache.get(page_key('search', query, start_index, year_low, year_high),
+                              count_miss=False)
+        return ResultPage.from_dict(data) if data is not None else None
+
+    def peek_fill(self, pub: Dict) -> Optional[Dict]:
+        return self.cache.get(page_key('fill', pub_key(pub)), count_miss=False)
+
+    def search(self, query: str, start_index: int = 0, year_low: Optional[int] = None,
+               year_high: Optional[int] = None) -> ResultPage:
+        key = page_key('search', query, start_index, year_low, year_high)
+        data = self.cache.get(key)
+        if data is not None:
+            return ResultPage.from_dict(data)
+        page = self.inner.search(query, start_index, year_low, year_high)
+        self.cache.put(key, page.to_dict(), self.cache.search_ttl)
+        return page
+
+    def fill(self, pub: Dict) -> Dict:
+        key = page_key('fill', pub_key(pub))
+        filled = self.cache.get(key)
+        if filled is None:
+            filled = self.inner.fill(pub)
+            self.cache.put(key, filled, self.cache.fill_ttl)
+        return filled
+
+    def cited_by(self, pub: Dict, start_index: int = 0) -> ResultPage:
+        return self.inner.cited_by(pub, start_index)
+
+
+def _wait_until(clock: str):
+    """等待到下一个 HH:MM（用于在访问低峰期预热）"""
+    from datetime import datetime, timedelta
+    hour, minute = (int(part) for part in clock.split(':'))
+    now = datetime.now()
+    start = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if start <= now:
+        start += timedelta(days=1)
+    print(f"⏳ 等待到 {start.strftime('%Y-%m-%d %H:%M')} 开始预热...")
+    time.sleep((start - now).total_seconds())
+
+
+def prewarm(keywords: List[str], config_paths: List[str], max_results: int = 50,
+            crawler=None) -> int:
+    """
+    用 关键字 × 配置文件 逐个执行检索，把结果页写入缓存
+
+    已缓存且未过期的页面不会重新请求；处于失败冷却期的查询跳过。
+
+    Args:
+        keywords: 关键字列表
+        config_paths: 高级检索配置文件列表
+        max_results: 每次检索的目标文献数量
+        crawler: ScholarCrawler 实例（默认新建，使用缓存）
+
+    Returns:
+        执行的检索次数
+    """
+    from config_manager import ConfigManager
+    from failure_cache import QUERY, format_duration
+    from query_planner import canonical_hash
+
+    if crawler is None:
+        from scholar_crawler import ScholarCrawler
+        crawler = ScholarCrawler()
+    manager = ConfigManager()
+    configs = [(path, manager.load_config(path)) for path in config_paths]
+
+    searches = 0
+    total = len(configs) * len(keywords)
+    for path, advanced_config in configs:
+        for keyword in keywords:
+            searches += 1
+            print(f"\n[{searches}/{total}] 预热: '{keyword}' × {os.path.basename(path)}")
+            failures = getattr(crawler, 'failures', None)
+            if failures is not None:
+                remaining = failures.remaining(QUERY, canonical_hash(keyword, advanced_config))
+                if remaining:
+                    print(f"⏸ 该查询在失败冷却期内，跳过（还剩 {format_duration(remaining)}）")
+                    continue
+            crawler.search_papers(keyword, max_results=max_results,
+                                  advanced_config=advanced_config,
+                                  fill_details=bool(advanced_config.publishers))
+    return searches
+
+
+def print_stats(cache: PageCache):
+    """打印缓存统计"""
+    stats = cache.stats()
+    lookups = stats['hits'] + stats['misses']
+    rate = f"{stats['hits'] / lookups:.1%}" if lookups else "-"
+    print(f"🗄 结果页缓存: {cache.path}")
+    print(f"   条目: {stats['entries']} 个（已过期 {stats['expired']} 个）")
+    print(f"   大小: {stats['bytes'] / 1024 / 1024:.2f} MB / {stats['max_bytes'] / 1024 / 1024:.0f} MB"
+          f"（文件 {cache.file_size() / 1024 / 1024:.2f} MB）")
+    print(f"   累计命中率: {rate}（命中 {stats['hits']} 次，未命中 {stats['misses']} 次）")
+    print("   写入时间分布:")
+    histogram = cache.age_histogram()
+    widest = max((count for _, count, _ in histogram), default=0)
+    for name, count, size in histogram:
+        bar = '█' * (round(count / widest * 30) if widest else 0)
+        print(f"     {name:<6} {count:>6} 个 {size / 1024:>9.1f} KB  {bar}")
+
+
+def main():
+    """主函数 - 结果页缓存工具"""
+    import argparse
+    import glob
+    import config
+
+    parser = argparse.ArgumentParser(
+        description='结果页缓存 - 查看统计、压缩清理、低峰期预热',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  python page_cache.py stats
+  python page_cache.py compact
+  python page_cache.py prewarm --category ai --max 50 --at 02:00
+  python page_cache.py prewarm --keywords "deep learning,transformer" --configs "configs/*_conferences.json"
+        """
+    )
+    parser.add_argument('--db', type=str, default=None,
+                        help='缓存数据库文件 (默认: config.PAGE_CACHE_PATH)')
+    subparsers = parser.add_subparsers(dest='command', help='子命令')
+
+    subparsers.add_parser('stats', help='查看命中率、大小和写入时间分布')
+
+    subparsers.add_parser('compact', help='删除过期条目并重新打包缓存、失败记录和原始页面存储')
+
+    prewarm_parser = subparsers.add_parser('prewarm', help='用 关键字 × configs/*.json 预热缓存')
+    prewarm_parser.add_argument('--keywords', help='关键字列表（逗号分隔）')
+    prewarm_parser.add_argument('--category', help='预设关键字类别 (ai/cv/nlp/recsys/dm/bigdata/all)')
+    prewarm_parser.add_argument('--configs', default='configs/*.json',
+                                help='配置文件（glob 模式，默认: configs/*.json）')
+    prewarm_parser.add_argument('--max', type=int, default=50, help='每次检索的最大文献数量 (默认: 50)')
+    prewarm_parser.add_argument('--at', metavar='HH:MM', help='等到该时间（访问低峰期）再开始')
+    prewarm_parser.add_argument('--proxy', action='store_true', help='使用代理')
+
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        print_stats(PageCache(args.db))
+
+    elif args.command == 'compact':
+        cache = PageCache(args.db)
+        expired = cache.expire()
+        freed = cache.vacuum()
+        print(f"✓ 结果页缓存: 删除 {expired} 个过期条目，释放 {freed / 1024:.1f} KB")
+
+        from failure_cache import FailureCache
+        removed = FailureCache().compact()
+        print(f"✓ 失败记录: 删除 {removed} 条早已结束冷却的记录")
+
+        from raw_store import RawPageStore
+        store_dir = getattr(config, 'RAW_STORE_DIR', 'raw_pages')
+        if os.path.isdir(store_dir):
+            lines, objects = RawPageStore(store_dir).compact()
+            print(f"✓ 原始页面存储: 索引删除 {lines} 行旧记录，删除 {objects} 个未引用的页面")
+
+    elif args.command == 'prewarm':
+        keywords = []
+        if args.keywords:
+            keywords.extend(k.strip() for k in args.keywords.split(',') if k.strip())
+        if args.category:
+            keywords.extend(config.get_all_keywords() if args.category == 'all'
+                            else config.get_keywords_by_category(args.category))
+        config_paths = sorted(glob.glob(args.configs))
+        if not keywords or not config_paths:
+            print("❌ 请通过 --keywords / --category 指定关键字，并确认 --configs 能匹配到配置文件")
+            return
+
+        print(f"将预热 {len(keywords)} 个关键字 × {len(config_paths)} 个配置文件 "
+              f"= {len(keywords) * len(config_paths)} 次检索")
+        if args.at:
+            _wait_until(args.at)
+
+        from scholar_crawler import ScholarCrawler
+        cache = PageCache(args.db)
+        crawler = ScholarCrawler(use_proxy=args.proxy, cache=cache)
+        try:
+            prewarm(keywords, config_paths, args.max, crawler)
+        except KeyboardInterrupt:
+            print("\n⚠ 预热已中断（已写入的结果页保留在缓存中）")
+        finally:
+            crawler.close()
+        print(f"\n🗄 {cache.summary()}")
+
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
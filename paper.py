@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文献记录
+Paper 用 __slots__ 保存一篇文献的字段（引用数为 int，年份为 int 或 None，作者为元组），
+比每篇文献一个 9 键字典占用更少的内存（对象本身 104 字节，字典 272 字节；
+连同作者字段每篇约节省 150 字节），筛选和排序时按属性访问。
+同时实现只读的 Mapping 接口，paper['authors'] 等旧写法得到与原来字典相同的值
+（缺失字段为 'N/A'，作者以 '; ' 连接，年份为字符串），CSV 导出和运行记录的格式不变
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+
+# 缺失字段在字典视图和 CSV 中的显示值
+MISSING = 'N/A'
+
+# 作者在字典视图和 CSV 中的分隔符
+AUTHOR_SEPARATOR = '; '
+
+
+def _text(value) -> Optional[str]:
+    """文本字段：空值和 'N/A' 记为 None"""
+    if value is None:
+        return None
+    value = str(value)
+    return None if value in ('', MISSING, 'NA') else value
+
+
+def parse_year(value) -> Optional[int]:
+    """年份转为 int，缺失或无法识别时为 None"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+def parse_citations(value) -> int:
+    """引用数转为 int，缺失或无法识别时为 0"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_authors(value) -> Tuple[str, ...]:
+    """
+    作者转为元组
+
+    支持列表、BibTeX 格式 "A and B" 和字典视图 / CSV 中的 "A; B"。
+    """
+    if not value:
+        return ()
+    if isinstance(value, str):
+        if value == MISSING:
+            return ()
+        if ' and ' in value:
+            value = value.split(' and ')
+        elif AUTHOR_SEPARATOR in value:
+            value = value.split(AUTHOR_SEPARATOR)
+        else:
+            return (value,)
+    return tuple(str(author).strip() for author in value)
+
+
+class Paper(Mapping):
+    """
+    一篇文献
+
+    属性访问返回类型化的值；按键访问（paper['year']）返回与原字典格式相同的值。
+    """
+
+    # 字段顺序即 CSV 列顺序
+    FIELDS = ('title', 'authors', 'year', 'venue', 'publisher',
+              'citations', 'abstract', 'url', 'eprint_url')
+
+    __slots__ = FIELDS
+
+    def __init__(self, title: Optional[str] = None, authors: Iterable[str] = (),
+                 year: Optional[int] = None, venue: Optional[str] = None,
+                 publisher: Optional[str] = None, citations: int = 0,
+                 abstract: Optional[str] = None, url: Optional[str] = None,
+                 eprint_url: Optional[str] = None):
+        """
+        Args:
+            title: 标题
+            authors: 作者列表
+            year: 发表年份
+            venue: 会议 / 期刊名
+            publisher: 出版商
+            citations: 引用数
+            abstract: 摘要
+            url: 文献链接
+            eprint_url: 全文链接
+        """
+        self.title = _text(title)
+        self.authors = parse_authors(authors)
+        self.year = parse_year(year)
+        self.venue = _text(venue)
+        self.publisher = _text(publisher)
+        self.citations = parse_citations(citations)
+        self.abstract = _text(abstract)
+        self.url = _text(url)
+        self.eprint_url = _text(eprint_url)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Paper':
+        """从旧格式的字典（运行记录、CSV 行）创建"""
+        return cls(**{field: data.get(field) for field in cls.FIELDS})
+
+    def to_dict(self) -> Dict:
+        """旧格式的字典（写入运行记录和 CSV）"""
+        return {field: self[field] for field in self.FIELDS}
+
+    def intern(self, symbols) -> 'Paper':
+        """
+        用符号表驻留会议/期刊、出版商和作者（相同的字符串共享同一个对象）
+
+        Args:
+            symbols: symbols.SymbolTable
+
+        Returns:
+            本记录
+        """
+        self.venue = symbols.intern(self.venue)
+        self.publisher = symbols.intern(self.publisher)
+        self.authors = tuple(map(symbols.intern, self.authors))
+        return self
+
+    @property
+    def authors_text(self) -> str:
+        """以 '; ' 连接的作者"""
+        return AUTHOR_SEPARATOR.join(self.authors)
+
+    # ---------- Mapping 接口（旧的字典写法） ----------
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        if key == 'authors':
+            return self.authors_text
+        value = getattr(self, key)
+        if value is None:
+            return MISSING
+        # 原字典中的年份是 scholarly 返回的字符串
+        return str(value) if key == 'year' else value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __contains__(self, key) -> bool:
+        return key in self.__slots__
+
+    def __repr__(self):
+        return (f"Paper(title={self.title!r}, year={self.year!r}, "
+                f"citations={self.citations!r})")
+
+
+def as_paper(record) -> Paper:
+    """Paper 原样返回，旧格式的字典转换为 Paper"""
+    return record if isinstance(record, Paper) else Paper.from_dict(record)
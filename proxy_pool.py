@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+代理池
+加载自定义代理与免费代理，按延迟和成功率评分，每个健康代理作为独立的抓取通道
+"""
+
+import time
+import queue
+import threading
+from typing import Dict, List, Optional
+
+import httpx
+
+from throttle import BlockedError
+
+try:
+    from scholarly._navigator import Navigator
+except ImportError:
+    Navigator = None
+
+
+# 代理检测地址（只验证连通性和延迟）
+DEFAULT_CHECK_URL = "http://httpbin.org/ip"
+
+_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+               "(KHTML, like Gecko) Chrome/120.0 Safari/537.36")
+
+
+def normalize_proxy(url: str) -> str:
+    """补全代理地址的协议前缀"""
+    url = url.strip()
+    if '://' not in url:
+        url = 'http://' + url
+    return url
+
+
+class ProxyInfo:
+    """单个代理的健康状态"""
+
+    # 延迟的指数移动平均系数
+    LATENCY_ALPHA = 0.3
+
+    def __init__(self, url: str, source: str = 'custom'):
+        """
+        Args:
+            url: 代理地址，例如 http://127.0.0.1:7890
+            source: 来源（custom / free）
+        """
+        self.url = normalize_proxy(url)
+        self.source = source
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency: Optional[float] = None
+        self.last_checked: Optional[float] = None
+
+    def record_success(self, latency: float):
+        """记录一次成功请求及其耗时（秒）"""
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.last_checked = time.time()
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.LATENCY_ALPHA * (latency - self.latency)
+
+    def record_failure(self):
+        """记录一次失败请求"""
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_checked = time.time()
+
+    @property
+    def success_rate(self) -> float:
+        """成功率（拉普拉斯平滑，未使用过的代理为 0.5）"""
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    @property
+    def score(self) -> float:
+        """综合评分：成功率越高、延迟越低，分数越高"""
+        latency = self.latency if self.latency is not None else 5.0
+        return self.success_rate / (1.0 + latency)
+
+    def __repr__(self):
+        latency = f"{self.latency:.2f}s" if self.latency is not None else "-"
+        return (f"ProxyInfo({self.url}, score={self.score:.3f}, "
+                f"ok={self.successes}, fail={self.failures}, latency={latency})")
+
+
+class ProxyLane:
+    """
+    代理抓取通道
+
+    每个通道持有独立的 HTTP 连接和限速键，scholarly 的页面请求可以通过
+    transport.use_lane 路由到这里。
+    """
+
+    def __init__(self, proxy: ProxyInfo, timeout: float = 10.0):
+        self.proxy = proxy
+        self.key = f"proxy:{proxy.url}"
+        self._client = httpx.Client(
+            proxy=proxy.url,
+            timeout=timeout,
+            follow_redirects=True,
+            headers={'User-Agent': _USER_AGENT, 'Accept-Language': 'en-US,en'},
+        )
+
+    def get_page(self, url: str) -> str:
+        """
+        通过该代理获取页面
+
+        Raises:
+            BlockedError: 遇到验证码、403 或 429
+        """
+        resp = self._client.get(url)
+        if resp.status_code in (403, 429):
+            error = BlockedError(f"HTTP {resp.status_code} via {self.proxy.url}")
+            error.status_code = resp.status_code
+            raise error
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code} via {self.proxy.url}")
+        text = resp.text
+        # 复用 scholarly 的验证码识别（遇到 DOS 验证页时会抛出 DOSException）
+        if Navigator is not None and Navigator()._requests_has_captcha(text):
+            raise BlockedError(f"captcha via {self.proxy.url}")
+        return text
+
+    def close(self):
+        """关闭该通道的 HTTP 连接（可重复调用）"""
+        self._client.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._client.is_closed
+
+    def __repr__(self):
+        return f"ProxyLane({self.proxy.url})"
+
+
+class ProxyPool:
+    """
+    代理池
+
+    管理候选代理的健康评分，并为健康代理创建抓取通道。
+    """
+
+    def __init__(self, check_url: str = DEFAULT_CHECK_URL, timeout: float = 5.0,
+                 max_failures: int = 3):
+        """
+        Args:
+            check_url: 检测代理时访问的地址
+            timeout: 单个请求超时时间（秒）
+            max_failures: 连续失败多少次后视为不健康
+        """
+        self.check_url = check_url
+        self.timeout = timeout
+        self.max_failures = max_failures
+        self._proxies: Dict[str, ProxyInfo] = {}
+        # 已创建、尚未关闭的抓取通道（关闭代理池时一并关闭）
+        self._lanes: List[ProxyLane] = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._proxies)
+
+    def add(self, url: str, source: str = 'custom') -> ProxyInfo:
+        """加入一个候选代理（重复加入时返回已有记录）"""
+        url = normalize_proxy(url)
+        with self._lock:
+            info = self._proxies.get(url)
+            if info is None:
+                info = ProxyInfo(url, source)
+                self._proxies[url] = info
+            return info
+
+    def get(self, url: str) -> Optional[ProxyInfo]:
+        return self._proxies.get(normalize_proxy(url))
+
+    def load_custom(self, config_module=None) -> int:
+        """
+        从 config 加载自定义代理（CUSTOM_PROXY 与 PROXY_LIST）
+
+        Returns:
+            加载的代理数量
+        """
+        if config_module is None:
+            import config as config_module
+
+        urls = []
+        custom = getattr(config_module, 'CUSTOM_PROXY', None) or {}
+        urls.extend(u for u in (custom.get('http'), custom.get('https')) if u)
+        urls.extend(getattr(config_module, 'PROXY_LIST', None) or [])
+
+        before = len(self)
+        for url in urls:
+            self.add(url, 'custom')
+        return len(self) - before
+
+    def load_free(self, limit: int = 20) -> int:
+        """
+        从 free-proxy 加载免费代理（只加入候选列表，不做检测）
+
+        Returns:
+            加载的代理数量
+        """
+        try:
+            from fp.fp import FreeProxy
+        except ImportError:
+            print("⚠ 未安装 free-proxy，跳过免费代理")
+            return 0
+
+        try:
+            candidates = FreeProxy().get_proxy_list(repeat=False)
+        except Exception as e:
+            print(f"⚠ 获取免费代理列表失败: {e}")
+            return 0
+
+        before = len(self)
+        for url in candidates[:limit]:
+            self.add(url, 'free')
+        return len(self) - before
+
+    def check(self, proxy: ProxyInfo) -> bool:
+        """
+        检测单个代理，并更新其延迟与成功率
+
+        Returns:
+            代理是否可用
+        """
+        start = time.monotonic()
+        try:
+            with httpx.Client(proxy=proxy.url, timeout=self.timeout) as client:
+                resp = client.get(self.check_url)
+            ok = resp.status_code == 200
+        except Exception:
+            ok = False
+
+        if ok:
+            self.record_success(proxy.url, time.monotonic() - start)
+        else:
+            self.record_failure(proxy.url)
+        return ok
+
+    def check_all(self) -> int:
+        """
+        逐个检测所有候选代理（启动时建议使用 preflight）
+
+        Returns:
+            检测通过的代理数量
+        """
+        return sum(1 for proxy in self.proxies() if self.check(proxy))
+
+    def preflight(self, min_ready: int = 2, deadline: float = 10.0,
+                  workers: int = 16) -> int:
+        """
+        并发检测尚未检测过的候选代理
+
+        有 min_ready 个代理通过、全部检测完成或超过 deadline 秒时立即返回；
+        未完成的检测在后台线程中继续进行，通过的代理随后出现在 healthy() 中。
+
+        Args:
+            min_ready: 通过多少个代理即可开始搜索
+            deadline: 最长等待时间（秒）
+            workers: 并发检测线程数
+
+        Returns:
+            返回时的健康代理数量
+        """
+        candidates = [p for p in self.proxies() if p.last_checked is None]
+        if not candidates:
+            return len(self.healthy())
+
+        todo = queue.Queue()
+        for proxy in candidates:
+            todo.put(proxy)
+
+        cond = threading.Condition()
+        state = {'passed': 0, 'done': 0}
+
+        def worker():
+            while True:
+                try:
+                    proxy = todo.get_nowait()
+                except queue.Empty:
+                    return
+                ok = self.check(proxy)
+                with cond:
+                    state['done'] += 1
+                    state['passed'] += ok
+                    cond.notify_all()
+
+        for _ in range(min(workers, len(candidates))):
+            # 守护线程：程序退出时不等待剩余检测
+            threading.Thread(target=worker, daemon=True, name='proxy-preflight').start()
+
+        with cond:
+            cond.wait_for(lambda: state['passed'] >= min_ready
+                          or state['done'] >= len(candidates), timeout=deadline)
+        return len(self.healthy())
+
+    def record_success(self, url: str, latency: float):
+        with self._lock:
+            info = self._proxies.get(normalize_proxy(url))
+            if info:
+                info.record_success(latency)
+
+    def record_failure(self, url: str):
+        with self._lock:
+            info = self._proxies.get(normalize_proxy(url))
+            if info:
+                info.record_failure()
+
+    def is_healthy(self, proxy: ProxyInfo) -> bool:
+        """至少成功过一次，且连续失败次数未超过上限"""
+        return proxy.successes > 0 and proxy.consecutive_failures < self.max_failures
+
+    def proxies(self) -> List[ProxyInfo]:
+        """所有候选代理"""
+        with self._lock:
+            return list(self._proxies.values())
+
+    def healthy(self, limit: Optional[int] = None) -> List[ProxyInfo]:
+        """
+        按评分从高到低返回健康代理
+
+        Args:
+            limit: 最多返回的数量
+        """
+        ranked = sorted((p for p in self.proxies() if self.is_healthy(p)),
+                        key=lambda p: p.score, reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def open_lane(self, proxy: ProxyInfo, timeout: float = 10.0) -> ProxyLane:
+        """为一个代理创建抓取通道（由代理池跟踪，close() 时关闭）"""
+        lane = ProxyLane(proxy, timeout)
+        with self._lock:
+            self._lanes.append(lane)
+        return lane
+
+    def close_lane(self, lane: ProxyLane):
+        """关闭一个抓取通道（代理被停用时调用）"""
+        with self._lock:
+            if lane in self._lanes:
+                self._lanes.remove(lane)
+        lane.close()
+
+    def lanes(self, limit: Optional[int] = None, timeout: float = 10.0) -> List[ProxyLane]:
+        """为健康代理创建抓取通道"""
+        return [self.open_lane(proxy, timeout) for proxy in self.healthy(limit)]
+
+    def close(self):
+        """关闭所有未关闭的抓取通道"""
+        with self._lock:
+            lanes, self._lanes = self._lanes, []
+        for lane in lanes:
+            lane.close()
+
+    def summary(self) -> str:
+        """代理池状态摘要"""
+        healthy = self.healthy()
+        lines = [f"代理池: {len(self)} 个候选, {len(healthy)} 个健康"]
+        for proxy in healthy[:10]:
+            lines.append(f"  {proxy!r}")
+        return "\n".join(lines)
+
+
+def build_pool_from_config(config_module=None, include_free: bool = True) -> ProxyPool:
+    """
+    按 config 构建代理池（加载自定义代理与免费代理，但不做检测）
+
+    Args:
+        config_module: 配置模块（默认 config）
+        include_free: 是否加载免费代理
+    """
+    if config_module is None:
+        import config as config_module
+
+    pool = ProxyPool(
+        check_url=getattr(config_module, 'PROXY_CHECK_URL', DEFAULT_CHECK_URL),
+        timeout=getattr(config_module, 'PROXY_TIMEOUT', 5.0),
+        max_failures=getattr(config_module, 'PROXY_MAX_FAILURES', 3),
+    )
+    pool.load_custom(config_module)
+    if include_free:
+        pool.load_free(getattr(config_module, 'FREE_PROXY_LIMIT', 20))
+    return pool
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+查询规划
+把高级检索配置中 Google Scholar 能在服务器端执行的条件下推到请求参数里，
+本地筛选只处理服务器无法执行的条件
+"""
+
+import hashlib
+import json
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+from backends import PAGE_SIZE
+
+
+# Google Scholar 查询字符串长度上限（超出部分会被截断）
+DEFAULT_MAX_QUERY_LENGTH = 256
+
+# 未下推会议/期刊条件时，结果中满足该条件的比例（先验估计）
+DEFAULT_VENUE_SELECTIVITY = 0.2
+
+# 拆分成多个查询后，各查询结果之间的重复比例（先验估计）
+DEFAULT_SPLIT_OVERLAP = 0.1
+
+# 有引用量条件时本地筛选的通过率（先验估计）
+_CITATION_ACCEPTANCE = 0.5
+
+# 会议/期刊全称中不计入缩写的词
+_STOPWORDS = {'of', 'on', 'and', 'the', 'for', 'in', 'to', 'a', 'an', '&'}
+
+
+# 查询中的布尔运算符（必须保持大写）
+_OPERATORS = {'OR', 'AND'}
+
+
+def normalize_term(term: str) -> str:
+    """
+    规范化单个检索词：去掉首尾空白、合并连续空白、转为小写（布尔运算符 OR / AND 除外）
+
+    Google Scholar 检索不区分大小写，规范化后语义相同的检索词得到相同的字符串。
+    """
+    return ' '.join(w if w in _OPERATORS else w.casefold() for w in str(term).split())
+
+
+def canonical_terms(terms) -> List[str]:
+    """规范化一组检索词：逐个规范化后去重、排序（OR 组和排除词与顺序无关）"""
+    return sorted({normalize_term(t) for t in terms or [] if str(t).strip()})
+
+
+def canonical_form(base_keyword: str, config=None) -> Dict:
+    """
+    关键字 + 高级检索配置的规范形式
+
+    只包含影响检索结果的条件（排序方式不影响抓取到哪些文献，不计入），
+    语义相同的配置（列表顺序、重复项、大小写、空白不同）得到相同的结果。
+
+    Args:
+        base_keyword: 基础关键字
+        config: 高级检索配置（AdvancedSearchConfig，可选）
+
+    Returns:
+        可 JSON 序列化的字典
+    """
+    form = {'keyword': normalize_term(base_keyword)}
+    if config is None:
+        return form
+    additional = canonical_terms(config.additional_keywords)
+    form.update({
+        'authors': canonical_terms(config.authors),
+        'years': [config.year_start or None, config.year_end or None],
+        'publishers': canonical_terms(config.publishers),
+        'venues': canonical_terms(config.venues),
+        'citations': [config.citations_min or 0, config.citations_max or None],
+        'additional_keywords': additional,
+        # 只有一个额外关键字时 AND / OR 等价
+        'keyword_mode': str(config.keyword_mode).upper() if len(additional) > 1 else None,
+        'exclude_keywords': canonical_terms(config.exclude_keywords),
+        'paper_types': canonical_terms(getattr(config, 'paper_types', [])),
+    })
+    return {key: value for key, value in form.items()
+            if value not in ([], None, [None, None], [0, None])}
+
+
+def canonical_hash(base_keyword: str, config=None, *extra) -> str:
+    """
+    规范形式的稳定哈希（sha1 十六进制），用作缓存、任务队列和运行记录的键
+
+    Args:
+        base_keyword: 基础关键字
+        config: 高级检索配置（可选）
+        extra: 其他需要区分的参数，例如目标数量、年份切片
+    """
+    raw = json.dumps([canonical_form(base_keyword, config), *extra],
+                     ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _is_acronym(venue: str) -> bool:
+    """是否为缩写（如 CVPR、NeurIPS）：单个词且含至少两个大写字母"""
+    return ' ' not in venue.strip() and sum(c.isupper() for c in venue) >= 2
+
+
+def _initials(name: str) -> str:
+    """
+    全称的首字母（忽略虚词，全大写的词保留全部字母），
+    例如 Computer Vision and Pattern Recognition → CVPR，North American Chapter of the ACL → NACACL
+    """
+    words = [w for w in re.split(r'[\s/\-]+', name) if w and w.lower() not in _STOPWORDS]
+    return ''.join(w if w.isupper() else w[0].upper() for w in words)
+
+
+def _is_subsequence(short: str, long: str) -> bool:
+    it = iter(long)
+    return all(c in it for c in short)
+
+
+def pushable_venues(venues: List[str]) -> Optional[List[str]]:
+    """
+    判断会议/期刊列表能否安全地下推为 source: 子句
+
+    source: 匹配的是出版物全称，缩写（CVPR）通常无法命中。只有当每个缩写都能在
+    列表中找到对应的全称（首字母包含该缩写的字母）时，才用全称下推；否则下推会
+    漏掉只能靠缩写识别的文献，返回 None。
+
+    Returns:
+        用于 source: 子句的全称列表，不能安全下推时为 None
+    """
+    full_names = [v.strip() for v in venues if v.strip() and not _is_acronym(v)]
+    if not full_names:
+        return None
+    for venue in venues:
+        if not _is_acronym(venue):
+            continue
+        letters = ''.join(c for c in venue if c.isupper())
+        if not any(_is_subsequence(letters, _initials(name)) for name in full_names):
+            return None
+    return full_names
+
+
+def _or_clause(terms: List[str]) -> str:
+    if len(terms) == 1:
+        return terms[0]
+    return f"({' OR '.join(terms)})"
+
+
+class QueryPlan:
+    """
+    一次搜索的执行计划
+
+    Attributes:
+        queries: 发送给 Google Scholar 的查询字符串（多个时并发执行后合并去重）
+        year_low: 起始年份（as_ylo 参数）
+        year_high: 结束年份（as_yhi 参数）
+        local_skip: 已由服务器执行、本地筛选时跳过的字段
+        pushed: 下推到服务器的条件说明（用于显示）
+        notes: 规划决策说明（用于显示）
+    """
+
+    def __init__(self, queries, year_low: Optional[int] = None,
+                 year_high: Optional[int] = None, local_skip: Tuple[str, ...] = (),
+                 pushed: Optional[List[str]] = None, notes: Optional[List[str]] = None):
+        self.queries = [queries] if isinstance(queries, str) else list(queries)
+        self.year_low = year_low
+        self.year_high = year_high
+        self.local_skip = tuple(local_skip)
+        self.pushed = list(pushed or [])
+        self.notes = list(notes or [])
+
+    @property
+    def query(self) -> str:
+        """查询字符串（拆分时为多个查询以 | 连接，仅用于显示）"""
+        return ' | '.join(self.queries)
+
+    @property
+    def is_split(self) -> bool:
+        return len(self.queries) > 1
+
+    def search_args(self) -> dict:
+        """传给 SearchBackend.search 的年份参数"""
+        return {'year_low': self.year_low, 'year_high': self.year_high}
+
+    def __str__(self):
+        lines = [f"  服务器端筛选: {'; '.join(self.pushed) if self.pushed else '无'}"]
+        for note in self.notes:
+            lines.append(f"  {note}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return (f"QueryPlan({self.queries!r}, year_low={self.year_low}, "
+                f"year_high={self.year_high}, local_skip={self.local_skip})")
+
+
+class _QueryBuilder:
+    """
+    拼接规范化的查询字符串，可替换其中的 OR 组
+
+    各组内的条件规范化、去重并排序，语义相同的配置生成相同的查询（从而共享缓存）。
+    """
+
+    def __init__(self, base_keyword: str, config):
+        self.base = normalize_term(base_keyword)
+        self.config = config
+        self.groups: Dict[str, List[str]] = {}
+        self.and_keywords: List[str] = []
+        self.excludes = canonical_terms(config.exclude_keywords)
+        authors = canonical_terms(config.authors)
+        if authors:
+            self.groups['authors'] = [f'author:"{author}"' for author in authors]
+        keywords = canonical_terms(config.additional_keywords)
+        if str(config.keyword_mode).upper() == "AND":
+            self.and_keywords = keywords
+        elif keywords:
+            self.groups['keywords'] = keywords
+
+    def build(self, overrides: Optional[Dict[str, List[str]]] = None) -> str:
+        groups = dict(self.groups)
+        groups.update(overrides or {})
+        parts = [self.base]
+        if groups.get('authors'):
+            parts.append(_or_clause(groups['authors']))
+        parts.extend(self.and_keywords)
+        if groups.get('keywords'):
+            parts.append(_or_clause(groups['keywords']))
+        if groups.get('venues'):
+            parts.append(_or_clause(groups['venues']))
+        for exclude in self.excludes:
+            parts.append(f"-{exclude}")
+        return " ".join(parts)
+
+    def split(self, name: str, max_length: int) -> List[str]:
+        """
+        把 OR 组拆成若干块，使每个查询都不超过长度上限
+
+        单个条件仍然超长时单独成为一个查询。
+        """
+        chunks: List[List[str]] = []
+        for term in self.groups[name]:
+            if chunks and len(self.build({name: chunks[-1] + [term]})) <= max_length:
+                chunks[-1].append(term)
+            else:
+                chunks.append([term])
+        return [self.build({name: chunk}) for chunk in chunks]
+
+
+def build_query(base_keyword: str, config=None) -> str:
+    """
+    规范化的查询字符串（关键字、作者、额外关键字、排除词；不含会议/期刊）
+
+    Args:
+        base_keyword: 基础关键字
+        config: 高级检索配置（可选）
+    """
+    if config is None:
+        return normalize_term(base_keyword)
+    return _QueryBuilder(base_keyword, config).build()
+
+
+def _pages_needed(accepted: float, acceptance: float) -> int:
+    """得到 accepted 篇通过筛选的文献预计需要的结果页数"""
+    return max(1, math.ceil(accepted / (PAGE_SIZE * acceptance)))
+
+
+def plan_query(base_keyword: str, config=None, max_results: int = 50,
+               settings=None) -> QueryPlan:
+    """
+    根据高级检索配置生成执行计划
+
+    下推规则:
+        年份范围   → as_ylo / as_yhi 参数，服务器按出版年份过滤，本地不再检查
+        作者       → author:"..." 子句，摘要页中的作者是缩写且可能被截断，
+                     本地子串匹配会误删，因此本地不再检查
+        会议/期刊  → 可安全下推时（见 pushable_venues）生成 source:"..." 子句，本地不再检查
+        排除词     → -word 子句
+    引用量和出版商仍在本地筛选。
+
+    查询超过长度上限时，按预计抓取页数决定：把最长的 OR 组拆成多个较窄的查询
+    并发执行（合并去重），或者放弃会议/期刊下推、改为本地筛选。
+
+    Args:
+        base_keyword: 基础关键字
+        config: 高级检索配置（AdvancedSearchConfig，可选）
+        max_results: 目标文献数量（用于估算抓取成本）
+        settings: 配置模块（默认 config），提供 MAX_QUERY_LENGTH 等参数
+
+    Returns:
+        执行计划
+    """
+    if config is None:
+        return QueryPlan(normalize_term(base_keyword))
+    if settings is None:
+        import config as settings
+
+    max_length = getattr(settings, 'MAX_QUERY_LENGTH', DEFAULT_MAX_QUERY_LENGTH)
+    venue_selectivity = getattr(settings, 'VENUE_SELECTIVITY', DEFAULT_VENUE_SELECTIVITY)
+    overlap = getattr(settings, 'SPLIT_OVERLAP', DEFAULT_SPLIT_OVERLAP)
+
+    skip = []
+    pushed = []
+    notes = []
+
+    year_low = config.year_start or None
+    year_high = config.year_end or None
+    if year_low and year_high and year_low > year_high:
+        # 范围无效时交给本地筛选（结果为空），不发送矛盾的参数
+        year_low = year_high = None
+    if year_low or year_high:
+        skip.append('year')
+        pushed.append(f"年份 {year_low or '不限'} - {year_high or '不限'}")
+
+    if config.authors:
+        skip.append('authors')
+        pushed.append(f"作者 {', '.join(config.authors)}")
+
+    builder = _QueryBuilder(base_keyword, config)
+
+    venues = pushable_venues(config.venues) if config.venues else None
+    if config.venues and venues is None:
+        notes.append("会议/期刊含无法对应全称的缩写，改为本地筛选")
+    if venues:
+        builder.groups['venues'] = [f'source:"{v}"' for v in canonical_terms(venues)]
+
+    if config.exclude_keywords:
+        pushed.append(f"排除 {', '.join(config.exclude_keywords)}")
+
+    queries = [builder.build()]
+    if len(queries[0]) > max_length and builder.groups:
+        # 拆分最长的 OR 组
+        name = max(builder.groups, key=lambda g: len(' OR '.join(builder.groups[g])))
+        split_queries = builder.split(name, max_length)
+
+        acceptance = _CITATION_ACCEPTANCE if (config.citations_min or config.citations_max) else 1.0
+        k = len(split_queries)
+        split_cost = k * _pages_needed(math.ceil(max_results / k) * (1 + overlap), acceptance)
+
+        if name == 'venues':
+            # 另一种选择：不下推会议/期刊，拿一个查询在本地筛选
+            builder.groups.pop('venues')
+            local_query = builder.build()
+            local_cost = _pages_needed(max_results, acceptance * venue_selectivity)
+            if len(local_query) <= max_length and local_cost < split_cost:
+                queries = [local_query]
+                venues = None
+                notes.append(f"查询过长：本地筛选会议/期刊（预计 {local_cost} 页）"
+                             f"比拆分成 {k} 个查询（预计 {split_cost} 页）更省")
+            else:
+                queries = split_queries
+                notes.append(f"查询过长：拆分成 {k} 个查询并发执行（预计 {split_cost} 页，"
+                             f"本地筛选会议/期刊预计 {local_cost} 页）")
+        else:
+            queries = split_queries
+            notes.append(f"查询超过 {max_length} 个字符：拆分成 {k} 个查询并发执行后合并去重")
+
+    if venues:
+        skip.append('venue')
+        pushed.append(f"会议/期刊 {', '.join(venues)}")
+
+    return QueryPlan(queries, year_low, year_high, tuple(skip), pushed, notes)
@@ -7,6 +7,8 @@
 """
 
 from scholar_crawler import ScholarCrawler
+from journal import new_run_id
+from job_queue import JobQueue, run_worker, print_status
 import config
 
 
@@ -181,8 +183,9 @@ def quick_start():
     
     try:
         crawler = ScholarCrawler(use_proxy=use_proxy)
-        papers = crawler.search_papers(keyword, max_results=max_results, 
-                                       advanced_config=advanced_config)
+        with crawler:
+            papers = crawler.search_papers(keyword, max_results=max_results, 
+                                           advanced_config=advanced_config)
         
         if not papers:
             print("❌ 未获取到任何文献")
@@ -215,46 +218,66 @@ def batch_search():
 ╚══════════════════════════════════════════════════════════╝
 """)
     
-    print("请选择批量搜索类别:")
-    print("  1. 人工智能 (6个关键字)")
-    print("  2. 计算机视觉 (6个关键字)")
-    print("  3. 自然语言处理 (6个关键字)")
-    print("  4. 推荐系统 (5个关键字)")
-    print("  5. 数据挖掘 (6个关键字)")
-    print("  6. 大数据 (5个关键字)")
-    print("  7. 全部 (所有预设关键字)")
+    queue = JobQueue()
     
-    choice = input("\n请选择 (1-7): ").strip()
-    
-    cat_map = {
-        '1': ('ai', config.AI_KEYWORDS),
-        '2': ('cv', config.CV_KEYWORDS),
-        '3': ('nlp', config.NLP_KEYWORDS),
-        '4': ('recsys', config.RECSYS_KEYWORDS),
-        '5': ('dm', config.DM_KEYWORDS),
-        '6': ('bigdata', config.BIGDATA_KEYWORDS),
-        '7': ('all', config.get_all_keywords()),
-    }
-    
-    if choice not in cat_map:
-        print("❌ 无效选择")
-        return
-    
-    cat_name, keywords = cat_map[choice]
-    
-    print(f"\n将搜索以下 {len(keywords)} 个关键字:")
-    for i, kw in enumerate(keywords, 1):
-        print(f"  {i}. {kw}")
-    
-    max_results = input(f"\n每个关键字的最大文献数 (默认: 20): ").strip()
-    max_results = int(max_results) if max_results.isdigit() else 20
-    
-    use_proxy = input("是否使用代理? (y/n, 默认: n): ").strip().lower() == 'y'
+    # 继续中断的批量运行
+    batch = input("继续中断的批量运行? 输入批次编号 (直接回车开始新的运行): ").strip()
+    if batch:
+        if batch not in queue.batches():
+            print(f"❌ 批次不存在: {batch}")
+            return
+        print_status(queue, batch)
+        queue.requeue_failed(batch)
+        use_proxy = input("是否使用代理? (y/n, 默认: n): ").strip().lower() == 'y'
+    else:
+        print("请选择批量搜索类别:")
+        print("  1. 人工智能 (6个关键字)")
+        print("  2. 计算机视觉 (6个关键字)")
+        print("  3. 自然语言处理 (6个关键字)")
+        print("  4. 推荐系统 (5个关键字)")
+        print("  5. 数据挖掘 (6个关键字)")
+        print("  6. 大数据 (5个关键字)")
+        print("  7. 全部 (所有预设关键字)")
+        
+        choice = input("\n请选择 (1-7): ").strip()
+        
+        cat_map = {
+            '1': ('ai', config.AI_KEYWORDS),
+            '2': ('cv', config.CV_KEYWORDS),
+            '3': ('nlp', config.NLP_KEYWORDS),
+            '4': ('recsys', config.RECSYS_KEYWORDS),
+            '5': ('dm', config.DM_KEYWORDS),
+            '6': ('bigdata', config.BIGDATA_KEYWORDS),
+            '7': ('all', config.get_all_keywords()),
+        }
+        
+        if choice not in cat_map:
+            print("❌ 无效选择")
+            return
+        
+        cat_name, keywords = cat_map[choice]
+        
+        print(f"\n将搜索以下 {len(keywords)} 个关键字:")
+        for i, kw in enumerate(keywords, 1):
+            print(f"  {i}. {kw}")
+        
+        max_results = input(f"\n每个关键字的最大文献数 (默认: 20): ").strip()
+        max_results = int(max_results) if max_results.isdigit() else 20
+        
+        use_proxy = input("是否使用代理? (y/n, 默认: n): ").strip().lower() == 'y'
+        
+        confirm = input(f"\n确认批量搜索 {len(keywords)} 个关键字? (y/n): ").strip().lower()
+        if confirm != 'y':
+            print("❌ 已取消")
+            return
+        
+        batch = f"{cat_name}_{new_run_id()}"
+        for keyword in keywords:
+            queue.enqueue(batch, keyword, max_results=max_results)
+        print(f"\n📦 批次编号: {batch}（中断后在批量搜索中输入该编号继续）")
     
-    confirm = input(f"\n确认批量搜索 {len(keywords)} 个关键字? (y/n): ").strip().lower()
-    if confirm != 'y':
-        print("❌ 已取消")
-        return
+    print("   可在其他终端（或共享队列数据库的主机）上运行以下命令加入抓取:")
+    print(f"   python job_queue.py work --batch {batch}")
     
     # 执行批量搜索
     print("\n" + "="*60)
@@ -263,40 +286,28 @@ def batch_search():
     
     crawler = ScholarCrawler(use_proxy=use_proxy)
     
-    from datetime import datetime
-    import time
-    
-    for i, keyword in enumerate(keywords, 1):
-        print(f"\n[{i}/{len(keywords)}] 搜索: {keyword}")
-        print("-"*60)
-        
-        try:
-            papers = crawler.search_papers(keyword, max_results=max_results)
-            
-            if papers:
-                papers = crawler.sort_by_citations(papers)
-                
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                safe_keyword = keyword.replace(' ', '_').replace('/', '_')
-                output_file = f"{config.OUTPUT_DIR}/{cat_name}_{safe_keyword}_{timestamp}.csv"
-                
-                crawler.export_to_csv(papers, output_file, keyword)
-            
-            # 在关键字之间添加延迟
-            if i < len(keywords):
-                print("\n⏳ 等待5秒后继续...")
-                time.sleep(5)
-        
-        except KeyboardInterrupt:
-            print("\n\n⚠ 用户中断批量搜索")
-            break
-        except Exception as e:
-            print(f"❌ 搜索 '{keyword}' 时出错: {e}")
-            continue
+    try:
+        run_worker(queue, crawler, batch)
+    except KeyboardInterrupt:
+        print("\n\n⚠ 用户中断批量搜索")
+        print(f"   可在批量搜索中输入批次编号 {batch} 继续")
+        return
+    finally:
+        crawler.close()
     
+    stats = queue.stats(batch)
     print("\n" + "="*60)
-    print("✓ 批量搜索完成！")
+    if stats['leased']:
+        print(f"✓ 本进程的任务已完成，其他 worker 仍在执行 {stats['leased']} 个任务")
+    else:
+        print("✓ 批量搜索完成！")
     print("="*60)
+    print_status(queue, batch)
+    if stats['deferred']:
+        print(f"⏸ {stats['deferred']} 个关键字的查询在失败冷却期内，已推迟；"
+              f"稍后输入批次编号 {batch} 继续")
+    if stats['failed']:
+        print(f"⚠ {stats['failed']} 个关键字搜索失败，可输入批次编号 {batch} 重试")
     print(f"📁 所有结果已保存到: {config.OUTPUT_DIR}/ 目录")
 
 
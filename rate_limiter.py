@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+请求速率限制
+基于令牌桶，按出口标识（直连 / 代理地址）分别限速
+"""
+
+import time
+import asyncio
+import threading
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """
+    令牌桶限速器
+
+    每秒补充 rate 个令牌，最多累积 burst 个。每次 HTTP 请求消耗一个令牌，
+    令牌不足时等待。线程安全，同时提供同步和异步两种获取方式。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒允许的请求数
+            burst: 允许的突发请求数（桶容量）
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _reserve(self) -> float:
+        """预占一个令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def set_rate(self, rate: float):
+        """调整速率（先按旧速率结算已累积的令牌）"""
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def drain(self):
+        """清空已累积的令牌（被限制访问后避免立即突发）"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = time.monotonic()
+
+    def acquire(self):
+        """获取一个令牌（阻塞）"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """获取一个令牌（异步等待）"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @property
+    def available(self) -> float:
+        """当前可用令牌数"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class RateLimiterRegistry:
+    """
+    按出口标识管理令牌桶
+
+    同一个代理（或直连）的所有请求共享一个令牌桶，不同出口互不影响。
+    """
+
+    def __init__(self, requests: float, window: float, burst: int = 1):
+        """
+        初始化
+
+        Args:
+            requests: 每个窗口允许的请求数
+            window: 窗口长度（秒）
+            burst: 每个出口允许的突发请求数
+        """
+        if window <= 0:
+            raise ValueError("window 必须大于 0")
+        self.requests = requests
+        self.window = window
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """每个出口每秒允许的请求数"""
+        return self.requests / self.window
+
+    @classmethod
+    def from_config(cls, config_module=None) -> 'RateLimiterRegistry':
+        """
+        从 config 模块读取限速配置
+
+        RATE_LIMIT_REQUESTS 为 None 时，按 REQUEST_DELAY（平均请求间隔）推导窗口内请求数。
+        """
+        if config_module is None:
+            try:
+                import config as config_module
+            except ImportError:
+                config_module = None
+
+        delay = getattr(config_module, 'REQUEST_DELAY', 2) or 0
+        window = getattr(config_module, 'RATE_LIMIT_WINDOW', 60)
+        requests = getattr(config_module, 'RATE_LIMIT_REQUESTS', None)
+        burst = getattr(config_module, 'RATE_LIMIT_BURST', 3)
+
+        if requests is None:
+            # REQUEST_DELAY 为 0 表示不限速，用一个足够大的速率代替
+            requests = window / delay if delay > 0 else window * 1000
+        return cls(requests, window, burst)
+
+    @classmethod
+    def unlimited(cls) -> 'RateLimiterRegistry':
+        """不限速（用于离线回放）"""
+        return cls(requests=1e9, window=1, burst=1000)
+
+    def get(self, key: str = 'direct') -> TokenBucket:
+        """获取（必要时创建）某个出口的令牌桶"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[key] = bucket
+            return bucket
+
+    def acquire(self, key: str = 'direct'):
+        """为某个出口获取一个令牌（阻塞）"""
+        self.get(key).acquire()
+
+    async def acquire_async(self, key: str = 'direct'):
+        """为某个出口获取一个令牌（异步等待）"""
+        await self.get(key).acquire_async()
+
+    def keys(self):
+        """已创建令牌桶的出口标识"""
+        with self._lock:
+            return list(self._buckets)
+
+
+_shared_registry: Optional[RateLimiterRegistry] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_registry() -> RateLimiterRegistry:
+    """
+    获取进程内共享的限速器
+
+    同一进程中的多个 ScholarCrawler 实例共享出口配额。
+    """
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = RateLimiterRegistry.from_config()
+        return _shared_registry
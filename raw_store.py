@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+原始页面存储
+按内容寻址保存抓取到的原始 HTML：sha256 → 压缩文件（gzip / lzma），
+内容相同的页面（不同查询返回的同一页）只保存一份。
+index.jsonl 记录每个 URL 对应的内容哈希，用于审计和重新解析（reparse）：
+提取逻辑（_extract_paper_info）修改后，无需重新抓取即可从原始页面重建文献记录
+"""
+
+import os
+import gzip
+import json
+import lzma
+import time
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+
+DEFAULT_STORE_DIR = "raw_pages"
+
+# 压缩格式 → (扩展名, 模块)
+CODECS = {
+    'gzip': ('.gz', gzip),
+    'lzma': ('.xz', lzma),
+}
+
+# scholarly 请求页面时使用的主机名（reparse 时还原为相对路径）
+SCHOLAR_HOST = 'https://scholar.google.com'
+
+
+class RawPageStore:
+    """
+    内容寻址的原始页面目录
+
+    目录结构:
+        index.jsonl              每行一条 {"url", "sha256", "codec", "bytes", "stored", "time"}，追加写入
+        objects/<前2位>/<sha256>.gz|.xz   压缩后的页面内容
+    """
+
+    INDEX_FILE = 'index.jsonl'
+    OBJECTS_DIR = 'objects'
+
+    def __init__(self, directory: Optional[str] = None, codec: Optional[str] = None,
+                 settings=None):
+        """
+        Args:
+            directory: 存储目录（默认 config.RAW_STORE_DIR）
+            codec: 压缩格式 'gzip' 或 'lzma'（默认 config.RAW_STORE_CODEC）
+            settings: 配置模块（默认 config）
+        """
+        if settings is None:
+            import config as settings
+        self.directory = directory or getattr(settings, 'RAW_STORE_DIR', DEFAULT_STORE_DIR)
+        self.codec = codec or getattr(settings, 'RAW_STORE_CODEC', 'gzip')
+        if self.codec not in CODECS:
+            raise ValueError(f"不支持的压缩格式: {self.codec}（可选 {', '.join(CODECS)}）")
+        self.stored = 0
+        self.deduplicated = 0
+        self._index: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.directory, self.OBJECTS_DIR), exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 写入中断时最后一行可能不完整
+                    continue
+                # 同一 URL 多次抓取时以最后一次为准
+                self._index[entry['url']] = entry
+
+    def __len__(self):
+        return len(self._index)
+
+    def _object_path(self, digest: str, codec: str) -> str:
+        extension = CODECS[codec][0]
+        return os.path.join(self.directory, self.OBJECTS_DIR, digest[:2], digest + extension)
+
+    def _find_object(self, digest: str) -> Optional[tuple]:
+        """已保存的对象 (路径, 压缩格式)，不存在时为 None"""
+        for codec in CODECS:
+            path = self._object_path(digest, codec)
+            if os.path.exists(path):
+                return path, codec
+        return None
+
+    def put(self, url: str, text: str) -> str:
+        """
+        保存一个页面
+
+        Args:
+            url: 请求地址
+            text: 页面内容
+
+        Returns:
+            内容的 sha256
+        """
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            found = self._find_object(digest)
+            if found is None:
+                path = self._object_path(digest, self.codec)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(CODECS[self.codec][1].compress(data))
+                os.replace(tmp_path, path)
+                codec = self.codec
+                self.stored += 1
+            else:
+                path, codec = found
+                self.deduplicated += 1
+            entry = {'url': url, 'sha256': digest, 'codec': codec, 'bytes': len(data),
+                     'stored': os.path.getsize(path), 'time': time.time()}
+            with open(os.path.join(self.directory, self.INDEX_FILE), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._index[url] = entry
+        return digest
+
+    def get(self, digest: str) -> str:
+        """
+        按内容哈希读取页面
+
+        Raises:
+            KeyError: 没有该内容
+        """
+        found = self._find_object(digest)
+        if found is None:
+            raise KeyError(digest)
+        path, codec = found
+        with open(path, 'rb') as f:
+            return CODECS[codec][1].decompress(f.read()).decode('utf-8')
+
+    def play(self, url: str) -> str:
+        """
+        读取某个 URL 最后一次抓取到的页面
+
+        Raises:
+            KeyError: 没有保存该 URL
+        """
+        entry = self._index.get(url)
+        if entry is None:
+            raise KeyError(url)
+        return self.get(entry['sha256'])
+
+    def entries(self) -> Iterator[Dict]:
+        """每个 URL 最后一次抓取的索引记录（按抓取时间排列）"""
+        return iter(sorted(self._index.values(), key=lambda e: e['time']))
+
+    def stats(self) -> Dict:
+        """URL 数、不同内容数、原始大小与压缩后大小"""
+        objects = {}
+        for entry in self._index.values():
+            objects[entry['sha256']] = entry
+        return {
+            'urls': len(self._index),
+            'objects': len(objects),
+            'bytes': sum(e['bytes'] for e in objects.values()),
+            'stored': sum(e['stored'] for e in objects.values()),
+        }
+
+    def compact(self) -> Tuple[int, int]:
+        """
+        重写索引（每个 URL 只保留最后一次抓取），删除不再被索引引用的页面和中断写入的临时文件
+
+        Returns:
+            (删除的索引行数, 删除的页面文件数)
+        """
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        objects_dir = os.path.join(self.directory, self.OBJECTS_DIR)
+        with self._lock:
+            lines = 0
+            if os.path.exists(index_path):
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    lines = sum(1 for line in f if line.strip())
+            tmp_path = index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in sorted(self._index.values(), key=lambda e: e['time']):
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, index_path)
+
+            referenced = {entry['sha256'] for entry in self._index.values()}
+            removed = 0
+            for root, _, files in os.walk(objects_dir):
+                for name in files:
+                    digest = name.split('.', 1)[0]
+                    if name.endswith('.tmp') or digest not in referenced:
+                        os.remove(os.path.join(root, name))
+                        removed += 1
+        return lines - len(self._index), removed
+
+    def summary(self) -> str:
+        text = f"保存 {self.stored} 个原始页面到 {self.directory}"
+        if self.deduplicated:
+            text += f"（{self.deduplicated} 个与已有内容相同，未重复保存）"
+        return text
+
+
+class _StoreReplay:
+    """把原始页面存储当作回放来源（transport 按 cassette 接口调用）"""
+
+    mode = 'replay'
+
+    def __init__(self, store: RawPageStore):
+        self.store = store
+
+    def play(self, url: str) -> str:
+        return self.store.play(url)
+
+
+_active: Optional[RawPageStore] = None
+
+
+def get_active() -> Optional[RawPageStore]:
+    """当前生效的原始页面存储（未启用时为 None）"""
+    return _active
+
+
+def activate(store: Optional[RawPageStore]):
+    """
+    启用原始页面存储（None 表示关闭）
+
+    对所有经过 scholarly 页面请求的流量生效，包括代理通道；回放时不保存。
+    """
+    global _active
+    import transport
+    transport.install()
+    _active = store
+
+
+def is_result_page(url: str) -> bool:
+    """是否为搜索结果页（包括被引用列表），不含引用格式、BibTeX 等详情页"""
+    path = url[len(SCHOLAR_HOST):] if url.startswith(SCHOLAR_HOST) else url
+    return path.startswith('/scholar?') and 'output=cite' not in path
+
+
+def reparse(store: RawPageStore, crawler=None, match: Optional[str] = None) -> list:
+    """
+    从原始页面重新解析所有结果页，用当前的 _extract_paper_info 重建文献记录
+
+    不访问网络：scholarly 的页面请求由存储回放，缺失的页面视为没有更多结果。
+
+    Args:
+        store: 原始页面存储
+        crawler: ScholarCrawler 实例（默认新建，不使用缓存）
+        match: 只解析 URL 中包含该字符串的页面
+
+    Returns:
+        文献记录列表（按论文去重）
+    """
+    from itertools import islice
+    from scholarly import scholarly
+    import cassette
+    from backends import PAGE_SIZE
+
+    if crawler is None:
+        from scholar_crawler import ScholarCrawler
+        crawler = ScholarCrawler(use_cache=False)
+
+    papers = []
+    seen = set()
+    pages = 0
+    previous = cassette.get_active()
+    cassette.activate(_StoreReplay(store))
+    try:
+        for entry in store.entries():
+            url = entry['url']
+            if not is_result_page(url) or (match and match not in url):
+                continue
+            pages += 1
+            path = url[len(SCHOLAR_HOST):] if url.startswith(SCHOLAR_HOST) else url
+            pubs = []
+            try:
+                # 逐条读取：页内结果不足一页时迭代器会请求下一页，存储中没有时到此为止
+                for pub in islice(scholarly.search_pubs_custom_url(path), PAGE_SIZE):
+                    pubs.append(pub)
+            except KeyError:
+                pass
+            except Exception as e:
+                print(f"  ⚠ 解析失败 {url}: {e}")
+            for pub in pubs:
+                key = crawler._dedupe_key(pub)
+                if key in seen:
+                    continue
+                seen.add(key)
+                try:
+                    papers.append(crawler._extract_paper_info(pub))
+                except Exception as e:
+                    print(f"  ⚠ 提取失败: {e}")
+    finally:
+        cassette.activate(previous)
+    print(f"✓ 重新解析 {pages} 个结果页，得到 {len(papers)} 篇文献")
+    return papers
+
+
+def main():
+    """主函数 - 原始页面存储工具"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='原始页面存储 - 查看统计、从原始页面重新解析文献记录',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  python raw_store.py stats
+  python raw_store.py reparse --output results/reparsed.csv
+  python raw_store.py reparse --match "deep+learning"
+        """
+    )
+    parser.add_argument('--dir', type=str, default=None,
+                        help='存储目录 (默认: config.RAW_STORE_DIR)')
+    subparsers = parser.add_subparsers(dest='command', help='子命令')
+
+    subparsers.add_parser('stats', help='查看存储统计')
+
+    reparse_parser = subparsers.add_parser('reparse', help='从原始页面重新解析文献记录')
+    reparse_parser.add_argument('--match', type=str, default=None,
+                                help='只解析 URL 中包含该字符串的结果页')
+    reparse_parser.add_argument('--output', type=str, default=None,
+                                help='输出CSV文件名 (默认: results/reparsed_<时间>.csv)')
+
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        store = RawPageStore(args.dir)
+        stats = store.stats()
+        ratio = stats['stored'] / stats['bytes'] if stats['bytes'] else 0
+        print(f"📦 原始页面存储: {store.directory}")
+        print(f"   URL: {stats['urls']} 个，不同内容: {stats['objects']} 个")
+        print(f"   原始大小: {stats['bytes'] / 1024:.1f} KB，"
+              f"压缩后: {stats['stored'] / 1024:.1f} KB（{ratio:.0%}）")
+
+    elif args.command == 'reparse':
+        from scholar_crawler import ScholarCrawler
+        store = RawPageStore(args.dir)
+        crawler = ScholarCrawler(use_cache=False)
+        papers = reparse(store, crawler, match=args.match)
+        if not papers:
+            print("❌ 没有可解析的结果页")
+            return
+        output = args.output or f"results/reparsed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        crawler.export_to_csv(crawler.sort_by_citations(papers), output, 'reparse')
+
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,128 +7,1037 @@ Google Scholar 文献爬取工具
 """
 
 import csv
+import math
 import time
+import asyncio
 import argparse
+import threading
+import sys
+from collections import deque
 from datetime import datetime
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 import os
 import json
 
 try:
-    from scholarly import scholarly, ProxyGenerator
+    from scholarly import scholarly
 except ImportError:
     print("请先安装 scholarly 库: pip install scholarly")
     exit(1)
 
+from rate_limiter import RateLimiterRegistry, get_shared_registry
+from throttle import AIMDController, is_block_signal, describe_rate
+from proxy_pool import ProxyPool, ProxyLane, build_pool_from_config
+from transport import use_lane
+from backends import PAGE_SIZE, ResultPage, SearchBackend, ScholarlyBackend, page_key
+from cassette import Cassette, activate as activate_cassette, get_active as get_active_cassette
+from query_planner import canonical_hash, plan_query
+from fetch_budget import DEFAULT_MIN_LIMIT, DEFAULT_SLACK, FetchBudget, default_limit
+from year_slicer import YearSlice, slice_years as slice_year_range
+from journal import CrawlJournal, JournalBackend
+from page_cache import CachedBackend, PageCache
+from failure_cache import FailureCache, PROXY, QUERY, format_duration
+import raw_store
+from paper import Paper
+from paper_table import PaperTable
+from spill import PaperSpool
+from symbols import SymbolTable
+
 try:
+    import config as crawler_config
     from config import AdvancedSearchConfig
 except ImportError:
     # 如果无法导入，定义一个简单版本
+    crawler_config = None
     AdvancedSearchConfig = None
 
 
+# Google Scholar 每个结果页固定返回 10 条
+RESULTS_PER_PAGE = PAGE_SIZE
+
+
+def _iter_sync(agen: AsyncIterator, buffer_size: int = RESULTS_PER_PAGE * 2) -> Iterator:
+    """
+    在同步代码中逐个取出异步生成器的结果
+
+    事件循环只在调用方等待下一个结果时运行：循环中的任务一次取出当前能得到的所有结果
+    （最多 buffer_size 个），调用方逐个处理完后再继续运行，各级流水线的相对进度与
+    直接 async for 时相同。提前停止迭代时关闭异步生成器（取消未完成的任务）。
+    若当前线程已有运行中的事件循环（如 Jupyter），事件循环在独立线程中运行。
+    """
+    try:
+        asyncio.get_running_loop()
+        in_thread = True
+    except RuntimeError:
+        in_thread = False
+
+    loop = asyncio.new_event_loop()
+    thread = None
+    if in_thread:
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+
+    def run(coro):
+        if thread is not None:
+            return asyncio.run_coroutine_threadsafe(coro, loop).result()
+        return loop.run_until_complete(coro)
+
+    buffer = deque()
+    state = {}
+
+    async def pump():
+        try:
+            async for item in agen:
+                buffer.append(item)
+                state['ready'].set()
+                if len(buffer) >= buffer_size:
+                    # 缓冲区已满：等调用方取走后再继续
+                    state['space'].clear()
+                    await state['space'].wait()
+        finally:
+            state['ready'].set()
+
+    async def start():
+        state['ready'] = asyncio.Event()
+        state['space'] = asyncio.Event()
+        state['space'].set()
+        state['task'] = asyncio.ensure_future(pump())
+
+    async def wait_ready():
+        state['space'].set()
+        await state['ready'].wait()
+        state['ready'].clear()
+
+    async def stop():
+        task = state['task']
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await agen.aclose()
+
+    try:
+        run(start())
+        while True:
+            run(wait_ready())
+            while buffer:
+                yield buffer.popleft()
+            if state['task'].done():
+                while buffer:
+                    yield buffer.popleft()
+                state['task'].result()
+                return
+    finally:
+        try:
+            if 'task' in state:
+                run(stop())
+            run(loop.shutdown_asyncgens())
+            run(loop.shutdown_default_executor())
+        finally:
+            if thread is not None:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+            loop.close()
+
+
+# 流水线中表示数据结束的标记
+_END_OF_STREAM = object()
+
+
+class _FetchLanes:
+    """
+    一次搜索中的抓取通道调度
+    
+    维护空闲槽位队列：直连时为 max_concurrency 个槽位，使用代理时每个代理通道
+    LANE_CONCURRENCY 个。每个通道独立限速、独立 AIMD 调速，总吞吐量随代理数增长。
+    """
+    
+    def __init__(self, crawler: 'ScholarCrawler', backend: Optional[SearchBackend] = None):
+        self.crawler = crawler
+        self.backend = backend or crawler.backend
+        self.loop = asyncio.get_running_loop()
+        self.per_lane = max(1, getattr(crawler_config, 'LANE_CONCURRENCY', 1))
+        self.live_lanes = set(crawler.lanes)
+        self.requests = 0
+        self.idle = asyncio.Queue()
+        for slot in crawler._fetch_slots():
+            self.idle.put_nowait(slot)
+    
+    def window(self) -> int:
+        """当前可同时进行的请求数"""
+        if self.live_lanes:
+            return len(self.live_lanes) * self.per_lane
+        return self.crawler.max_concurrency
+    
+    def add_new_lanes(self):
+        """后台预检新通过的代理加入轮换"""
+        for lane in self.crawler._refresh_lanes():
+            self.live_lanes.add(lane)
+            for _ in range(self.per_lane):
+                self.idle.put_nowait(lane)
+    
+    async def fetch(self, query: str, year_low: Optional[int], year_high: Optional[int],
+                    start_index: int, label: str = '') -> ResultPage:
+        """
+        在空闲通道上抓取一个结果页
+        
+        运行记录或缓存中已有的页直接返回，不占用限速令牌；同一事件循环中其他搜索
+        正在抓取的同一页不重复请求，等待其结果。
+        """
+        peek = getattr(self.backend, 'peek_search', None)
+        page = peek(query, start_index, year_low, year_high) if peek else None
+        if page is not None:
+            self.requests += 1
+            return page
+        
+        key = page_key('search', query, start_index, year_low, year_high)
+        inflight = self.crawler._inflight
+        task = inflight.get(key)
+        if task is not None and task.get_loop() is self.loop:
+            return await self._wait_shared(task)
+        
+        task = self.loop.create_task(self.call(self.crawler._fetch_page, query, start_index,
+                                               year_low, year_high, self.backend, label=label))
+        inflight[key] = task
+        
+        def forget(done_task):
+            if inflight.get(key) is done_task:
+                del inflight[key]
+            if not done_task.cancelled():
+                done_task.exception()  # 避免无人等待时的未取回异常警告
+        
+        task.add_done_callback(forget)
+        return await self._wait_shared(task)
+    
+    async def _wait_shared(self, task: asyncio.Task):
+        """
+        等待可能被多个搜索共享的抓取任务
+        
+        某个搜索取消预取时不影响其他仍在等待的搜索；最后一个等待者取消时一并取消该任务，
+        尚未发出的请求不再发出（已在线程池中执行的请求无法中止）。
+        """
+        waiters = self.crawler._fetch_waiters
+        waiters[task] = waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if waiters[task] == 1:
+                task.cancel()
+            raise
+        finally:
+            waiters[task] -= 1
+            if not waiters[task]:
+                del waiters[task]
+    
+    async def fill(self, pub: Dict, label: str = '') -> Dict:
+        """在空闲通道上补全一篇文献的详情（需要引用页和 BibTeX 两个请求）"""
+        peek = getattr(self.backend, 'peek_fill', None)
+        filled = peek(pub) if peek else None
+        if filled is not None:
+            self.requests += 2
+            return filled
+        return await self.call(self.backend.fill, pub, label=label, cost=2)
+    
+    async def call(self, func, *args, label: str = '', cost: int = 1):
+        """
+        在空闲通道上执行一次后端调用（阻塞函数，在线程池中执行）
+        
+        被限制访问时降低该通道速率后重试；某个代理自身出错时换通道重试。
+        
+        Args:
+            func: 后端调用，例如 backend.search / backend.fill
+            label: 出错时显示的名称
+            cost: 该调用包含的 HTTP 请求数（每个请求消耗一个令牌）
+        """
+        crawler = self.crawler
+        attempt = 0
+        while True:
+            lane = await self.idle.get()
+            key = lane.key if lane else crawler.egress_key
+            throttle = crawler._throttle_for(key)
+            healthy = True
+            cooling = False
+            try:
+                # 每个 HTTP 请求消耗一个令牌，而不是每篇被接受的文献
+                for _ in range(cost):
+                    await crawler.rate_limiter.acquire_async(key)
+                self.requests += cost
+                started = time.monotonic()
+                result = await self.loop.run_in_executor(
+                    None, crawler._call_on_lane, lane, func, *args)
+            except Exception as e:
+                blocked = is_block_signal(e)
+                if lane is not None:
+                    crawler.proxy_pool.record_failure(lane.proxy.url)
+                    healthy = crawler.proxy_pool.is_healthy(lane.proxy)
+                    # 被限制访问的代理进入冷却期，期间退出轮换
+                    if blocked and crawler.failures is not None:
+                        crawler.failures.record_failure(PROXY, lane.proxy.url,
+                                                        f"{type(e).__name__}: {e}")
+                        cooling = True
+                        healthy = False
+                # 某个代理自身出错：换通道重试；该代理因此被停用时不计入重试次数
+                if not blocked and lane is not None and len(self.live_lanes) > 1:
+                    if healthy:
+                        attempt += 1
+                    if attempt > crawler.block_max_retries:
+                        raise
+                    print(f"  ⚠ {label}抓取失败（代理 {lane.proxy.url}: "
+                          f"{type(e).__name__}），换通道重试...")
+                    continue
+                # 验证码 / 429 / MaxTriesExceededException：降速后重试该页
+                if not blocked or attempt >= crawler.block_max_retries:
+                    raise
+                attempt += 1
+                rate = throttle.on_block(f"{type(e).__name__}: {e}")
+                where = f"代理 {lane.proxy.url}" if lane else "直连"
+                print(f"  ⚠ {label}被限制访问（{type(e).__name__}，{where}），"
+                      f"速率降至 {describe_rate(rate)}，第 {attempt} 次重试...")
+                continue
+            else:
+                if lane is not None:
+                    crawler.proxy_pool.record_success(lane.proxy.url, time.monotonic() - started)
+                    if crawler.failures is not None:
+                        crawler.failures.record_success(PROXY, lane.proxy.url)
+                throttle.on_success()
+                return result
+            finally:
+                # 连续失败的代理退出轮换（至少保留一个通道）
+                if healthy or len(self.live_lanes) <= 1:
+                    self.idle.put_nowait(lane)
+                elif lane in self.live_lanes:
+                    self.live_lanes.discard(lane)
+                    crawler._retire_lane(lane)
+                    if cooling:
+                        remaining = crawler.failures.remaining(PROXY, lane.proxy.url)
+                        print(f"  ⚠ 代理 {lane.proxy.url} 被限制访问，冷却 "
+                              f"{format_duration(remaining)}")
+                    else:
+                        print(f"  ⚠ 代理 {lane.proxy.url} 连续失败，已停用")
+
+
 class ScholarCrawler:
     """Google Scholar 文献爬取器"""
     
-    def __init__(self, use_proxy=False):
+    def __init__(self, use_proxy=False, max_concurrency: Optional[int] = None,
+                 rate_limiter: Optional[RateLimiterRegistry] = None,
+                 proxy_pool: Optional[ProxyPool] = None,
+                 backend: Optional[SearchBackend] = None,
+                 cache: Optional[PageCache] = None, use_cache: Optional[bool] = None,
+                 failures: Optional[FailureCache] = None,
+                 symbols: Optional[SymbolTable] = None,
+                 use_raw_store: Optional[bool] = None):
         """
         初始化爬取器
         
         Args:
             use_proxy: 是否使用代理（推荐使用以避免被封）
+            max_concurrency: 同时抓取的结果页数量上限（默认读取 config.MAX_CONCURRENCY）
+            rate_limiter: 按出口限速的令牌桶（默认使用进程内共享实例，按 config.REQUEST_DELAY 等配置）
+            proxy_pool: 代理池（默认按 config.CUSTOM_PROXY / PROXY_LIST 和免费代理构建）
+            backend: 搜索后端（默认 ScholarlyBackend；离线测试可用 backends.ReplayBackend）
+            cache: 结果页缓存（默认按 config.PAGE_CACHE_* 打开）
+            use_cache: 是否使用结果页缓存（默认读取 config.PAGE_CACHE_ENABLED；
+                       传入 backend 时默认不使用）
+            failures: 失败记录（默认使用缓存时按 config.NEGATIVE_CACHE_* 打开）。
+                      记录失败的查询和被限制访问的代理，冷却期内不再使用这些代理
+            symbols: 符号表（默认新建）。提取的会议/期刊、出版商和作者在其中驻留，
+                     sort_papers 等方法建立的 PaperTable 也使用它
+            use_raw_store: 是否保存原始页面（默认读取 config.RAW_STORE_ENABLED；
+                           传入 backend 或正在回放 cassette 时默认不保存）
         """
         self.use_proxy = use_proxy
+        self.backend = backend or ScholarlyBackend()
+        if use_cache is None:
+            use_cache = cache is not None or (
+                backend is None and getattr(crawler_config, 'PAGE_CACHE_ENABLED', True))
+        self.cache = None
+        if use_cache:
+            self.cache = cache or PageCache()
+            self.backend = CachedBackend(self.backend, self.cache)
+        self.failures = failures
+        if failures is None and use_cache and getattr(crawler_config, 'NEGATIVE_CACHE_ENABLED', True):
+            self.failures = FailureCache()
+        # 原始页面存储是进程级的（在 scholarly 请求层保存），只启用一次
+        if use_raw_store is None:
+            cassette = get_active_cassette()
+            replaying = cassette is not None and cassette.mode == 'replay'
+            use_raw_store = (backend is None and not replaying
+                             and getattr(crawler_config, 'RAW_STORE_ENABLED', True))
+        if use_raw_store and raw_store.get_active() is None:
+            raw_store.activate(raw_store.RawPageStore())
+        if max_concurrency is None:
+            max_concurrency = getattr(crawler_config, 'MAX_CONCURRENCY', 3)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.rate_limiter = rate_limiter or get_shared_registry()
+        # 直连时的出口标识；使用代理时每个通道有自己的标识
+        self.egress_key = 'direct'
+        self.block_max_retries = getattr(crawler_config, 'BLOCK_MAX_RETRIES', 3)
+        self.proxy_pool = proxy_pool
+        # 自己创建的代理池在 close() 时一并关闭；外部传入的由调用方负责
+        self._owns_pool = False
+        self.lanes = []
+        # 已停用、等待关闭的通道（其他搜索可能仍在使用，所有搜索结束后关闭）
+        self._retired_lanes = []
+        self._active_searches = 0
+        # 正在抓取的结果页（page_key → Task），并发的搜索共享同一请求
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # 每个抓取任务的等待者数
+        self._fetch_waiters: Dict[asyncio.Task, int] = {}
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        # 最近一次搜索的错误（搜索出错时仍返回已获取的部分结果；正常结束时为 None）
+        self.last_error: Optional[str] = None
         if use_proxy:
             self._setup_proxy()
     
+    @property
+    def throttle(self) -> AIMDController:
+        """直连出口的 AIMD 控制器"""
+        return self._throttle_for(self.egress_key)
+    
+    def _throttle_for(self, key: str) -> AIMDController:
+        """某个出口的 AIMD 控制器（正常时提速，被拦截时降速）"""
+        return AIMDController.for_bucket(self.rate_limiter.get(key))
+    
     def _setup_proxy(self):
-        """设置代理"""
+        """
+        设置代理池，每个健康代理作为一个独立的抓取通道
+        
+        候选代理并发预检：前 PREFLIGHT_MIN_READY 个通过（或超过 PREFLIGHT_DEADLINE 秒）
+        即可开始搜索，其余代理在后台继续检测，通过后自动加入抓取通道。
+        """
         try:
-            pg = ProxyGenerator()
-            pg.FreeProxies()
-            scholarly.use_proxy(pg)
-            print("✓ 代理设置成功")
+            if self.proxy_pool is None:
+                self.proxy_pool = build_pool_from_config(crawler_config)
+                self._owns_pool = True
+            min_ready = getattr(crawler_config, 'PREFLIGHT_MIN_READY', 2)
+            deadline = getattr(crawler_config, 'PREFLIGHT_DEADLINE', 10.0)
+            print(f"🌐 正在并发检测 {len(self.proxy_pool)} 个候选代理"
+                  f"（通过 {min_ready} 个或 {deadline:.0f} 秒后开始搜索）...")
+            self.proxy_pool.preflight(
+                min_ready=min_ready,
+                deadline=deadline,
+                workers=getattr(crawler_config, 'PREFLIGHT_WORKERS', 16))
+            self._refresh_lanes()
+            if not self.lanes:
+                raise RuntimeError("没有可用的代理")
+            print(f"✓ 代理设置成功（{len(self.lanes)} 个抓取通道，其余代理后台检测中）")
         except Exception as e:
             print(f"⚠ 代理设置失败: {e}")
             print("将使用直连模式，可能会遇到访问限制")
     
+    def _refresh_lanes(self) -> list:
+        """
+        为后台预检新通过的代理创建抓取通道
+        
+        Returns:
+            新增的通道列表
+        """
+        if self.proxy_pool is None:
+            return []
+        max_lanes = getattr(crawler_config, 'PROXY_MAX_LANES', 8)
+        known = {lane.proxy.url for lane in self.lanes}
+        new_lanes = []
+        for proxy in self.proxy_pool.healthy():
+            if len(self.lanes) + len(new_lanes) >= max_lanes:
+                break
+            if self.failures is not None and self.failures.remaining(PROXY, proxy.url):
+                continue
+            if proxy.url not in known:
+                new_lanes.append(self.proxy_pool.open_lane(
+                    proxy, timeout=getattr(crawler_config, 'PROXY_TIMEOUT', 5.0) * 2))
+        self.lanes.extend(new_lanes)
+        return new_lanes
+    
+    def _retire_lane(self, lane: ProxyLane):
+        """停用一个抓取通道：移出轮换，没有进行中的搜索时立即关闭"""
+        if lane in self.lanes:
+            self.lanes.remove(lane)
+        self._retired_lanes.append(lane)
+        if not self._active_searches:
+            self._close_retired_lanes()
+    
+    def _close_retired_lanes(self):
+        """关闭已停用的通道"""
+        retired, self._retired_lanes = self._retired_lanes, []
+        for lane in retired:
+            self.proxy_pool.close_lane(lane)
+    
+    def close(self):
+        """关闭所有代理通道（爬取结束后调用；之后以直连模式继续可用）"""
+        self._retired_lanes.extend(self.lanes)
+        self.lanes = []
+        self._close_retired_lanes()
+        if self._owns_pool:
+            self.proxy_pool.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _fetch_slots(self) -> list:
+        """
+        抓取槽位：每个槽位对应一个可并发的请求
+        
+        直连时为 max_concurrency 个 None；使用代理时每个通道 LANE_CONCURRENCY 个。
+        """
+        if not self.lanes:
+            return [None] * self.max_concurrency
+        per_lane = max(1, getattr(crawler_config, 'LANE_CONCURRENCY', 1))
+        return [lane for lane in self.lanes for _ in range(per_lane)]
+    
     def search_papers(self, keyword: str, max_results: int = 50, 
-                     advanced_config: Optional['AdvancedSearchConfig'] = None) -> List[Dict]:
+                     advanced_config: Optional['AdvancedSearchConfig'] = None,
+                     fill_details: bool = False,
+                     request_budget: Optional[int] = None,
+                     slice_years: bool = False,
+                     journal: Optional[CrawlJournal] = None,
+                     search_id: Optional[str] = None,
+                     max_memory: Optional[float] = None) -> List[Paper]:
         """
         搜索文献（支持高级检索）
         
+        同步接口，收集 iter_papers 产生的全部文献。设置内存上限时收集到 PaperSpool 中，
+        超出上限的文献写入临时文件。
+        
         Args:
             keyword: 搜索关键字
             max_results: 最大结果数量
             advanced_config: 高级检索配置（可选）
+            fill_details: 是否补全详情（完整摘要、出版商等，每篇额外请求）
+            request_budget: 请求预算（默认 config.REQUEST_BUDGET；未设置时按目标数量推算）
+            slice_years: 是否按年份切分查询（目标数量超过单个查询的结果上限时自动启用）
+            journal: 运行记录（可选，用于中断后继续）
+            search_id: 本次搜索在运行记录中的编号（默认由 search_key 生成）
+            max_memory: 结果在内存中占用的上限（MB，默认 config.MAX_MEMORY_MB；None 表示不限制）
             
         Returns:
-            文献列表
+            文献列表（设置了内存上限时为 PaperSpool）。搜索出错时为已获取的部分结果，
+            错误记录在 last_error 中
+        """
+        if max_memory is None:
+            max_memory = getattr(crawler_config, 'MAX_MEMORY_MB', None)
+        papers = self.iter_papers(keyword, max_results, advanced_config, fill_details,
+                                  request_budget, slice_years, journal, search_id)
+        if max_memory is None:
+            return list(papers)
+        spool = PaperSpool(max_memory)
+        spool.extend(papers)
+        return spool
+    
+    def iter_papers(self, keyword: str, max_results: int = 50,
+                    advanced_config: Optional['AdvancedSearchConfig'] = None,
+                    fill_details: bool = False,
+                    request_budget: Optional[int] = None,
+                    slice_years: bool = False,
+                    journal: Optional[CrawlJournal] = None,
+                    search_id: Optional[str] = None) -> Iterator[Paper]:
+        """
+        逐篇产生通过筛选的文献（同步生成器）
+        
+        参数与 search_papers 相同。取下一篇时才推进抓取流水线，下游（导出、统计、去重）
+        可以边抓取边处理；提前停止迭代时取消尚未完成的请求。
+        
+        Yields:
+            通过筛选的文献，顺序与 search_papers 返回的列表相同
+        """
+        return _iter_sync(self.iter_papers_async(keyword, max_results, advanced_config,
+                                                 fill_details, request_budget, slice_years,
+                                                 journal, search_id))
+    
+    async def search_papers_async(self, keyword: str, max_results: int = 50,
+                                  advanced_config: Optional['AdvancedSearchConfig'] = None,
+                                  fill_details: bool = False,
+                                  request_budget: Optional[int] = None,
+                                  slice_years: bool = False,
+                                  journal: Optional[CrawlJournal] = None,
+                                  search_id: Optional[str] = None) -> List[Paper]:
+        """
+        异步搜索文献（支持高级检索），收集 iter_papers_async 产生的全部文献
+        
+        参数与 search_papers 相同。
+        """
+        return [paper async for paper in self.iter_papers_async(
+            keyword, max_results, advanced_config, fill_details, request_budget, slice_years,
+            journal, search_id)]
+    
+    async def iter_papers_async(self, keyword: str, max_results: int = 50,
+                                advanced_config: Optional['AdvancedSearchConfig'] = None,
+                                fill_details: bool = False,
+                                request_budget: Optional[int] = None,
+                                slice_years: bool = False,
+                                journal: Optional[CrawlJournal] = None,
+                                search_id: Optional[str] = None) -> AsyncIterator[Paper]:
+        """
+        异步逐篇产生通过筛选的文献（支持高级检索）
+        
+        内部为 抓取 → 提取 → 筛选 三级流水线，各级之间以有界队列连接。
+        结果页按 start_index 并发预取（直连时并发数受 max_concurrency 限制，
+        使用代理时每个代理通道独立并发；请求速率按出口受 rate_limiter 限制），
+        但按原始顺序逐条筛选，因此结果、筛选与进度输出与逐条遍历时一致。
+        
+        补全详情时先用摘要页字段筛选，只有通过的文献才补全（最多 FILL_WORKERS 个并发），
+        补全后再按完整条件筛选一次。
+        
+        抓取量由请求预算控制：用完预算后停止；有本地筛选条件时在线估计筛选通过率，
+        预计无法在预算内凑够目标数量时提前停止。
+        
+        按年份切分时，结果过多（超过 SLICE_RESULT_CAP）的年份范围递归二分，各切片在
+        不同通道上并发翻页，结果合并去重。
+        
+        Args:
+            keyword: 搜索关键字
+            max_results: 最大结果数量
+            advanced_config: 高级检索配置（可选）
+            fill_details: 是否补全详情（完整摘要、出版商等，每篇额外请求）
+            request_budget: 请求预算，结果页与补全详情请求的总数（默认 config.REQUEST_BUDGET；
+                            未设置时按目标数量推算）
+            slice_years: 是否按年份切分查询（目标数量超过单个查询的结果上限时自动启用）
+            journal: 运行记录（可选）。记录抓取到的结果页、补全结果、筛选出的文献和进度；
+                     继续中断的运行时，已记录的请求直接重放，不再访问网络
+            search_id: 本次搜索在运行记录中的编号（默认由 search_key 生成）
+            
+        Yields:
+            通过筛选的文献（按原始顺序；写入运行记录后才产生）
         """
-        # 构建查询字符串
+        backend = self.backend
+        self.last_error = None
+        if journal is not None:
+            search_id = search_id or self.search_key(keyword, max_results, advanced_config)
+            if journal.is_done(search_id):
+                print(f"\n↩ '{keyword}' 已在运行 {journal.run_id} 中完成，"
+                      f"使用记录的 {journal.paper_count(search_id)} 篇文献")
+                for paper in journal.iter_papers(search_id):
+                    yield paper
+                return
+            cursor = journal.cursor(search_id)
+            if cursor:
+                print(f"\n↩ 继续运行 {journal.run_id}: 上次已扫描 {cursor['scanned']} 篇、"
+                      f"获取 {cursor['collected']} 篇，已记录的请求直接重放")
+            journal.begin_search(search_id, {'keyword': keyword, 'max_results': max_results})
+            backend = JournalBackend(self.backend, journal)
+        
+        # 上次失败的查询：提示仍在冷却期（批量调度会跳过，直接调用时照常搜索）
+        query_key = canonical_hash(keyword, advanced_config)
+        if self.failures is not None:
+            failure = self.failures.get(QUERY, query_key)
+            if failure and failure['until'] > time.time():
+                print(f"\n⏸ 该查询已连续失败 {failure['failures']} 次（{failure['last_error']}），"
+                      f"冷却期还剩 {format_duration(failure['until'] - time.time())}")
+        
+        # 构建查询计划（年份等条件下推到服务器）
         if advanced_config:
-            search_keyword = advanced_config.to_query_string(keyword)
+            plan = advanced_config.plan(keyword, max_results)
             print(f"\n🔍 高级搜索模式")
             print(f"📝 基础关键字: '{keyword}'")
-            print(f"🔎 构建的查询: '{search_keyword}'")
+            print(f"🔎 构建的查询: '{plan.query}'")
             print(advanced_config)
+            print(plan)
         else:
-            search_keyword = keyword
+            plan = plan_query(keyword)
             print(f"\n🔍 正在搜索关键字: '{keyword}'")
         
         print(f"📊 目标获取数量: {max_results}")
         
-        papers = []
+        collected = 0
         filtered_count = 0
         
-        try:
-            search_query = scholarly.search_pubs(search_keyword)
+        # 请求预算：用完后停止；未指定时按目标数量推算
+        if request_budget is None:
+            request_budget = getattr(crawler_config, 'REQUEST_BUDGET', None)
+        if request_budget is None:
+            request_budget = default_limit(
+                max_results, RESULTS_PER_PAGE, fill_details,
+                slack=getattr(crawler_config, 'REQUEST_BUDGET_SLACK', DEFAULT_SLACK),
+                minimum=getattr(crawler_config, 'REQUEST_BUDGET_MIN', DEFAULT_MIN_LIMIT))
+        # 没有本地筛选条件时每篇文献都通过，不预测通过率
+        filtering = bool(advanced_config and advanced_config.has_local_filters(plan.local_skip))
+        budget = FetchBudget(max_results, request_budget, RESULTS_PER_PAGE, filtering=filtering)
+        max_pages = request_budget
+        stop_reason = None
+        
+        # 目标数量超过单个查询的结果上限时按年份切分
+        slice_cap = getattr(crawler_config, 'SLICE_RESULT_CAP', 1000)
+        first_year = getattr(crawler_config, 'SLICE_FIRST_YEAR', 1990)
+        slicing = slice_years or max_results > slice_cap
+        
+        lanes = _FetchLanes(self, backend)
+        
+        # 三级流水线：抓取 → 提取 → 筛选，各级之间用有界队列连接。
+        # 抓取级预取后续结果页，网络等待与提取、筛选的 CPU 处理相互重叠。
+        page_queue = asyncio.Queue(maxsize=lanes.window())
+        record_queue = asyncio.Queue(maxsize=RESULTS_PER_PAGE * 2)
+        # 筛选级每处理一篇文献（提取级每丢弃一篇重复文献）时通知抓取级重新计算还需要的页数
+        progress = asyncio.Event()
+        delivered = 0   # 已交给提取级的结果页中的文献数
+        dropped = 0     # 提取级去重丢弃的文献数
+        pending = deque()   # 抓取中的结果页 (结果流, Task)
+        
+        def committed():
+            # 已发出的请求数加上抓取中的结果页和补全中的文献（尚未完成的按全部请求计），
+            # 据此判断预算，预取和补全不会超出预算
+            return (lanes.requests + sum(1 for _, task in pending if not task.done())
+                    + budget.fill_cost * sum(1 for task in in_flight if not task.done()))
+        
+        def pages_wanted():
+            # 凑够目标数量还需要的结果页数（含抓取中的页）：已抓取但尚未筛选的文献先抵扣
+            remaining = max_results - collected - len(in_flight)
+            if budget.filtering:
+                remaining /= budget.acceptance
+            buffered = delivered - dropped - budget.scanned
+            return math.ceil(max(0, remaining - buffered) / RESULTS_PER_PAGE)
+        
+        async def plan_streams():
+            # 每个 (查询, 年份切片) 是一个独立翻页的结果流
+            if not slicing:
+                return [(query, YearSlice(plan.year_low, plan.year_high)) for query in plan.queries]
+            
+            # 切分的探测请求计入请求预算。被切开的范围的第一页不再使用，因此只有切开后
+            # 剩余的预算仍够抓取不切分时需要的页数才继续切分，切分后找到的文献不会少于不切分时
+            unsliced_pages = math.ceil(min(max_results, slice_cap) / RESULTS_PER_PAGE)
+            discarded = 0
+            
+            def can_split():
+                nonlocal discarded
+                if discarded + 1 + unsliced_pages > request_budget:
+                    return False
+                discarded += 1
+                return True
+            
+            async def slices_for(query):
+                def fetch_first(year_low, year_high):
+                    return lanes.fetch(query, year_low, year_high, 0,
+                                       label=f"{YearSlice(year_low, year_high).label} 第 1 页")
+                return [(query, item) for item in await slice_year_range(
+                    fetch_first, plan.year_low, plan.year_high, slice_cap, first_year,
+                    can_split=can_split)]
+            
+            groups = await asyncio.gather(*(slices_for(query) for query in plan.queries))
+            streams = [stream for group in groups for stream in group]
+            print(f"🗂 按年份切分为 {len(streams)} 个结果流: " + ", ".join(
+                f"{item.label}（约 {item.total_results or 0} 篇）" for _, item in streams))
+            return streams
+        
+        async def fetch_stage():
+            # 多个结果流（拆分的查询、年份切片）按轮转顺序抓取：各流的第 1 页、第 2 页……
+            exhausted = set()
+            streams = []
+            
+            def schedule():
+                page_no = 0
+                while len(exhausted) < len(streams):
+                    for stream in range(len(streams)):
+                        if stream not in exhausted:
+                            yield stream, page_no
+                    page_no += 1
+            
+            def label(stream, page_no):
+                query, item = streams[stream]
+                parts = []
+                if plan.is_split:
+                    parts.append(f"查询 {plan.queries.index(query) + 1}")
+                if slicing:
+                    parts.append(item.label)
+                parts.append(f"第 {page_no + 1} 页")
+                return " ".join(parts)
+            
+            def start(stream, page_no):
+                query, item = streams[stream]
+                if page_no == 0 and item.first_page is not None:
+                    # 切分时已抓取的第一页
+                    done = asyncio.get_running_loop().create_future()
+                    done.set_result(item.first_page)
+                    return done
+                return asyncio.ensure_future(lanes.fetch(
+                    query, item.year_low, item.year_high, page_no * RESULTS_PER_PAGE,
+                    label=label(stream, page_no)))
             
-            for i, paper in enumerate(search_query):
-                # 如果已经获取足够的符合条件的文献，则停止
-                if len(papers) >= max_results:
+            nonlocal delivered
+            scheduled = 0
+            slot = ()
+            try:
+                streams.extend(await plan_streams())
+                slots = schedule()
+                while True:
+                    if self.use_proxy:
+                        lanes.add_new_lanes()
+                    # 预取窗口不超过当前可并发的请求数，也不超过凑够目标数量还需要的页数
+                    while (len(pending) < min(lanes.window(), pages_wanted())
+                           and scheduled < max_pages
+                           and budget.affords(committed())):
+                        slot = next(slots, None)
+                        if slot is None:
+                            break
+                        stream, page_no = slot
+                        pending.append((stream, start(stream, page_no)))
+                        scheduled += 1
+                    if not pending:
+                        if (slot is None or scheduled >= max_pages
+                                or not budget.affords(committed())):
+                            break
+                        # 已抓取的文献可能已经足够：等筛选出结果后再决定是否继续抓取
+                        progress.clear()
+                        await progress.wait()
+                        continue
+                    stream, task = pending.popleft()
+                    page = await task
+                    delivered += len(page)
+                    await page_queue.put(page)
+                    # 没有下一页说明该结果流已到最后一页，取消已预取的后续页
+                    if not page.has_next:
+                        exhausted.add(stream)
+                        for other, other_task in list(pending):
+                            if other == stream:
+                                other_task.cancel()
+                                pending.remove((other, other_task))
+                await page_queue.put(_END_OF_STREAM)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await page_queue.put(e)
+            finally:
+                for _, task in pending:
+                    task.cancel()
+        
+        async def extract_stage():
+            nonlocal dropped
+            index = 0
+            seen = set()
+            while True:
+                page = await page_queue.get()
+                if page is _END_OF_STREAM or isinstance(page, Exception):
+                    await record_queue.put(page)
+                    return
+                for paper in page:
+                    # 多个结果流合并时去重
+                    if plan.is_split or slicing:
+                        key = self._dedupe_key(paper)
+                        if key in seen:
+                            dropped += 1
+                            progress.set()
+                            continue
+                        seen.add(key)
+                    try:
+                        # 提取论文信息
+                        record = (index, self._extract_paper_info(paper), None, paper)
+                    except Exception as e:
+                        record = (index, None, e, paper)
+                    await record_queue.put(record)
+                    index += 1
+                if journal is not None:
+                    journal.record_cursor(search_id, index, collected)
+        
+        stages = [asyncio.ensure_future(fetch_stage()), asyncio.ensure_future(extract_stage())]
+        
+        # 补全中的文献（按原始顺序），数量受 FILL_WORKERS 限制
+        fill_limit = max(1, getattr(crawler_config, 'FILL_WORKERS', 4))
+        in_flight = deque()
+        fill_count = 0
+        
+        def accept(paper_info: Paper) -> bool:
+            # 应用高级筛选（已由服务器执行的条件除外）；通过的文献写入运行记录后才产生
+            nonlocal filtered_count, collected
+            if advanced_config and not advanced_config.matches_filters(
+                    paper_info, plan.local_skip):
+                filtered_count += 1
+                budget.observe(False)
+                return False
+            budget.observe(True)
+            collected += 1
+            if journal is not None:
+                journal.record_paper(search_id, paper_info)
+            
+            # 显示进度
+            if collected % 10 == 0:
+                print(f"  已获取 {collected} 篇文献（已筛掉 {filtered_count} 篇）...")
+            return True
+        
+        async def collect_filled(wait: bool):
+            # 按原始顺序收集已完成的补全结果；wait 为 True 时至少等待最早的一个
+            while in_flight and (wait or in_flight[0].done()):
+                wait = False
+                paper_info = await in_flight.popleft()
+                progress.set()
+                if collected < max_results and accept(paper_info):
+                    yield paper_info
+        
+        # 筛选级：按原始顺序逐条处理
+        self._active_searches += 1
+        try:
+            while collected < max_results:
+                progress.set()
+                # 补全并发已满，或补全中的文献足以凑够目标数量时，先等待补全结果
+                if in_flight:
+                    async for paper_info in collect_filled(
+                            len(in_flight) >= fill_limit
+                            or collected + len(in_flight) >= max_results):
+                        yield paper_info
+                    if collected >= max_results:
+                        break
+                    if collected + len(in_flight) >= max_results:
+                        continue
+                
+                # 按乐观通过率估计也无法在预算内凑够目标数量时提前停止
+                if budget.should_stop(collected + len(in_flight), lanes.requests):
+                    stop_reason = 'projected'
                     break
                 
-                # 防止无限循环（搜索的总数不超过max_results的3倍）
-                if i >= max_results * 3:
-                    print(f"⚠ 已搜索 {i} 篇，但只找到 {len(papers)} 篇符合条件的文献")
+                item = await record_queue.get()
+                if item is _END_OF_STREAM:
+                    if budget.exhausted(lanes.requests):
+                        stop_reason = 'budget'
                     break
+                if isinstance(item, Exception):
+                    raise item
+                i, paper_info, error, paper = item
+                budget.on_scanned()
                 
-                try:
-                    # 提取论文信息
-                    paper_info = self._extract_paper_info(paper)
-                    
-                    # 应用高级筛选
-                    if advanced_config and not advanced_config.matches_filters(paper_info):
+                if error is not None:
+                    print(f"  ⚠ 处理第 {i + 1} 篇文献时出错: {error}")
+                    continue
+                
+                if fill_details:
+                    # 先用摘要页中的字段筛选，通过后再补全详情
+                    skip = plan.local_skip + self._deferred_fields(paper_info)
+                    if advanced_config and not advanced_config.matches_filters(paper_info, skip):
                         filtered_count += 1
+                        budget.observe(False)
                         continue
-                    
-                    papers.append(paper_info)
-                    
-                    # 显示进度
-                    if len(papers) % 10 == 0:
-                        print(f"  已获取 {len(papers)} 篇文献（已筛掉 {filtered_count} 篇）...")
-                    
-                    # 添加延迟以避免被封
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    print(f"  ⚠ 处理第 {i + 1} 篇文献时出错: {e}")
+                    # 补全中的文献按全部请求计入预算：预算不够时先等它们完成再判断
+                    while in_flight and not budget.affords(committed(), budget.fill_cost):
+                        async for filled_info in collect_filled(True):
+                            yield filled_info
+                    if collected >= max_results:
+                        break
+                    if not budget.affords(committed(), budget.fill_cost):
+                        stop_reason = 'budget'
+                        break
+                    budget.on_filled()
+                    fill_count += 1
+                    in_flight.append(asyncio.ensure_future(
+                        self._fill_paper(lanes, paper, paper_info, i)))
                     continue
+                
+                if accept(paper_info):
+                    yield paper_info
             
-            print(f"✓ 成功获取 {len(papers)} 篇文献", end='')
+            # 收集剩余的补全结果
+            while in_flight and collected < max_results:
+                async for paper_info in collect_filled(True):
+                    yield paper_info
+            if collected < max_results:
+                if stop_reason == 'projected':
+                    print(f"⚠ 按当前筛选通过率，凑够 {max_results} 篇预计还需 "
+                          f"{budget.projected_requests(collected)} 个请求，超出请求预算"
+                          f"（{request_budget}），提前停止")
+                elif stop_reason == 'budget':
+                    print(f"⚠ 已用完请求预算（{request_budget} 个请求），"
+                          f"只找到 {collected} 篇符合条件的文献")
+            if fill_details:
+                print(f"  补全详情 {fill_count} 篇")
+            
+            print(f"✓ 成功获取 {collected} 篇文献", end='')
             if filtered_count > 0:
                 print(f"（筛选掉 {filtered_count} 篇不符合条件的文献）")
             else:
                 print()
+            if advanced_config or stop_reason:
+                print(f"📐 {budget.report(collected, lanes.requests)}")
             print()
+            if self.failures is not None:
+                self.failures.record_success(QUERY, query_key)
             
         except Exception as e:
-            print(f"❌ 搜索失败: {e}")
+            self.last_error = f"{type(e).__name__}: {e}"
+            if is_block_signal(e):
+                print(f"❌ 多次被限制访问，停止搜索（已获取 {collected} 篇）: {e}")
+                print(f"   当前速率: {describe_rate(self.throttle.rate)}")
+            else:
+                print(f"❌ 搜索失败: {e}")
+            if self.failures is not None:
+                cooldown = self.failures.record_failure(QUERY, query_key,
+                                                        f"{type(e).__name__}: {e}", keyword)
+                print(f"   该查询进入冷却期，{format_duration(cooldown)}内批量搜索将跳过它")
+        
+        finally:
+            for task in list(stages) + list(in_flight):
+                task.cancel()
+            await asyncio.gather(*stages, *in_flight, return_exceptions=True)
+            self._active_searches -= 1
+            if not self._active_searches:
+                self._close_retired_lanes()
+    
+    
+    # 补全详情可能改变的字段：补全前不用它们筛选
+    _FILL_FIELDS = ('publisher', 'authors')
+    
+    def _deferred_fields(self, paper_info: Paper) -> tuple:
+        """
+        补全详情前暂不检查的字段
+        
+        摘要页没有出版商，作者列表可能被截断；会议/期刊名被截断（含“…”）或缺失时也推迟检查。
+        """
+        venue = paper_info.venue
+        if venue is None or '…' in venue:
+            return self._FILL_FIELDS + ('venue',)
+        return self._FILL_FIELDS
+    
+    async def _fill_paper(self, lanes: '_FetchLanes', paper: Dict, paper_info: Paper,
+                          index: int) -> Paper:
+        """
+        补全单篇文献的详情（经过抓取通道，受限速约束）
+        
+        补全失败时保留摘要页中的信息。
+        """
+        try:
+            filled = await lanes.fill(paper, label=f"第 {index + 1} 篇文献详情")
+            return self._extract_paper_info(filled)
+        except Exception as e:
+            print(f"  ⚠ 补全第 {index + 1} 篇文献详情失败: {e}")
+            return paper_info
+    
+    @staticmethod
+    def search_key(keyword: str, max_results: int,
+                   advanced_config: Optional['AdvancedSearchConfig'] = None) -> str:
+        """一次搜索的编号（语义相同的关键字和高级检索配置、相同数量得到相同编号）"""
+        return canonical_hash(keyword, advanced_config, max_results)[:12]
+    
+    @staticmethod
+    def _dedupe_key(paper: Dict) -> str:
+        """合并多个查询结果时识别同一篇文献"""
+        cites_id = paper.get('cites_id')
+        if cites_id:
+            return ','.join(cites_id)
+        return ' '.join(paper.get('bib', {}).get('title', '').lower().split())
+    
+    def _call_on_lane(self, lane, func, *args):
+        """通过指定代理通道执行后端调用（lane 为 None 时直连）"""
+        if lane is None:
+            return func(*args)
+        with use_lane(lane):
+            return func(*args)
+    
+    def _fetch_page(self, query: str, start_index: int, year_low: Optional[int] = None,
+                    year_high: Optional[int] = None,
+                    backend: Optional[SearchBackend] = None) -> ResultPage:
+        """
+        抓取单个结果页（阻塞调用，在线程池中执行）
         
-        return papers
+        Args:
+            query: 查询字符串
+            start_index: 结果起始位置
+            year_low: 起始年份（服务器端筛选）
+            year_high: 结束年份（服务器端筛选）
+            backend: 使用的后端（默认 self.backend）
+            
+        Returns:
+            该页的结果
+        """
+        return (backend or self.backend).search(query, start_index=start_index,
+                                                year_low=year_low, year_high=year_high)
     
-    def _extract_paper_info(self, paper) -> Dict:
+    def _extract_paper_info(self, paper) -> Paper:
         """
         提取论文信息
         
@@ -136,47 +1045,39 @@ class ScholarCrawler:
             paper: scholarly 返回的论文对象
             
         Returns:
-            论文信息字典
+            文献记录
         """
-        # 安全获取字段的辅助函数
-        def safe_get(paper_dict, key, default=''):
-            return paper_dict.get(key, default) if paper_dict else default
-        
         bib = paper.get('bib', {})
         
-        # 提取作者列表
-        authors = bib.get('author', [])
-        if isinstance(authors, list):
-            authors_str = '; '.join(authors)
-        else:
-            authors_str = str(authors)
-        
-        # 提取引用数
-        num_citations = paper.get('num_citations', 0)
-        if num_citations is None:
-            num_citations = 0
-        
-        paper_info = {
-            'title': bib.get('title', 'N/A'),
-            'authors': authors_str,
-            'year': bib.get('pub_year', 'N/A'),
-            'venue': bib.get('venue', 'N/A'),
-            'publisher': bib.get('publisher', 'N/A'),
-            'citations': num_citations,
-            'abstract': bib.get('abstract', 'N/A'),
-            'url': paper.get('pub_url', 'N/A'),
-            'eprint_url': paper.get('eprint_url', 'N/A'),
-        }
-        
-        return paper_info
-    
-    def sort_papers(self, papers: List[Dict], sort_by: str = "citations", 
-                   sort_order: str = "desc") -> List[Dict]:
+        # 摘要页中缺失的会议/期刊名，补全详情后可从 BibTeX 获取
+        venue = bib.get('venue', 'N/A')
+        if venue in ('N/A', 'NA', ''):
+            venue = bib.get('journal') or bib.get('booktitle') or venue
+        
+        # 作者补全详情后为 BibTeX 格式 "A and B"，由 Paper 拆分；
+        # 会议/期刊、出版商和作者在本次运行的符号表中驻留，重复的字符串只保存一份
+        return Paper(
+            title=bib.get('title'),
+            authors=bib.get('author', ()),
+            year=bib.get('pub_year'),
+            venue=venue,
+            publisher=bib.get('publisher'),
+            citations=paper.get('num_citations'),
+            abstract=bib.get('abstract'),
+            url=paper.get('pub_url'),
+            eprint_url=paper.get('eprint_url'),
+        ).intern(self.symbols)
+    
+    def sort_papers(self, papers: List[Paper], sort_by: str = "citations", 
+                   sort_order: str = "desc") -> List[Paper]:
         """
         按指定字段排序文献
         
+        在 PaperTable 的列上排序；传入 PaperTable 时返回 PaperTable，否则返回列表。
+        传入 PaperSpool 时进行外部归并排序，返回 PaperSpool。
+        
         Args:
-            papers: 文献列表
+            papers: 文献列表（Paper 或旧格式的字典）、PaperTable 或 PaperSpool
             sort_by: 排序字段 ("citations", "year", "title", "relevance")
             sort_order: 排序顺序 ("desc"降序 或 "asc"升序)
             
@@ -186,38 +1087,22 @@ class ScholarCrawler:
         if not papers:
             return papers
         
-        reverse = (sort_order == "desc")
-        
-        if sort_by == "citations":
-            # 按引用量排序
-            return sorted(papers, key=lambda x: x.get('citations', 0), reverse=reverse)
-        
-        elif sort_by == "year":
-            # 按年份排序
-            def year_key(paper):
-                year = paper.get('year', 'N/A')
-                if year == 'N/A':
-                    return 0 if reverse else 9999
-                try:
-                    return int(year)
-                except (ValueError, TypeError):
-                    return 0 if reverse else 9999
-            return sorted(papers, key=year_key, reverse=reverse)
-        
-        elif sort_by == "title":
-            # 按标题字母顺序排序
-            return sorted(papers, key=lambda x: x.get('title', '').lower(), reverse=reverse)
-        
-        elif sort_by == "relevance":
+        if sort_by == "relevance":
             # 按相关性排序（保持原始顺序，因为Google Scholar已按相关性排序）
             print("  ℹ️  按相关性排序：保持Google Scholar原始排序")
             return papers
         
-        else:
+        if sort_by not in ("citations", "year", "title"):
             print(f"  ⚠️  未知排序字段 '{sort_by}'，使用引用量排序")
-            return sorted(papers, key=lambda x: x.get('citations', 0), reverse=reverse)
+            sort_by = "citations"
+        
+        if isinstance(papers, PaperSpool):
+            return papers.sort(sort_by, sort_order)
+        table = papers if isinstance(papers, PaperTable) else PaperTable(papers, self.symbols)
+        result = table.sort(sort_by, sort_order)
+        return result if isinstance(papers, PaperTable) else result.to_list()
     
-    def sort_by_citations(self, papers: List[Dict], descending=True) -> List[Dict]:
+    def sort_by_citations(self, papers: List[Paper], descending=True) -> List[Paper]:
         """
         按引用量排序（保留向后兼容）
         
@@ -230,27 +1115,37 @@ class ScholarCrawler:
         """
         return self.sort_papers(papers, "citations", "desc" if descending else "asc")
     
-    def filter_by_citations(self, papers: List[Dict], min_citations: int = 0) -> List[Dict]:
+    def filter_by_citations(self, papers: List[Paper], min_citations: int = 0) -> List[Paper]:
         """
         按最小引用量筛选
         
+        在 PaperTable 的引用数列上筛选；传入 PaperTable 时返回 PaperTable，否则返回列表。
+        传入 PaperSpool 时逐篇筛选，返回 PaperSpool。
+        
         Args:
-            papers: 文献列表
+            papers: 文献列表（Paper 或旧格式的字典）、PaperTable 或 PaperSpool
             min_citations: 最小引用量
             
         Returns:
             筛选后的文献列表
         """
-        filtered = [p for p in papers if p['citations'] >= min_citations]
+        if isinstance(papers, PaperSpool):
+            filtered = papers.filter(lambda paper: paper.citations >= min_citations)
+            print(f"📌 筛选引用量 >= {min_citations} 的文献: {len(filtered)} 篇")
+            return filtered
+        table = papers if isinstance(papers, PaperTable) else PaperTable(papers, self.symbols)
+        filtered = table.where(min_citations=min_citations)
         print(f"📌 筛选引用量 >= {min_citations} 的文献: {len(filtered)} 篇")
-        return filtered
+        return filtered if isinstance(papers, PaperTable) else filtered.to_list()
     
-    def export_to_csv(self, papers: List[Dict], filename: str, keyword: str):
+    def export_to_csv(self, papers: List[Paper], filename: str, keyword: str):
         """
         导出为CSV文件
         
+        逐篇写入，papers 为 PaperSpool 时不会把全部文献读入内存。
+        
         Args:
-            papers: 文献列表
+            papers: 文献列表（或 PaperTable、PaperSpool）
             filename: 输出文件名
             keyword: 搜索关键字
         """
@@ -265,9 +1160,7 @@ class ScholarCrawler:
         
         # 写入CSV
         with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            fieldnames = ['title', 'authors', 'year', 'venue', 'publisher', 
-                         'citations', 'abstract', 'url', 'eprint_url']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer = csv.DictWriter(f, fieldnames=Paper.FIELDS)
             
             writer.writeheader()
             for paper in papers:
@@ -278,28 +1171,31 @@ class ScholarCrawler:
         # 输出统计信息
         self._print_statistics(papers, keyword)
     
-    def _print_statistics(self, papers: List[Dict], keyword: str):
+    def _print_statistics(self, papers: List[Paper], keyword: str):
         """打印统计信息"""
         if not papers:
             return
         
-        total = len(papers)
-        citations = [p['citations'] for p in papers]
+        if isinstance(papers, (PaperTable, PaperSpool)):
+            table = papers
+        else:
+            table = PaperTable(papers, self.symbols)
+        total_citations, mean, highest, lowest = table.citation_stats()
         
         print("\n" + "="*60)
         print(f"📊 统计信息 - 关键字: '{keyword}'")
         print("="*60)
-        print(f"总文献数: {total}")
-        print(f"总引用数: {sum(citations)}")
-        print(f"平均引用数: {sum(citations)/total:.1f}")
-        print(f"最高引用数: {max(citations)}")
-        print(f"最低引用数: {min(citations)}")
+        print(f"总文献数: {len(table)}")
+        print(f"总引用数: {total_citations}")
+        print(f"平均引用数: {mean:.1f}")
+        print(f"最高引用数: {highest}")
+        print(f"最低引用数: {lowest}")
         
         # Top 5 高引用文献
         print("\n🏆 Top 5 高引用文献:")
-        for i, paper in enumerate(papers[:5], 1):
-            print(f"{i}. [{paper['citations']}次] {paper['title']}")
-            print(f"   作者: {paper['authors'][:100]}...")
+        for i, paper in enumerate(islice(table, 5), 1):
+            print(f"{i}. [{paper.citations}次] {paper['title']}")
+            print(f"   作者: {paper.authors_text[:100]}...")
             print(f"   年份: {paper['year']}\n")
         
         print("="*60 + "\n")
@@ -321,17 +1217,45 @@ def main():
     python scholar_crawler.py "computer vision" --authors "Yann LeCun" --venues "CVPR,ICCV"
     python scholar_crawler.py "NLP" --publishers "ACL" --exclude "survey,review"
     python scholar_crawler.py "AI" --config advanced_search.json
+  
+  中断后继续:
+    python scholar_crawler.py --resume 20240101_120000_3f2a
+  
+  录制与回放:
+    python scholar_crawler.py "deep learning" --record cassettes/dl
+    python scholar_crawler.py "deep learning" --replay cassettes/dl
         """
     )
     
     # 基础参数
-    parser.add_argument('keyword', type=str, help='搜索关键字')
+    parser.add_argument('keyword', type=str, nargs='?', default=None,
+                       help='搜索关键字（使用 --resume 时可省略）')
     parser.add_argument('--max', type=int, default=50, 
                        help='最大获取文献数量 (默认: 50)')
     parser.add_argument('--output', type=str, default=None,
                        help='输出CSV文件名 (默认: 自动生成)')
     parser.add_argument('--proxy', action='store_true',
                        help='使用代理 (推荐)')
+    parser.add_argument('--budget', type=int, default=None,
+                       help='请求预算：结果页与补全详情请求的总数 (默认: config.REQUEST_BUDGET，未设置时按 --max 推算)')
+    parser.add_argument('--slice-years', action='store_true',
+                       help='按年份切分查询并发抓取（--max 超过单个查询的结果上限时自动启用）')
+    parser.add_argument('--max-memory', type=float, default=None, metavar='MB',
+                       help='结果在内存中占用的上限（MB），超出时写入临时文件，'
+                            '排序和导出直接在临时文件上进行 (默认: config.MAX_MEMORY_MB，不限制)')
+    parser.add_argument('--fill-details', action='store_true',
+                       help='补全详情（完整摘要、出版商），只补全通过初筛的文献')
+    parser.add_argument('--resume', type=str, default=None, metavar='RUN_ID',
+                       help='继续中断的运行（已记录的请求直接重放，不再访问网络）')
+    parser.add_argument('--keep-journal', action='store_true',
+                       help='运行正常完成后保留运行记录（默认删除）')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='不使用结果页缓存（总是访问 Google Scholar）')
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record', type=str, default=None, metavar='DIR',
+                                help='录制所有原始HTTP响应到目录')
+    cassette_group.add_argument('--replay', type=str, default=None, metavar='DIR',
+                                help='从录制目录回放响应（不访问网络、不限速）')
     
     # 高级检索参数
     advanced_group = parser.add_argument_group('高级检索选项')
@@ -367,11 +1291,32 @@ def main():
     
     args = parser.parse_args()
     
+    # 运行记录：继续中断的运行时沿用当时的命令行参数
+    journal = None
+    if args.resume:
+        try:
+            journal = CrawlJournal(args.resume)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return
+        args = parser.parse_args(journal.params.get('argv', []))
+        print(f"↩ 继续运行 {journal.run_id}: {' '.join(journal.params.get('argv', []))}")
+    elif not args.keyword:
+        parser.error('需要提供搜索关键字（或使用 --resume RUN_ID）')
+    
     # 生成默认输出文件名
+    argv = sys.argv[1:]
     if args.output is None:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         safe_keyword = args.keyword.replace(' ', '_').replace('/', '_')
         args.output = f"results/{safe_keyword}_{timestamp}.csv"
+        argv = argv + ['--output', args.output]
+    
+    if journal is None and not args.replay:
+        journal = CrawlJournal()
+        journal.start_run('search', {'argv': argv})
+        print(f"📓 运行记录: {journal.path}（中断后可用 --resume {journal.run_id} 继续，"
+              f"正常完成后{'保留' if args.keep_journal else '删除'}）")
     
     # 构建高级检索配置
     advanced_config = None
@@ -430,12 +1375,50 @@ def main():
             advanced_config.sort_by = args.sort_by
             advanced_config.sort_order = args.sort_order
     
+    # 录制 / 回放原始响应
+    cassette = None
+    if args.record:
+        cassette = Cassette(args.record, mode='record')
+    elif args.replay:
+        try:
+            cassette = Cassette(args.replay, mode='replay')
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return
+    activate_cassette(cassette)
+    
     # 创建爬虫实例
-    crawler = ScholarCrawler(use_proxy=args.proxy)
+    if args.replay:
+        # 回放时不访问网络，无需代理和限速
+        crawler = ScholarCrawler(rate_limiter=RateLimiterRegistry.unlimited(), use_cache=False,
+                                 use_raw_store=False)
+    else:
+        # 录制时需要真实响应，不读取缓存
+        crawler = ScholarCrawler(use_proxy=args.proxy,
+                                 use_cache=False if (args.no_cache or args.record) else None)
+    
+    # 出版商只在详情页中提供，按出版商筛选时必须补全详情
+    fill_details = args.fill_details
+    if advanced_config and advanced_config.publishers and not fill_details:
+        print("ℹ 按出版商筛选需要补全详情，已自动启用 --fill-details")
+        fill_details = True
+    
+    # 搜索文献（使用高级检索配置）；搜索结束后关闭代理通道
+    try:
+        papers = crawler.search_papers(args.keyword, max_results=args.max, 
+                                       advanced_config=advanced_config,
+                                       fill_details=fill_details,
+                                       request_budget=args.budget,
+                                       slice_years=args.slice_years,
+                                       journal=journal,
+                                       max_memory=args.max_memory)
+    finally:
+        crawler.close()
     
-    # 搜索文献（使用高级检索配置）
-    papers = crawler.search_papers(args.keyword, max_results=args.max, 
-                                   advanced_config=advanced_config)
+    if cassette:
+        print(f"📼 {cassette.summary()}")
+    if crawler.cache is not None:
+        print(f"🗄 {crawler.cache.summary()}")
     
     if not papers:
         print("❌ 未获取到任何文献，请检查网络连接或尝试使用 --proxy 参数")
@@ -451,6 +1434,12 @@ def main():
     
     # 导出CSV
     crawler.export_to_csv(papers, args.output, args.keyword)
+    if journal is not None:
+        journal.finish_search(crawler.search_key(args.keyword, args.max, advanced_config),
+                              len(papers), args.output)
+        # 正常完成的运行不再需要继续，删除记录，避免 runs/ 中的文件越积越多
+        if not args.keep_journal:
+            journal.remove()
 
 
 if __name__ == '__main__':
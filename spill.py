@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+溢出到磁盘的文献列表
+按年份切分抓取十万篇以上的文献时，结果无法全部保存在内存中。PaperSpool 先把文献放在内存中，
+估计的占用超过上限后把这些文献写入临时目录中的一个分段，然后清空内存继续加入。
+迭代时先依次读出各分段，再读内存中的文献。排序采用外部归并排序：
+按上限把文献切成若干块，每块在内存中排好序后写成一个有序段，迭代时再多路归并，
+排序过程中内存里最多只有一块。导出 CSV 和打印统计都只需迭代，结果与使用列表时相同。
+分段只在本进程内读写，按批 pickle 保存（比逐行 JSON 快，读出时不必重新解析字段）
+"""
+
+import heapq
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import weakref
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from paper import Paper, as_paper
+
+
+# 一次最多同时归并的有序段数（超过时先把相邻的有序段合并）
+MERGE_FAN_IN = 64
+
+# 分段中每批 pickle 的文献数
+SEGMENT_BATCH = 1000
+
+
+def paper_size(paper: Paper) -> int:
+    """
+    估计一篇文献占用的内存（字节）
+
+    按每个字符串单独计算；用符号表驻留后，重复的会议/期刊和作者名实际共享同一个对象，
+    因此这是占用的上限。
+    """
+    size = sys.getsizeof(paper) + sys.getsizeof(paper.authors) + 8   # 8: 列表中的引用
+    for value in (paper.title, paper.venue, paper.publisher, paper.abstract,
+                  paper.url, paper.eprint_url):
+        if value is not None:
+            size += sys.getsizeof(value)
+    return size + sum(map(sys.getsizeof, paper.authors))
+
+
+def sort_key(sort_by: str, descending: bool) -> Callable[[Paper], object]:
+    """与 PaperTable.sort 相同的排序键（缺少年份的文献排在最后）"""
+    if sort_by == "year":
+        missing = 0 if descending else 9999
+        return lambda paper: missing if paper.year is None else paper.year
+    if sort_by == "title":
+        return lambda paper: (paper.title or 'N/A').lower()
+    return lambda paper: paper.citations
+
+
+class PaperSpool:
+    """
+    内存占用超过上限时把已有文献写入临时分段的文献列表
+
+    迭代和 len() 的行为与列表相同（按加入顺序；排序结果按排序后的顺序），
+    可以直接传给 export_to_csv、sort_papers 等接口。
+    调用 close() 或对象被回收时删除临时文件。
+    """
+
+    def __init__(self, max_memory_mb: float, directory: Optional[str] = None):
+        """
+        Args:
+            max_memory_mb: 内存中文献占用的上限（MB）
+            directory: 临时分段的上级目录（默认 config.SPILL_DIR，未设置时使用系统临时目录）
+        """
+        if directory is None:
+            try:
+                import config
+                directory = getattr(config, 'SPILL_DIR', None)
+            except ImportError:
+                directory = None
+        self.max_memory_mb = max_memory_mb
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.directory = directory
+        self._memory: List[Paper] = []
+        self._memory_bytes = 0
+        self._segments: List[str] = []
+        self._count = 0
+        # 引用数的 (总和, 最大值, 最小值)，加入时累计
+        self._stats: Optional[Tuple[int, int, int]] = None
+        # 排序结果：各分段和内存部分分别有序，迭代时按 (排序键, 是否降序) 归并
+        self._merge: Optional[Tuple[Callable, bool]] = None
+        self._tmpdir: Optional[str] = None
+        self._finalizer = None
+        self._next_segment = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def spilled(self) -> bool:
+        """是否已有文献写入磁盘"""
+        return bool(self._segments)
+
+    # ---------- 临时分段 ----------
+
+    def _temp_dir(self) -> str:
+        """本对象的临时目录（第一次写入分段时创建）"""
+        if self._tmpdir is None:
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+            self._tmpdir = tempfile.mkdtemp(prefix='papers_', dir=self.directory)
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self._tmpdir, True)
+        return self._tmpdir
+
+    def _segment_path(self) -> str:
+        self._next_segment += 1
+        return os.path.join(self._temp_dir(), f"{self._next_segment:05d}.pickle")
+
+    def _write_segment(self, papers: Iterable[Paper]) -> str:
+        """把文献写入新分段，返回文件路径"""
+        path = self._segment_path()
+        with open(path, 'wb') as f:
+            batch = []
+            for paper in papers:
+                batch.append(paper)
+                if len(batch) >= SEGMENT_BATCH:
+                    pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+                    batch = []
+            if batch:
+                pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @staticmethod
+    def _read_segment(path: str) -> Iterator[Paper]:
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+
+    def _spill(self):
+        """把内存中的文献写入一个分段"""
+        if not self._memory:
+            return
+        if not self._segments:
+            print(f"💾 结果超过内存上限 {self.max_memory_mb} MB，"
+                  f"文献分段写入临时目录 {self._temp_dir()}")
+        self._segments.append(self._write_segment(self._memory))
+        self._memory = []
+        self._memory_bytes = 0
+
+    def close(self):
+        """删除临时文件"""
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---------- 加入与迭代 ----------
+
+    def append(self, paper):
+        """加入一篇文献（Paper，或旧格式的字典）"""
+        if self._merge is not None:
+            raise TypeError("排序结果不能再加入文献")
+        paper = as_paper(paper)
+        self._memory.append(paper)
+        self._memory_bytes += paper_size(paper)
+        self._count += 1
+        citations = paper.citations
+        if self._stats is None:
+            self._stats = (citations, citations, citations)
+        else:
+            total, highest, lowest = self._stats
+            self._stats = (total + citations, max(highest, citations), min(lowest, citations))
+        if self._memory_bytes > self.max_bytes:
+            self._spill()
+
+    def extend(self, papers: Iterable):
+        """批量加入文献（例如 iter_papers 产生的文献）"""
+        for paper in papers:
+            self.append(paper)
+
+    def __iter__(self) -> Iterator[Paper]:
+        runs = [self._read_segment(path) for path in self._segments]
+        runs.append(iter(list(self._memory)))
+        if self._merge is None:
+            for run in runs:
+                yield from run
+        else:
+            key, descending = self._merge
+            yield from heapq.merge(*runs, key=key, reverse=descending)
+
+    def to_list(self) -> List[Paper]:
+        return list(self)
+
+    # ---------- 排序与筛选 ----------
+
+    def _derive(self) -> 'PaperSpool':
+        return PaperSpool(self.max_memory_mb, self.directory)
+
+    def sort(self, sort_by: str = "citations", sort_order: str = "desc") -> 'PaperSpool':
+        """
+        外部归并排序，返回新的 PaperSpool（稳定排序，与 PaperTable.sort 的顺序相同）
+
+        Args:
+            sort_by: 排序字段 ("citations", "year", "title")
+            sort_order: 排序顺序 ("desc"降序 或 "asc"升序)
+        """
+        descending = (sort_order == "desc")
+        key = sort_key(sort_by, descending)
+        result = self._derive()
+        if self._segments:
+            # 内存部分也写入磁盘，排序时内存中只保留当前这一块
+            self._spill()
+
+        chunk, size = [], 0
+        for paper in self:
+            chunk.append(paper)
+            size += paper_size(paper)
+            if size > self.max_bytes:
+                chunk.sort(key=key, reverse=descending)
+                result._segments.append(result._write_segment(chunk))
+                chunk, size = [], 0
+        chunk.sort(key=key, reverse=descending)
+        result._memory, result._memory_bytes = chunk, size
+        result._count, result._stats = self._count, self._stats
+
+        # 有序段过多时先合并相邻的有序段（相等的文献保持原来的先后顺序）
+        while len(result._segments) > MERGE_FAN_IN:
+            merged = []
+            for i in range(0, len(result._segments), MERGE_FAN_IN):
+                group = result._segments[i:i + MERGE_FAN_IN]
+                if len(group) > 1:
+                    runs = map(result._read_segment, group)
+                    merged.append(result._write_segment(
+                        heapq.merge(*runs, key=key, reverse=descending)))
+                    for path in group:
+                        os.remove(path)
+                else:
+                    merged.extend(group)
+            result._segments = merged
+        result._merge = (key, descending)
+        return result
+
+    def filter(self, predicate: Callable[[Paper], bool]) -> 'PaperSpool':
+        """保留满足条件的文献（保持顺序），返回新的 PaperSpool"""
+        result = self._derive()
+        result.extend(paper for paper in self if predicate(paper))
+        return result
+
+    # ---------- 统计 ----------
+
+    def citation_stats(self) -> Tuple[int, float, int, int]:
+        """引用数的 (总和, 平均值, 最大值, 最小值)；空表时抛出 ValueError"""
+        if not self._count:
+            raise ValueError("空表没有统计信息")
+        total, highest, lowest = self._stats
+        return total, total / self._count, highest, lowest
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+符号表（字典编码）
+会议/期刊名、出版商和作者名在一批结果中大量重复。SymbolTable 给每个不同的字符串分配一个整数编号，
+并保存唯一的一份字符串对象：抓取时用它驻留字符串（相同的值共享同一个对象），
+列式文献表（PaperTable）和运行记录（CrawlJournal）中用编号代替字符串，
+筛选、分组时比较整数，每个不同的字符串只参与一次字符串比较
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+# None（字段缺失）的编号
+NO_SYMBOL = -1
+
+
+class SymbolTable:
+    """
+    字符串 ↔ 整数编号（按首次出现的顺序从 0 开始）
+
+    一次运行使用一个符号表；编号只在同一个符号表内有意义。
+    """
+
+    def __init__(self, values: Iterable[str] = ()):
+        """
+        Args:
+            values: 初始字符串（按顺序分配编号）
+        """
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+        # 小写形式，筛选时按需计算
+        self._folded: List[str] = []
+        self._lock = threading.Lock()
+        for value in values:
+            self.encode(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value) -> bool:
+        return value in self._ids
+
+    def encode(self, value: Optional[str]) -> int:
+        """字符串的编号（新字符串分配新编号）"""
+        if value is None:
+            return NO_SYMBOL
+        symbol = self._ids.get(value)
+        if symbol is None:
+            with self._lock:
+                symbol = self._ids.get(value)
+                if symbol is None:
+                    symbol = len(self.values)
+                    self.values.append(value)
+                    self._ids[value] = symbol
+        return symbol
+
+    def decode(self, symbol: int) -> Optional[str]:
+        """编号对应的字符串"""
+        return None if symbol == NO_SYMBOL else self.values[symbol]
+
+    def encode_all(self, values: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(map(self.encode, values))
+
+    def decode_all(self, symbols: Iterable[int]) -> Tuple[str, ...]:
+        return tuple(map(self.values.__getitem__, symbols))
+
+    def intern(self, value: Optional[str]) -> Optional[str]:
+        """相同字符串的唯一对象（首次出现时登记）"""
+        if value is None:
+            return None
+        return self.values[self.encode(value)]
+
+    def matching(self, patterns: Sequence[str]) -> Set[int]:
+        """
+        包含任一模式（不区分大小写）的字符串的编号
+
+        每个不同的字符串只比较一次，筛选时再按编号判断每一行。
+        """
+        folded = self._folded
+        if len(folded) < len(self.values):
+            folded.extend(value.lower() for value in self.values[len(folded):])
+        patterns = [p.lower() for p in patterns]
+        return {symbol for symbol, value in enumerate(folded)
+                if any(p in value for p in patterns)}
+
+    def load(self, start: int, values: Sequence[str]):
+        """
+        按保存时的编号恢复（运行记录中的符号段）
+
+        Raises:
+            ValueError: 编号不连续
+        """
+        if start != len(self.values):
+            raise ValueError(f"符号编号不连续: 期望 {len(self.values)}，实际 {start}")
+        for value in values:
+            self.encode(value)
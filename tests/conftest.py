@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""
+测试公用的假后端和爬虫
+
+SyntheticBackend 按年份生成确定的文献，不访问网络；与 backends.RecordingBackend /
+ReplayBackend 组合可以录制后离线回放。和 Google Scholar 一样，单个查询最多翻到
+result_cap 条结果，total_results 为年份范围内的全部文献数。
+"""
+
+import threading
+
+import pytest
+
+import cassette
+import config
+import raw_store
+from backends import PAGE_SIZE, RecordingBackend, ReplayBackend, ResultPage
+from rate_limiter import RateLimiterRegistry
+from scholar_crawler import ScholarCrawler
+
+
+VENUES = ('CVPR', 'ICML', 'arXiv')
+
+
+class SyntheticBackend:
+    """每年 per_year 篇文献的假后端"""
+
+    name = 'synthetic'
+
+    def __init__(self, per_year: int = 150, first_year: int = 2000, last_year: int = 2020,
+                 result_cap: int = 1000):
+        self.per_year = per_year
+        self.years = range(first_year, last_year + 1)
+        self.result_cap = result_cap
+        self.requests = 0
+        self.fills = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def pub(year: int, i: int) -> dict:
+        return {
+            'bib': {'title': f"Paper {year}-{i}",
+                    'author': [f"Author {i % 7}", f"Author {year}"],
+                    'pub_year': str(year),
+                    'venue': VENUES[i % len(VENUES)],
+                    'abstract': f"Abstract of paper {year}-{i}"},
+            'num_citations': (i * 37) % 500,
+            'cites_id': [f"{year}-{i}"],
+            'pub_url': f"https://example.org/{year}/{i}",
+        }
+
+    def search(self, query, start_index=0, year_low=None, year_high=None):
+        with self._lock:
+            self.requests += 1
+        years = [y for y in self.years
+                 if (year_low is None or y >= year_low) and (year_high is None or y <= year_high)]
+        total = len(years) * self.per_year
+        visible = min(total, self.result_cap)
+        stop = min(start_index + PAGE_SIZE, visible)
+        pubs = [self.pub(years[n // self.per_year], n % self.per_year)
+                for n in range(start_index, stop)]
+        return ResultPage(pubs, start_index, total, has_next=stop < visible)
+
+    def fill(self, pub):
+        with self._lock:
+            self.fills += 1
+        filled = dict(pub, bib=dict(pub['bib']))
+        filled['bib']['publisher'] = 'IEEE' if pub['num_citations'] % 2 else 'ACM'
+        return filled
+
+    def cited_by(self, pub, start_index=0):
+        return ResultPage([], start_index, 0, has_next=False)
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path, monkeypatch):
+    """运行记录、缓存和原始页面都写到临时目录；进程级的原始页面存储和录制/回放在测试后恢复"""
+    monkeypatch.setattr(config, 'JOURNAL_DIR', str(tmp_path / 'runs'))
+    monkeypatch.setattr(config, 'PAGE_CACHE_PATH', str(tmp_path / 'cache' / 'pages.sqlite3'))
+    monkeypatch.setattr(config, 'NEGATIVE_CACHE_PATH', str(tmp_path / 'cache' / 'failures.sqlite3'))
+    monkeypatch.setattr(config, 'RAW_STORE_DIR', str(tmp_path / 'raw_pages'))
+    monkeypatch.setattr(raw_store, '_active', raw_store.get_active())
+    monkeypatch.setattr(cassette, '_active', cassette.get_active())
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def backend():
+    return SyntheticBackend()
+
+
+def make_crawler(backend, **kwargs) -> ScholarCrawler:
+    """不限速、不使用缓存的爬虫"""
+    kwargs.setdefault('rate_limiter', RateLimiterRegistry.unlimited())
+    kwargs.setdefault('use_cache', False)
+    return ScholarCrawler(backend=backend, **kwargs)
+
+
+def record(directory: str, keyword: str = "q", **kwargs) -> ReplayBackend:
+    """
+    通过 RecordingBackend 对 SyntheticBackend 搜索一次，返回回放这些请求的 ReplayBackend
+
+    回放后端为严格模式：请求了没有录制的结果页时报错。
+    """
+    make_crawler(RecordingBackend(SyntheticBackend(), directory)).search_papers(keyword, **kwargs)
+    return ReplayBackend(directory, strict=True)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""请求录制与回放：通过代理通道录制 scholarly 的原始响应，之后离线回放得到相同的文献"""
+
+import httpx
+import pytest
+
+import proxy_pool
+from cassette import Cassette, CassetteMiss, activate as activate_cassette
+from proxy_pool import ProxyPool
+from rate_limiter import RateLimiterRegistry
+from scholar_crawler import ScholarCrawler
+
+
+TOTAL = 25
+ROW = """
+<div class="gs_r gs_or gs_scl" data-cid="cid{n}" data-rp="{n}">
+  <div class="gs_ri">
+    <h3 class="gs_rt"><a href="https://example.org/{n}">Paper {n}</a></h3>
+    <div class="gs_a">Author {a}, Author {b} - Venue {v}, {year} - example.org</div>
+    <div class="gs_rs">Abstract of paper {n}</div>
+    <div class="gs_fl">
+      <a href="/scholar?cites={n}">Cited by {cites}</a>
+      <a href="/scholar?q=related:{n}">Related articles</a>
+    </div>
+  </div>
+</div>
+"""
+
+
+def result_page(start: int) -> str:
+    """Google Scholar 结果页的最小 HTML（共 TOTAL 条结果，每页 10 条）"""
+    rows = "".join(ROW.format(n=n, a=n % 3, b=n % 5, v=n % 4, year=2000 + n % 20,
+                              cites=(n * 37) % 500)
+                   for n in range(start, min(start + 10, TOTAL)))
+    return (f'<html><body><div id="gs_res_glb" data-sva="/scholar?lib={{id}}"></div>'
+            f'<div class="gs_ab_mdw">About {TOTAL} results</div>{rows}</body></html>')
+
+
+@pytest.fixture
+def scholar(monkeypatch):
+    """代理通道的 httpx 请求由 MockTransport 应答结果页，记录请求的 URL"""
+    requests = []
+    real_client = httpx.Client
+
+    def handle(request):
+        requests.append(str(request.url))
+        if request.url.host == 'check.test':
+            return httpx.Response(200, text="ok")
+        return httpx.Response(200, text=result_page(int(request.url.params.get('start', 0))))
+
+    def client(proxy=None, **kwargs):
+        return real_client(transport=httpx.MockTransport(handle), **kwargs)
+
+    monkeypatch.setattr(proxy_pool.httpx, 'Client', client)
+    return requests
+
+
+def test_record_then_replay_returns_same_papers(tmp_path, scholar):
+    directory = str(tmp_path / 'cassette')
+    pool = ProxyPool(check_url="http://check.test/ip")
+    pool.add("http://10.0.0.1:3128")
+
+    recording = Cassette(directory, mode='record')
+    activate_cassette(recording)
+    with ScholarCrawler(use_proxy=True, proxy_pool=pool, use_cache=False, use_raw_store=False,
+                        rate_limiter=RateLimiterRegistry.unlimited()) as crawler:
+        recorded = crawler.search_papers("deep learning", max_results=TOTAL)
+    pages = [url for url in scholar if 'scholar.google.com' in url]
+    assert len(recorded) == TOTAL
+    assert (recorded[3].title, recorded[3].year, recorded[3].citations) == ("Paper 3", 2003, 111)
+    assert recording.recorded == len(pages) == 3
+
+    # 回放：不使用代理，不发出任何请求
+    del scholar[:]
+    replaying = Cassette(directory, mode='replay')
+    activate_cassette(replaying)
+    crawler = ScholarCrawler(use_cache=False, rate_limiter=RateLimiterRegistry.unlimited())
+    replayed = crawler.search_papers("deep learning", max_results=TOTAL)
+
+    assert [paper.to_dict() for paper in replayed] == [paper.to_dict() for paper in recorded]
+    assert scholar == []
+    assert (replaying.hits, replaying.misses) == (3, 0)
+    with pytest.raises(CassetteMiss):
+        replaying.play("https://scholar.google.com/scholar?q=other")
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import pytest
+
+import config
+import scholar_crawler
+from conftest import SyntheticBackend
+from rate_limiter import RateLimiterRegistry
+
+
+@pytest.fixture
+def run_main(monkeypatch):
+    """用 SyntheticBackend 代替 Google Scholar、不限速地运行命令行"""
+    monkeypatch.setattr(scholar_crawler, 'ScholarlyBackend', SyntheticBackend)
+    monkeypatch.setattr(scholar_crawler, 'get_shared_registry', RateLimiterRegistry.unlimited)
+    
+    def run(*argv):
+        monkeypatch.setattr(sys, 'argv', ['scholar_crawler.py', *argv])
+        scholar_crawler.main()
+    return run
+
+
+def test_journal_removed_after_clean_run(run_main):
+    run_main("q", "--max", "20", "--output", "out.csv")
+    assert os.path.exists("out.csv")
+    assert os.listdir(config.JOURNAL_DIR) == []
+
+
+def test_keep_journal(run_main):
+    run_main("q", "--max", "20", "--output", "out.csv", "--keep-journal")
+    assert len(os.listdir(config.JOURNAL_DIR)) == 1
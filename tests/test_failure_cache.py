@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""失败记录：连续失败的冷却时间翻倍，成功后清除"""
+
+import pytest
+
+import failure_cache
+from failure_cache import PROXY, QUERY, FailureCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 time.time"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(failure_cache.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def failures(tmp_path):
+    cache = FailureCache(str(tmp_path / 'failures.sqlite3'), base_cooldown=300,
+                         max_cooldown=3600)
+    yield cache
+    cache.close()
+
+
+def test_cooldown_doubles_up_to_limit(failures):
+    assert [failures.cooldown_for(n) for n in range(1, 6)] == [300, 600, 1200, 2400, 3600]
+    assert [failures.record_failure(QUERY, "k", "HTTP 429") for _ in range(6)] == \
+        [300, 600, 1200, 2400, 3600, 3600]
+    assert failures.get(QUERY, "k")['failures'] == 6
+
+
+def test_remaining_counts_down(failures, clock):
+    assert failures.remaining(QUERY, "k") == 0.0
+    failures.record_failure(QUERY, "k")
+    assert failures.remaining(QUERY, "k") == 300
+
+    clock[0] += 100
+    assert failures.remaining(QUERY, "k") == 200
+    # 冷却期内再次失败：从现在起冷却 600 秒
+    failures.record_failure(QUERY, "k")
+    assert failures.remaining(QUERY, "k") == 600
+
+    clock[0] += 600
+    assert failures.remaining(QUERY, "k") == 0.0
+    assert failures.entries() == []
+    # 冷却结束后记录仍保留，下一次失败继续翻倍
+    assert failures.record_failure(QUERY, "k") == 1200
+
+
+def test_success_clears_record(failures):
+    failures.record_failure(PROXY, "http://10.0.0.1:3128")
+    failures.record_failure(QUERY, "k")
+    failures.record_success(PROXY, "http://10.0.0.1:3128")
+    assert failures.remaining(PROXY, "http://10.0.0.1:3128") == 0.0
+    assert failures.get(PROXY, "http://10.0.0.1:3128") is None
+    assert failures.record_failure(PROXY, "http://10.0.0.1:3128") == 300
+    # 范围与键分开记录
+    assert {(entry['scope'], entry['key']) for entry in failures.entries()} == \
+        {(QUERY, "k"), (PROXY, "http://10.0.0.1:3128")}
+
+
+def test_records_shared_between_instances(failures, clock):
+    failures.record_failure(QUERY, "k", "captcha", label="deep learning")
+    other = FailureCache(failures.path, base_cooldown=300, max_cooldown=3600)
+    assert other.remaining(QUERY, "k") == 300
+    assert other.get(QUERY, "k")['label'] == "deep learning"
+    other.record_success(QUERY, "k")
+    other.close()
+    assert failures.remaining(QUERY, "k") == 0.0
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+from config import AdvancedSearchConfig
+from conftest import make_crawler
+from fetch_budget import FetchBudget, default_limit
+
+
+def test_default_limit_scales_with_target():
+    # 与原来按目标数量的 3 倍抓取相同：--max 50 最多 15 页
+    assert default_limit(50) == 15
+    assert default_limit(10) == 5
+    assert default_limit(1000) == 300
+    assert default_limit(2000, slack=1.5) == 300
+    assert default_limit(100, fill_details=True) == (10 + 200) * 3
+
+
+def test_no_projection_without_local_filters():
+    budget = FetchBudget(1000, 100, filtering=False)
+    for _ in range(20):
+        budget.on_scanned()
+        budget.observe(True)
+    assert not budget.should_stop(20, 2)
+
+
+def test_projection_with_low_acceptance():
+    budget = FetchBudget(100, 20)
+    for i in range(50):
+        budget.on_scanned()
+        budget.observe(i % 10 == 0)
+    assert budget.should_stop(5, 5)
+    assert not budget.should_stop(100, 5)
+
+
+def test_unfiltered_search_returns_max_results(backend):
+    # 回归：默认预算曾在扫描 10 篇后按预测提前停止，只返回 10 篇
+    papers = make_crawler(backend).search_papers("q", max_results=1000)
+    assert len(papers) == 1000
+    assert len({paper.title for paper in papers}) == 1000
+
+
+def test_projection_stops_early(backend, capsys):
+    # 年份范围无效时本地筛选掉所有文献：判定 min_scanned 篇后按预测提前停止，不用完预算
+    config = AdvancedSearchConfig()
+    config.year_start, config.year_end = 2018, 2010
+    papers = make_crawler(backend).search_papers("q", max_results=50, advanced_config=config,
+                                                 request_budget=100)
+    assert papers == []
+    assert "提前停止" in capsys.readouterr().out
+    assert backend.requests < 10
+
+
+def test_projection_keeps_fetching_while_target_reachable(backend):
+    # 通过率约 10%：预算足够时不提前停止
+    config = AdvancedSearchConfig()
+    config.citations_min = 450
+    papers = make_crawler(backend).search_papers("q", max_results=20, advanced_config=config,
+                                                 request_budget=100)
+    assert len(papers) == 20
+    assert all(paper.citations >= 450 for paper in papers)
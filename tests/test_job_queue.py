@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+import config
+from config import AdvancedSearchConfig
+from conftest import SyntheticBackend, make_crawler
+from job_queue import JobQueue, run_worker
+
+
+def make_queue(tmp_path, **kwargs):
+    return JobQueue(str(tmp_path / 'jobs.sqlite3'), **kwargs)
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    queue = make_queue(tmp_path)
+    config = AdvancedSearchConfig()
+    config.venues = ["CVPR", "ICCV"]
+    assert queue.enqueue("b", "deep learning", config)
+    same = AdvancedSearchConfig()
+    same.venues = ["iccv", "cvpr"]
+    assert not queue.enqueue("b", "Deep Learning", same)
+    assert queue.enqueue("b", "deep learning", config, year_low=2020, year_high=2020)
+    assert queue.stats("b")['pending'] == 2
+
+
+def test_lease_is_exclusive_until_it_expires(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=0.05)
+    queue.enqueue("b", "q")
+    job = queue.lease("w1")
+    assert job is not None and job.lease_owner == "w1"
+    assert queue.lease("w2") is None
+    assert queue.heartbeat(job, "w1")
+    
+    time.sleep(0.1)
+    # 租约过期（worker 崩溃）后由其他 worker 接手，原 worker 不能再续约或完成
+    taken = queue.lease("w2")
+    assert taken.id == job.id and taken.attempts == 2
+    assert not queue.heartbeat(job, "w1")
+    assert not queue.complete(job, "w1", 10)
+    assert queue.complete(taken, "w2", 10)
+    assert queue.stats()['done'] == 1
+
+
+def test_failed_job_retries_then_fails(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    queue.enqueue("b", "q")
+    assert queue.fail(queue.lease("w"), "w", "error")
+    assert not queue.fail(queue.lease("w"), "w", "error")
+    assert queue.lease("w") is None
+    assert queue.stats()['failed'] == 1
+    assert queue.requeue_failed() == 1
+    assert queue.lease("w") is not None
+
+
+def test_release_and_defer_do_not_count_attempts(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue("b", "q")
+    queue.release(queue.lease("w"), "w")
+    job = queue.lease("w")
+    assert job.attempts == 1
+    queue.defer(job, "w", time.time() + 60, "冷却中")
+    assert queue.lease("w") is None
+    assert queue.stats()['deferred'] == 1
+    assert queue.next_ready() > time.time()
+
+
+class BrokenBackend(SyntheticBackend):
+    """第一页之后的请求都出错"""
+
+    def search(self, query, start_index=0, year_low=None, year_high=None):
+        if start_index:
+            raise RuntimeError("connection reset")
+        return super().search(query, start_index, year_low, year_high)
+
+
+def test_worker_completes_job_and_removes_journal(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue("b", "q", max_results=30)
+    assert run_worker(queue, make_crawler(SyntheticBackend()), "b") == 1
+    job = queue.jobs("b")[0]
+    assert (job.status, job.result_count) == ('done', 30)
+    assert os.path.exists(job.output)
+    # 任务成功后不再保留该任务的运行记录
+    assert os.listdir(config.JOURNAL_DIR) == []
+
+
+def test_empty_search_is_done(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue("b", "q", year_low=1990, year_high=1995)
+    assert run_worker(queue, make_crawler(SyntheticBackend()), "b") == 1
+    job = queue.jobs("b")[0]
+    assert (job.status, job.result_count, job.output) == ('done', 0, None)
+    assert os.listdir(config.JOURNAL_DIR) == []
+
+
+def test_failed_search_marks_job_failed(tmp_path):
+    # 回归：没有失败记录（failures 为 None）时，出错的搜索曾被当作完成
+    queue = make_queue(tmp_path, max_attempts=1)
+    queue.enqueue("b", "q", max_results=30)
+    crawler = make_crawler(BrokenBackend())
+    assert crawler.failures is None
+    assert run_worker(queue, crawler, "b") == 0
+    job = queue.jobs("b")[0]
+    assert job.status == 'failed'
+    assert "connection reset" in job.error
+    # 运行记录保留，重新排队后从已抓取的页继续
+    assert len(os.listdir(config.JOURNAL_DIR)) == 1
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from backends import ResultPage
+from conftest import SyntheticBackend, make_crawler, record
+from journal import CrawlJournal
+from paper import Paper
+
+
+class InterruptedBackend:
+    """前 limit 个搜索请求正常回放，之后模拟网络中断"""
+
+    name = 'interrupted'
+
+    def __init__(self, inner, limit: int):
+        self.inner = inner
+        self.limit = limit
+        self.requests = 0
+
+    def search(self, *args):
+        self.requests += 1
+        if self.requests > self.limit:
+            raise ConnectionError("网络中断")
+        return self.inner.search(*args)
+
+    def fill(self, pub):
+        return self.inner.fill(pub)
+
+
+def make_journal(tmp_path):
+    journal = CrawlJournal(directory=str(tmp_path / 'runs'))
+    journal.start_run('search', {'keyword': 'q'})
+    journal.begin_search('s1', {'keyword': 'q'})
+    journal.record_paper('s1', Paper(title="A", authors=["X"], venue="CVPR", citations=3))
+    journal.record_cursor('s1', 10, 1)
+    return journal
+
+
+@pytest.mark.parametrize("tail", ['{"type": "paper", "sea', '{"type": "cursor", "search": "s1", '
+                                  '"scanned": 20, "collected": 1}'])
+def test_torn_tail_repaired_before_append(tmp_path, tail):
+    journal = make_journal(tmp_path)
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write(tail)   # 中断时只写了一部分的最后一行（可能恰好是完整的 JSON）
+    
+    resumed = CrawlJournal(journal.run_id, directory=journal.directory)
+    resumed.record_paper('s1', Paper(title="B", citations=1))
+    resumed.finish_search('s1', 2)
+    
+    reloaded = CrawlJournal(journal.run_id, directory=journal.directory)
+    assert reloaded.is_done('s1')
+    assert [paper.title for paper in reloaded.iter_papers('s1')] == ["A", "B"]
+    with open(journal.path, encoding='utf-8') as f:
+        assert f.read().endswith('\n')
+
+
+def test_checkpoints_are_synced(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(os, 'fsync', synced.append)
+    journal = make_journal(tmp_path)
+    # run、search、cursor 各一次；文献记录只 flush，随下一个检查点落盘
+    assert len(synced) == 3
+    journal.finish_search('s1', 1)
+    assert len(synced) == 4
+
+
+def test_resume_replays_journal(tmp_path):
+    replay = record(str(tmp_path / 'fixtures'), max_results=200)
+    expected = make_crawler(replay).search_papers("q", max_results=200)
+    
+    journal = CrawlJournal()
+    partial = make_crawler(InterruptedBackend(replay, 8)).search_papers(
+        "q", max_results=200, journal=journal)
+    assert 0 < len(partial) < 200
+    
+    # 继续运行：已记录的结果页直接重放，只请求中断后的结果页
+    replay.requests = 0
+    resumed = CrawlJournal(journal.run_id)
+    papers = make_crawler(replay).search_papers("q", max_results=200, journal=resumed)
+    assert [paper.to_dict() for paper in papers] == [paper.to_dict() for paper in expected]
+    assert replay.requests == 20 - 8
+    
+    search_id = make_crawler(replay).search_key("q", 200)
+    resumed.finish_search(search_id, len(papers))
+    done = CrawlJournal(journal.run_id)
+    assert [paper.to_dict() for paper in done.iter_papers(search_id)] == \
+        [paper.to_dict() for paper in expected]
+
+
+def test_pages_read_back_from_file(tmp_path):
+    journal = make_journal(tmp_path)
+    pages = {f"search_{i}": ResultPage([SyntheticBackend.pub(2000 + i, n) for n in range(10)],
+                                       i * 10, 100)
+             for i in range(3)}
+    pages["search_0"].pubs[0]['bib']['title'] = "深度学习"   # 多字节字符不影响偏移
+    for key, page in pages.items():
+        journal.record_page(key, page)
+        journal.record_paper('s1', Paper(title=key, venue="ICML"))
+    journal.record_fill("fill_x", {'bib': {'publisher': "IEEE"}})
+    
+    # 内存中只有 键 → 文件偏移
+    assert all(isinstance(offset, int) for offset in journal._pages.values())
+    for reader in (journal, CrawlJournal(journal.run_id, directory=journal.directory)):
+        for key, page in pages.items():
+            assert reader.get_page(key).to_dict() == page.to_dict()
+        assert reader.get_page("search_9") is None
+        assert reader.get_fill("fill_x") == {'bib': {'publisher': "IEEE"}}
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import json
+import sys
+import time
+
+import config
+import page_cache
+from backends import page_key
+from conftest import SyntheticBackend, make_crawler
+from page_cache import CachedBackend, PageCache, prewarm
+
+
+def make_cache(tmp_path, **kwargs):
+    return PageCache(str(tmp_path / 'pages.sqlite3'), **kwargs)
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path)
+    now = time.time()
+    cache.put('search_a', {'n': 1}, ttl=60)
+    assert cache.get('search_a') == {'n': 1}
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert cache.get('search_a') is None
+    assert cache.stats()['expired'] == 1
+    assert cache.expire() == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, max_mb=0.01)   # 约 10 KB
+    clock = [time.time()]
+    monkeypatch.setattr(time, 'time', lambda: clock[0])
+    for i in range(4):
+        clock[0] += 1
+        cache.put(f'search_{i}', {'text': 'x' * 2000}, ttl=3600)
+    clock[0] += 1
+    cache.get('search_0')   # 最近使用过，不会被淘汰
+    for i in range(4, 6):
+        clock[0] += 1
+        cache.put(f'search_{i}', {'text': 'x' * 2000}, ttl=3600)
+    assert cache.evicted > 0
+    assert cache.get('search_0') is not None
+    assert cache.get('search_1') is None
+    assert cache.get('search_5') is not None
+    assert cache.stats()['bytes'] <= cache.max_bytes
+
+
+def test_cached_backend_serves_repeated_search(tmp_path):
+    backend = SyntheticBackend()
+    cache = make_cache(tmp_path)
+    expected = make_crawler(backend, cache=cache, use_cache=True).search_papers("q", max_results=30)
+    assert backend.requests == 3
+    assert cache.get(page_key('search', 'q', 0, None, None)) is not None
+    
+    papers = make_crawler(backend, cache=cache, use_cache=True).search_papers("q", max_results=30)
+    assert backend.requests == 3
+    assert [paper.to_dict() for paper in papers] == [paper.to_dict() for paper in expected]
+    assert isinstance(make_crawler(backend, cache=cache, use_cache=True).backend, CachedBackend)
+
+
+def test_prewarm_fills_cache_for_each_config(tmp_path):
+    paths = []
+    for name, filters in (('all', {}), ('recent', {'year_start': 2018, 'year_end': 2020})):
+        path = tmp_path / f'{name}.json'
+        path.write_text(json.dumps(dict(filters, description=name)), encoding='utf-8')
+        paths.append(str(path))
+    backend = SyntheticBackend()
+    cache = make_cache(tmp_path)
+    crawler = make_crawler(backend, cache=cache, use_cache=True)
+
+    assert prewarm(["q", "r"], paths, max_results=20, crawler=crawler) == 4
+    # 每个 关键字 × 配置 的结果页各写入一条
+    assert cache.stats()['entries'] == backend.requests >= 8
+    for query in ("q", "r"):
+        assert cache.get(page_key('search', query, 0, None, None)) is not None
+        assert cache.get(page_key('search', query, 0, 2018, 2020)) is not None
+
+    # 再次预热全部命中缓存，不再请求
+    requests = backend.requests
+    assert prewarm(["q", "r"], paths, max_results=20, crawler=crawler) == 4
+    assert backend.requests == requests
+
+
+def test_compact_drops_expired_pages_and_shrinks_file(tmp_path, monkeypatch):
+    cache = PageCache()
+    now = time.time()
+    for i in range(50):
+        cache.put(f'search_old_{i}', {'text': 'x' * 20000}, ttl=60)
+    for i in range(5):
+        cache.put(f'search_new_{i}', {'text': 'y' * 20000}, ttl=3600)
+    cache.close()
+    before = PageCache().file_size()
+
+    monkeypatch.setattr(time, 'time', lambda: now + 120)
+    monkeypatch.setattr(sys, 'argv', ['page_cache.py', 'compact'])
+    page_cache.main()
+
+    cache = PageCache(config.PAGE_CACHE_PATH)
+    assert cache.stats()['entries'] == 5
+    assert cache.get('search_new_0') == {'text': 'y' * 20000}
+    assert cache.get('search_old_0') is None
+    assert cache.file_size() < before / 4
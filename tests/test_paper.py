@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+from paper import MISSING, Paper, as_paper
+
+
+def test_paper_parses_legacy_fields():
+    paper = Paper.from_dict({'title': "A", 'authors': "X and Y", 'year': "2021",
+                             'citations': "12", 'venue': MISSING})
+    assert paper.authors == ("X", "Y")
+    assert paper.year == 2021 and paper.citations == 12
+    assert paper.venue is None
+    # 按键访问与旧的字典格式相同
+    assert paper['year'] == "2021"
+    assert paper['authors'] == "X; Y"
+    assert paper['venue'] == MISSING
+    assert as_paper(paper.to_dict()).to_dict() == paper.to_dict()
+    assert as_paper(paper) is paper
+
+
+def test_paper_tolerates_bad_values():
+    paper = Paper(title="A", year="n.d.", citations=None, authors="X; Y")
+    assert paper.year is None and paper.citations == 0
+    assert paper.authors == ("X", "Y")
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from paper import Paper
+from paper_table import PaperTable
+
+
+def make_papers():
+    return [Paper(title=f"T{i}", authors=[f"Author {i % 3}", "Shared"], venue=venue,
+                  publisher="IEEE" if i % 2 else None, year=None if i == 4 else 2010 + i,
+                  citations=(i * 7) % 10)
+            for i, venue in enumerate(["CVPR", "ICML", "CVPR Workshops", "arXiv", "ICML", "CVPR"])]
+
+
+@pytest.mark.parametrize("sort_by", ["citations", "year", "title"])
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+def test_table_sort_is_stable(sort_by, sort_order):
+    papers = make_papers()
+    descending = sort_order == "desc"
+    if sort_by == "year":
+        missing = 0 if descending else 9999
+        key = lambda p: missing if p.year is None else p.year
+    elif sort_by == "title":
+        key = lambda p: p.title.lower()
+    else:
+        key = lambda p: p.citations
+    expected = sorted(papers, key=key, reverse=descending)
+    assert list(PaperTable(papers).sort(sort_by, sort_order)) == expected
+
+
+def test_table_where_and_views():
+    papers = make_papers()
+    table = PaperTable(papers)
+    cvpr = table.where(venues=["cvpr"])
+    assert [p.title for p in cvpr] == ["T0", "T2", "T5"]
+    # 年份缺失的不筛掉；视图上继续筛选、排序
+    recent = table.where(year_start=2013)
+    assert [p.title for p in recent] == ["T3", "T4", "T5"]
+    assert [p.title for p in recent.where(min_citations=5).sort()] == ["T4", "T5"]
+    assert [p.title for p in table.where(publishers=["ieee"], authors=["author 1"])] == ["T1"]
+    assert table.value_counts('venues')[:2] == [("CVPR", 2), ("ICML", 2)]
+    total = sum(p.citations for p in papers)
+    assert table.citation_stats()[0] == total
+    assert len(table[1:4]) == 3
+
+
+def test_table_extend_recodes_symbols():
+    first = PaperTable(make_papers()[:3])
+    second = PaperTable(make_papers()[3:])
+    first.extend(second)
+    assert list(first) == make_papers()
+    assert [p.title for p in first.where(venues=["ICML"])] == ["T1", "T4"]
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from config import AdvancedSearchConfig
+from conftest import SyntheticBackend, make_crawler, record
+
+
+@pytest.mark.parametrize("max_results, pages", [(100, 10), (95, 10), (30, 3)])
+def test_prefetch_stops_when_target_covered(backend, max_results, pages):
+    # 回归：预取窗口曾在凑够目标数量后继续抓取后续页
+    papers = make_crawler(backend).search_papers("q", max_results=max_results)
+    assert len(papers) == max_results
+    assert backend.requests == pages
+
+
+def test_prefetch_with_filters_stays_within_budget(backend):
+    config = AdvancedSearchConfig()
+    config.citations_min = 250
+    papers = make_crawler(backend).search_papers("q", max_results=2000, advanced_config=config,
+                                                 request_budget=150, slice_years=True)
+    assert backend.requests <= 150
+    assert papers and all(paper.citations >= 250 for paper in papers)
+
+
+def test_fill_requests_stay_within_budget(backend):
+    papers = make_crawler(backend).search_papers("q", max_results=50, fill_details=True,
+                                                 request_budget=30)
+    assert backend.requests + 2 * backend.fills <= 30
+    assert papers
+
+
+def test_replay_matches_recorded_search(tmp_path):
+    expected = make_crawler(SyntheticBackend()).search_papers("q", max_results=120,
+                                                              fill_details=True)
+    replay = record(str(tmp_path / 'fixtures'), max_results=120, fill_details=True)
+    papers = make_crawler(replay).search_papers("q", max_results=120, fill_details=True)
+    assert [paper.to_dict() for paper in papers] == [paper.to_dict() for paper in expected]
+    assert all(paper.publisher for paper in papers)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""代理池：连续失败的代理被停用、通道被关闭（httpx 请求由 MockTransport 应答，不访问网络）"""
+
+import httpx
+import pytest
+
+import proxy_pool
+from conftest import SyntheticBackend, make_crawler
+from proxy_pool import ProxyPool
+from transport import current_lane
+
+
+CHECK_URL = "http://check.test/ip"
+
+GOOD = "http://10.0.0.1:3128"
+BAD = "http://10.0.0.2:3128"
+DEAD = "http://10.0.0.3:3128"
+
+
+class FakeProxies:
+    """按代理地址应答：dead 中的代理连接失败，broken 中的代理通过检测但抓取页面时返回 500"""
+
+    def __init__(self):
+        self.dead = set()
+        self.broken = set()
+        self.requests = []
+
+    def handler(self, proxy):
+        def handle(request):
+            self.requests.append((proxy, str(request.url)))
+            if proxy in self.dead:
+                raise httpx.ConnectError("connection refused", request=request)
+            if request.url.host == 'check.test' or proxy not in self.broken:
+                return httpx.Response(200, text="ok")
+            return httpx.Response(500, text="proxy error")
+        return handle
+
+
+@pytest.fixture
+def proxies(monkeypatch):
+    """把 proxy_pool 中创建的 httpx.Client 换成按代理应答的 MockTransport"""
+    fake = FakeProxies()
+    real_client = httpx.Client
+
+    def client(proxy=None, **kwargs):
+        return real_client(transport=httpx.MockTransport(fake.handler(proxy)), **kwargs)
+
+    monkeypatch.setattr(proxy_pool.httpx, 'Client', client)
+    return fake
+
+
+class LaneBackend(SyntheticBackend):
+    """每次搜索先通过当前代理通道请求一次页面，代理出错时抛出异常"""
+
+    def search(self, query, start_index=0, year_low=None, year_high=None):
+        lane = current_lane()
+        if lane is not None:
+            lane.get_page(f"https://scholar.test/scholar?q={query}&start={start_index}")
+        return super().search(query, start_index, year_low, year_high)
+
+
+def test_failures_evict_proxy():
+    pool = ProxyPool(check_url=CHECK_URL, max_failures=2)
+    proxy = pool.add(GOOD)
+    pool.record_success(GOOD, 0.1)
+    assert pool.healthy() == [proxy]
+
+    pool.record_failure(GOOD)
+    assert pool.is_healthy(proxy)
+    pool.record_failure(GOOD)
+    assert not pool.is_healthy(proxy)
+    assert pool.healthy() == []
+
+
+def test_failing_lane_is_evicted_and_closed(proxies):
+    pool = ProxyPool(check_url=CHECK_URL, max_failures=2)
+    pool.add(GOOD)
+    pool.add(BAD)
+    crawler = make_crawler(LaneBackend(), use_proxy=True, proxy_pool=pool)
+    assert {lane.proxy.url for lane in crawler.lanes} == {GOOD, BAD}
+    bad_lane = next(lane for lane in crawler.lanes if lane.proxy.url == BAD)
+
+    proxies.broken.add(BAD)
+    papers = crawler.search_papers("q", max_results=50)
+
+    # 出错的页换通道重试，结果不受影响
+    assert len(papers) == 50
+    assert [lane.proxy.url for lane in crawler.lanes] == [GOOD]
+    assert not pool.is_healthy(pool.get(BAD))
+    assert bad_lane.closed
+    assert not crawler.lanes[0].closed
+
+    good_lane = crawler.lanes[0]
+    crawler.close()
+    assert good_lane.closed
+    assert crawler.lanes == []
+
+
+def test_preflight_drops_dead_proxies(proxies):
+    pool = ProxyPool(check_url=CHECK_URL)
+    for url in (GOOD, BAD, DEAD):
+        pool.add(url)
+    proxies.dead.add(DEAD)
+
+    # 等全部检测完成，结果不依赖线程调度
+    ready = pool.preflight(min_ready=3, deadline=5.0)
+
+    assert ready == 2
+    assert {proxy.url for proxy in pool.healthy()} == {GOOD, BAD}
+    assert pool.get(DEAD).consecutive_failures == 1
+    assert not pool.is_healthy(pool.get(DEAD))
+    assert {proxy for proxy, url in proxies.requests} == {GOOD, BAD, DEAD}
+
+    # 已检测过的代理不再重复检测；抓取通道只为通过的代理创建
+    requests = len(proxies.requests)
+    crawler = make_crawler(LaneBackend(), use_proxy=True, proxy_pool=pool)
+    assert len(proxies.requests) == requests
+    assert {lane.proxy.url for lane in crawler.lanes} == {GOOD, BAD}
+    crawler.close()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import query_planner
+from config import AdvancedSearchConfig
+from query_planner import canonical_hash, plan_query
+
+
+def make_config(**fields):
+    config = AdvancedSearchConfig()
+    for name, value in fields.items():
+        setattr(config, name, value)
+    return config
+
+
+def test_canonical_hash_ignores_order_case_and_whitespace():
+    a = make_config(venues=["CVPR", "ICCV"], exclude_keywords=["survey"], sort_by="year")
+    b = make_config(venues=[" iccv", "cvpr", "CVPR"], exclude_keywords=["Survey"])
+    assert canonical_hash("Deep  Learning", a) == canonical_hash("deep learning", b)
+    assert canonical_hash("deep learning") == canonical_hash("deep learning", AdvancedSearchConfig())
+
+
+def test_canonical_hash_distinguishes_results():
+    base = canonical_hash("deep learning", make_config(year_start=2020))
+    assert canonical_hash("deep learning", make_config(year_start=2021)) != base
+    assert canonical_hash("deep learning", make_config(year_start=2020), 100) != base
+    # 只有一个额外关键字时 AND / OR 等价
+    assert canonical_hash("q", make_config(additional_keywords=["x"], keyword_mode="OR")) == \
+        canonical_hash("q", make_config(additional_keywords=["x"], keyword_mode="AND"))
+
+
+def test_plan_pushes_years_and_authors_to_server():
+    plan = plan_query("deep learning", make_config(year_start=2020, year_end=2022,
+                                                   authors=["Yann LeCun"], citations_min=10))
+    assert (plan.year_low, plan.year_high) == (2020, 2022)
+    assert plan.queries == ['deep learning author:"yann lecun"']
+    assert set(plan.local_skip) >= {'year', 'authors'}
+    assert 'citations' not in plan.local_skip
+
+
+def test_plan_ignores_inverted_year_range():
+    plan = plan_query("q", make_config(year_start=2022, year_end=2020))
+    assert plan.year_low is None and plan.year_high is None
+    assert 'year' not in plan.local_skip
+
+
+def test_page_estimate_uses_crawler_page_size(monkeypatch):
+    assert query_planner._pages_needed(100, 0.5) == 20
+    monkeypatch.setattr(query_planner, 'PAGE_SIZE', 20)
+    assert query_planner._pages_needed(100, 0.5) == 10
+    assert query_planner._pages_needed(1, 0.01) == 5
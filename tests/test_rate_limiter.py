@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from rate_limiter import RateLimiterRegistry, TokenBucket
+
+
+def test_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=20, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.04
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.04
+
+
+def test_registry_buckets_per_egress():
+    registry = RateLimiterRegistry(requests=6, window=60, burst=2)
+    assert registry.rate == pytest.approx(0.1)
+    assert registry.get('a') is registry.get('a')
+    assert registry.get('a') is not registry.get('b')
+    assert sorted(registry.keys()) == ['a', 'b']
+
+
+def test_registry_from_config():
+    registry = RateLimiterRegistry.from_config(
+        SimpleNamespace(REQUEST_DELAY=2, RATE_LIMIT_WINDOW=60, RATE_LIMIT_REQUESTS=None,
+                        RATE_LIMIT_BURST=1))
+    assert registry.rate == pytest.approx(0.5)
+    assert registry.burst == 1
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+import config
+import raw_store
+from cassette import Cassette, activate as activate_cassette
+from rate_limiter import RateLimiterRegistry
+from scholar_crawler import ScholarCrawler
+
+
+def test_live_crawler_stores_raw_pages():
+    ScholarCrawler(rate_limiter=RateLimiterRegistry.unlimited(), use_cache=False)
+    assert raw_store.get_active() is not None
+    assert raw_store.get_active().directory == config.RAW_STORE_DIR
+
+
+def test_replay_does_not_store_raw_pages(tmp_path):
+    # 回归：--replay 时也曾启用原始页面存储并创建 raw_pages/
+    os.makedirs(tmp_path / 'cassette')
+    activate_cassette(Cassette(str(tmp_path / 'cassette'), mode='replay'))
+    ScholarCrawler(rate_limiter=RateLimiterRegistry.unlimited(), use_cache=False)
+    assert raw_store.get_active() is None
+    assert not os.path.exists(config.RAW_STORE_DIR)
+
+
+@pytest.mark.parametrize("codec", ["gzip", "lzma"])
+def test_store_deduplicates_content(tmp_path, codec):
+    store = raw_store.RawPageStore(str(tmp_path / 'raw'), codec=codec)
+    digest = store.put("https://example.org/a", "<html>同一页面</html>")
+    assert store.put("https://example.org/b", "<html>同一页面</html>") == digest
+    assert (store.stored, store.deduplicated) == (1, 1)
+    assert store.play("https://example.org/b") == "<html>同一页面</html>"
+    with pytest.raises(KeyError):
+        store.play("https://example.org/c")
+    
+    reopened = raw_store.RawPageStore(str(tmp_path / 'raw'))
+    assert reopened.stats()['urls'] == 2 and reopened.stats()['objects'] == 1
+
+
+def test_compact_removes_unreferenced_pages(tmp_path):
+    store = raw_store.RawPageStore(str(tmp_path / 'raw'))
+    store.put("https://example.org/a", "v1")
+    store.put("https://example.org/a", "v2")   # 同一 URL 再次抓取，v1 不再被引用
+    assert store.compact() == (1, 1)
+    reopened = raw_store.RawPageStore(str(tmp_path / 'raw'))
+    assert reopened.play("https://example.org/a") == "v2"
+    assert reopened.stats()['objects'] == 1
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+import spill
+from conftest import make_crawler
+from paper import Paper
+from paper_table import PaperTable
+from spill import PaperSpool
+
+
+def make_papers(n=2000):
+    # 引用数和年份大量重复，检验排序的稳定性；部分文献缺少年份
+    return [Paper(title=f"Paper {i % 97}", authors=[f"Author {i % 13}"],
+                  year=None if i % 11 == 0 else 2000 + i % 20, venue="CVPR",
+                  citations=(i * 37) % 50) for i in range(n)]
+
+
+@pytest.mark.parametrize("sort_by", ["citations", "year", "title"])
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+def test_spool_sort_matches_list(monkeypatch, sort_by, sort_order):
+    monkeypatch.setattr(spill, 'MERGE_FAN_IN', 3)   # 同时检验有序段的多轮合并
+    papers = make_papers()
+    with PaperSpool(0.02) as spool:
+        spool.extend(papers)
+        assert spool.spilled
+        result = spool.sort(sort_by, sort_order)
+        expected = PaperTable(papers).sort(sort_by, sort_order)
+        assert [paper.to_dict() for paper in result] == [paper.to_dict() for paper in expected]
+        assert len(result) == len(papers)
+        result.close()
+
+
+def test_spool_behaves_like_list():
+    papers = make_papers(500)
+    with PaperSpool(0.01) as spool:
+        spool.extend(papers)
+        assert spool.spilled
+        assert [paper.to_dict() for paper in spool] == [paper.to_dict() for paper in papers]
+        total = sum(paper.citations for paper in papers)
+        assert spool.citation_stats() == (total, total / 500,
+                                          max(p.citations for p in papers),
+                                          min(p.citations for p in papers))
+        kept = spool.filter(lambda paper: paper.citations >= 40)
+        assert len(kept) == sum(1 for paper in papers if paper.citations >= 40)
+        directory = spool._tmpdir
+    assert not os.path.exists(directory)
+
+
+def test_search_with_memory_limit(backend):
+    crawler = make_crawler(backend)
+    expected = crawler.sort_papers(crawler.search_papers("q", max_results=300), "year", "asc")
+    spooled = crawler.search_papers("q", max_results=300, max_memory=0.02)
+    assert isinstance(spooled, PaperSpool) and spooled.spilled
+    result = crawler.sort_papers(spooled, "year", "asc")
+    assert [paper.to_dict() for paper in result] == [paper.to_dict() for paper in expected]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from symbols import NO_SYMBOL, SymbolTable
+
+
+def test_symbol_table():
+    symbols = SymbolTable(["CVPR"])
+    assert symbols.encode("CVPR") == 0
+    assert symbols.encode("ICML") == 1
+    assert symbols.encode(None) == NO_SYMBOL
+    assert symbols.decode(1) == "ICML" and symbols.decode(NO_SYMBOL) is None
+    assert symbols.intern("".join(["IC", "ML"])) is symbols.values[1]
+    assert symbols.matching(["cv"]) == {0}
+    symbols.load(2, ["NeurIPS"])
+    assert symbols.decode(2) == "NeurIPS"
+    with pytest.raises(ValueError):
+        symbols.load(5, ["x"])
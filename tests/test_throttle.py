@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from types import SimpleNamespace
+
+import pytest
+
+from rate_limiter import TokenBucket
+from throttle import AIMDController, BlockedError, is_block_signal
+
+
+def test_aimd_increases_additively_and_decreases_multiplicatively():
+    bucket = TokenBucket(rate=0.5, burst=3)
+    controller = AIMDController(bucket, min_rate=0.1, max_rate=1.0, increase=0.1, decrease=0.5)
+    controller.on_success()
+    assert controller.rate == pytest.approx(0.6)
+    for _ in range(10):
+        controller.on_success()
+    assert controller.rate == pytest.approx(1.0)
+    assert controller.on_block("429") == pytest.approx(0.5)
+    # 被拦截后清空令牌，不会立即突发
+    assert bucket.available <= 0.01
+    for _ in range(10):
+        controller.on_block()
+    assert controller.rate == pytest.approx(0.1)
+    assert controller.stats()['blocks'] == 11
+    assert [entry['event'] for entry in controller.history[:3]] == ['init', 'increase', 'increase']
+
+
+def test_aimd_shared_per_bucket():
+    bucket = TokenBucket(rate=1)
+    assert AIMDController.for_bucket(bucket) is AIMDController.for_bucket(bucket)
+    assert AIMDController.for_bucket(bucket) is not AIMDController.for_bucket(TokenBucket(rate=1))
+
+
+@pytest.mark.parametrize("error, blocked", [
+    (BlockedError("captcha via http://10.0.0.1:3128"), True),
+    (RuntimeError("HTTP 429 via http://10.0.0.1:3128"), True),
+    (RuntimeError("Server returned status code: 429"), True),
+    (RuntimeError("429 Too Many Requests"), True),
+    (RuntimeError("Our systems have detected unusual traffic"), True),
+    # 回归：只要含有 429 这几个数字就曾被当作拦截
+    (RuntimeError("HTTP 500 for https://scholar.google.com/scholar?start=1429"), False),
+    (KeyError("paper_4291"), False),
+    (RuntimeError("connection reset"), False),
+])
+def test_block_signal(error, blocked):
+    assert is_block_signal(error) is blocked
+
+
+def test_block_signal_from_status_code():
+    error = RuntimeError("request failed")
+    error.status_code = 429
+    assert is_block_signal(error)
+
+
+def test_max_rate_follows_request_delay():
+    bucket = TokenBucket(rate=0.5)
+    settings = SimpleNamespace(REQUEST_DELAY=2, AIMD_MAX_RATE=None)
+    assert AIMDController.from_config(bucket, settings).max_rate == pytest.approx(0.5)
+    settings.REQUEST_DELAY = 0.5
+    assert AIMDController.from_config(bucket, settings).max_rate == pytest.approx(2.0)
+    # 显式配置的上限优先
+    settings.AIMD_MAX_RATE = 1.0
+    assert AIMDController.from_config(bucket, settings).max_rate == pytest.approx(1.0)
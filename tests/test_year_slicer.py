@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import pytest
+
+import config
+from conftest import SyntheticBackend, make_crawler
+from fetch_budget import default_limit
+from year_slicer import slice_years
+
+
+def run_slicer(backend, **kwargs):
+    async def fetch_first(year_low, year_high):
+        return backend.search("q", 0, year_low, year_high)
+    return asyncio.run(slice_years(fetch_first, 2000, 2020, **kwargs))
+
+
+def test_slices_stay_under_cap():
+    backend = SyntheticBackend(per_year=150)
+    slices = run_slicer(backend, cap=1000)
+    assert all(item.total_results <= 1000 for item in slices)
+    assert sum(item.total_results for item in slices) == 21 * 150
+    # 切片按年份连续、不重叠
+    assert [s.year_low for s in slices[1:]] == [s.year_high + 1 for s in slices[:-1]]
+
+
+def test_can_split_stops_bisection():
+    backend = SyntheticBackend(per_year=150)
+    slices = run_slicer(backend, cap=1000, can_split=lambda: False)
+    assert len(slices) == 1
+    assert backend.requests == 1
+
+
+def test_auto_slicing_collects_beyond_result_cap(backend):
+    papers = make_crawler(backend).search_papers("q", max_results=2000)
+    assert len(papers) == 2000
+    assert len({paper.title for paper in papers}) == 2000
+    assert backend.requests <= default_limit(2000) + 2
+
+
+@pytest.mark.parametrize('budget', [60, 150])
+def test_slicing_never_returns_fewer_than_unsliced(monkeypatch, budget):
+    sliced_backend = SyntheticBackend()
+    sliced = make_crawler(sliced_backend).search_papers(
+        "q", max_results=2000, request_budget=budget)
+
+    monkeypatch.setattr(config, 'SLICE_RESULT_CAP', 10 ** 9)
+    unsliced = make_crawler(SyntheticBackend()).search_papers(
+        "q", max_results=2000, request_budget=budget)
+    assert len(sliced) >= len(unsliced)
+
+
+class OverlappingBackend(SyntheticBackend):
+    """每年前 5 篇是同一批文献（同一 cites_id），跨切片重复出现"""
+
+    def pub(self, year, i):
+        pub = SyntheticBackend.pub(year, i)
+        if i < 5:
+            pub['cites_id'] = [f"shared-{i}"]
+            pub['bib']['title'] = f"Shared paper {i}"
+        return pub
+
+
+def test_slices_are_deduplicated():
+    backend = OverlappingBackend()
+    papers = make_crawler(backend).search_papers("q", max_results=3000, slice_years=True)
+    titles = [paper.title for paper in papers]
+    assert len(titles) == len(set(titles))
+    assert sum(title.startswith("Shared") for title in titles) == 5
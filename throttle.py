@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+自适应限速（AIMD）
+请求正常时线性提速，遇到验证码 / 429 / MaxTriesExceededException 时按比例降速
+"""
+
+import re
+import time
+import threading
+import weakref
+from collections import deque
+from typing import Dict, List, Optional
+
+from rate_limiter import TokenBucket
+
+try:
+    from scholarly._proxy_generator import MaxTriesExceededException, DOSException
+    _SCHOLARLY_BLOCK_ERRORS = (MaxTriesExceededException, DOSException)
+except ImportError:
+    _SCHOLARLY_BLOCK_ERRORS = ()
+
+
+class BlockedError(Exception):
+    """请求被 Google Scholar 拦截（验证码、429 等）"""
+
+
+# 异常信息中出现这些片段时视为被拦截
+_BLOCK_MARKERS = ('captcha', 'too many requests', 'unusual traffic')
+
+# 429 只有作为 HTTP 状态码出现时才算（URL、编号中恰好含有这几个数字的不算）
+_STATUS_429 = re.compile(r'\b(?:http|status(?:[ _]code)?)\s*[:=]?\s*429\b')
+
+
+def is_block_signal(error: BaseException) -> bool:
+    """
+    判断异常是否为访问限制信号
+
+    Args:
+        error: 抓取时抛出的异常
+
+    Returns:
+        是否应视为被拦截（需要降速重试）
+    """
+    if isinstance(error, BlockedError):
+        return True
+    if _SCHOLARLY_BLOCK_ERRORS and isinstance(error, _SCHOLARLY_BLOCK_ERRORS):
+        return True
+    if getattr(error, 'status_code', None) in (403, 429):
+        return True
+    message = str(error).lower()
+    return (any(marker in message for marker in _BLOCK_MARKERS)
+            or _STATUS_429.search(message) is not None)
+
+
+class AIMDController:
+    """
+    AIMD 速率控制器
+
+    作用于一个令牌桶：每次成功请求速率增加 increase（次/秒），
+    每次被拦截速率乘以 decrease，并清空桶内令牌。速率始终保持在
+    [min_rate, max_rate] 区间内。
+    """
+
+    _by_bucket = weakref.WeakKeyDictionary()
+    _by_bucket_lock = threading.Lock()
+
+    def __init__(self, bucket: TokenBucket, min_rate: float = 1 / 60,
+                 max_rate: float = 1.0, increase: float = 0.02,
+                 decrease: float = 0.5, history_size: int = 500):
+        """
+        初始化控制器
+
+        Args:
+            bucket: 被控制的令牌桶
+            min_rate: 最低速率（次/秒）
+            max_rate: 最高速率（次/秒，至少为令牌桶的初始速率）
+            increase: 每次成功请求增加的速率（次/秒）
+            decrease: 被拦截时的速率乘数（0-1）
+            history_size: 保留的速率调整记录条数
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease 必须在 0 和 1 之间")
+        self.bucket = bucket
+        self.min_rate = min_rate
+        # 不低于令牌桶的初始速率，避免提速逻辑反而把配置的速率压低
+        self.max_rate = max(max_rate, min_rate, bucket.rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.successes = 0
+        self.blocks = 0
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._record('init', bucket.rate)
+
+    @classmethod
+    def from_config(cls, bucket: TokenBucket, config_module=None) -> 'AIMDController':
+        """
+        按 config 模块中的 AIMD_* 配置创建控制器
+
+        AIMD_MAX_RATE 为 None 时按 REQUEST_DELAY 推导（1 / 延迟），提速不超过配置的请求间隔。
+        """
+        if config_module is None:
+            try:
+                import config as config_module
+            except ImportError:
+                config_module = None
+
+        max_rate = getattr(config_module, 'AIMD_MAX_RATE', None)
+        if max_rate is None:
+            delay = getattr(config_module, 'REQUEST_DELAY', 2) or 0
+            # REQUEST_DELAY 为 0 表示不限速，上限取令牌桶的速率
+            max_rate = 1 / delay if delay > 0 else bucket.rate
+        return cls(
+            bucket,
+            min_rate=getattr(config_module, 'AIMD_MIN_RATE', 1 / 60),
+            max_rate=max_rate,
+            increase=getattr(config_module, 'AIMD_INCREASE', 0.02),
+            decrease=getattr(config_module, 'AIMD_DECREASE', 0.5),
+        )
+
+    @classmethod
+    def for_bucket(cls, bucket: TokenBucket) -> 'AIMDController':
+        """
+        获取某个令牌桶的控制器
+
+        共享同一令牌桶（同一出口）的爬取器也共享同一个控制器。
+        """
+        with cls._by_bucket_lock:
+            controller = cls._by_bucket.get(bucket)
+            if controller is None:
+                controller = cls.from_config(bucket)
+                cls._by_bucket[bucket] = controller
+            return controller
+
+    def _record(self, event: str, rate: float, reason: str = ''):
+        self._history.append({
+            'time': time.time(),
+            'event': event,
+            'rate': rate,
+            'reason': reason,
+        })
+
+    @property
+    def rate(self) -> float:
+        """当前速率（次/秒）"""
+        return self.bucket.rate
+
+    @property
+    def history(self) -> List[Dict]:
+        """速率调整记录（按时间顺序）"""
+        with self._lock:
+            return list(self._history)
+
+    def on_success(self):
+        """请求成功：线性提速"""
+        with self._lock:
+            self.successes += 1
+            new_rate = min(self.max_rate, self.bucket.rate + self.increase)
+            if new_rate != self.bucket.rate:
+                self.bucket.set_rate(new_rate)
+                self._record('increase', new_rate)
+
+    def on_block(self, reason: str = '') -> float:
+        """
+        请求被拦截：按比例降速
+
+        Args:
+            reason: 拦截原因（记录在历史中）
+
+        Returns:
+            降速后的速率（次/秒）
+        """
+        with self._lock:
+            self.blocks += 1
+            new_rate = max(self.min_rate, self.bucket.rate * self.decrease)
+            self.bucket.set_rate(new_rate)
+            self.bucket.drain()
+            self._record('decrease', new_rate, reason)
+            return new_rate
+
+    def stats(self) -> Dict:
+        """当前状态摘要"""
+        with self._lock:
+            return {
+                'rate': self.bucket.rate,
+                'requests_per_minute': self.bucket.rate * 60,
+                'successes': self.successes,
+                'blocks': self.blocks,
+                'adjustments': len(self._history),
+            }
+
+
+def describe_rate(rate: Optional[float]) -> str:
+    """把速率格式化为“x 次/分钟”"""
+    if not rate:
+        return "未知"
+    return f"{rate * 60:.1f} 次/分钟"
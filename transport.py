@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+scholarly 请求路由
+把 scholarly 内部的页面请求（Navigator._get_page）转发到当前线程绑定的代理通道，
+并在启用录制/回放（cassette）时记录或回放原始响应，启用原始页面存储（raw_store）时
+压缩保存抓取到的页面
+"""
+
+import threading
+from contextlib import contextmanager
+
+import cassette
+import raw_store
+
+try:
+    from scholarly._navigator import Navigator
+except ImportError:
+    Navigator = None
+
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+
+
+def current_lane():
+    """当前线程绑定的代理通道（未绑定时为 None，走 scholarly 默认连接）"""
+    return getattr(_local, 'lane', None)
+
+
+@contextmanager
+def use_lane(lane):
+    """
+    在当前线程内把 scholarly 的页面请求路由到指定通道
+
+    Args:
+        lane: 代理通道（需提供 get_page(url) 方法），None 表示使用 scholarly 默认连接
+    """
+    install()
+    previous = current_lane()
+    _local.lane = lane
+    try:
+        yield lane
+    finally:
+        _local.lane = previous
+
+
+def install():
+    """
+    替换 scholarly Navigator 单例的 _get_page（只执行一次）
+
+    Navigator 是进程级单例，所有线程共享同一个会话；替换后每个线程可以
+    通过 use_lane 使用各自的代理通道，未绑定通道的线程行为不变。
+    """
+    global _installed
+    if Navigator is None:
+        return
+    with _install_lock:
+        if _installed:
+            return
+        nav = Navigator()
+        original = nav._get_page
+
+        def get_page(pagerequest, premium=False):
+            active = cassette.get_active()
+            if active is not None and active.mode == 'replay':
+                return active.play(pagerequest)
+
+            lane = current_lane()
+            if lane is not None:
+                text = lane.get_page(pagerequest)
+            else:
+                text = original(pagerequest, premium)
+
+            if active is not None and active.mode == 'record':
+                active.record(pagerequest, text)
+            store = raw_store.get_active()
+            if store is not None:
+                store.put(pagerequest, text)
+            return text
+
+        nav._get_page = get_page
+        _installed = True
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+按年份切分查询
+Google Scholar 每个查询最多翻到约 1000 条结果。把查询按年份范围切成多个切片，
+结果过多的切片继续二分，直到每个切片都在上限以内（或只剩一年），
+各切片可以在不同的抓取通道上并发翻页
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+from backends import ResultPage
+
+
+# Google Scholar 单个查询可翻到的结果数上限
+DEFAULT_RESULT_CAP = 1000
+
+# 没有起始年份时，早于该年份的文献合并为一个切片
+DEFAULT_FIRST_YEAR = 1990
+
+
+class YearSlice:
+    """一个年份切片（year_low / year_high 为 None 表示不限）"""
+
+    def __init__(self, year_low: Optional[int], year_high: Optional[int],
+                 first_page: Optional[ResultPage] = None):
+        """
+        Args:
+            year_low: 起始年份
+            year_high: 结束年份
+            first_page: 切分时已经抓取的第一页（翻页时直接使用，不重复请求）
+        """
+        self.year_low = year_low
+        self.year_high = year_high
+        self.first_page = first_page
+
+    @property
+    def total_results(self) -> Optional[int]:
+        return self.first_page.total_results if self.first_page is not None else None
+
+    @property
+    def label(self) -> str:
+        if self.year_low is None and self.year_high is None:
+            return "全部年份"
+        if self.year_low is None:
+            return f"{self.year_high} 年及以前"
+        if self.year_high is None:
+            return f"{self.year_low} 年及以后"
+        if self.year_low == self.year_high:
+            return f"{self.year_low} 年"
+        return f"{self.year_low}-{self.year_high} 年"
+
+    def __repr__(self):
+        return f"YearSlice({self.year_low}, {self.year_high}, total={self.total_results})"
+
+
+async def slice_years(fetch_first: Callable[[Optional[int], Optional[int]], Awaitable[ResultPage]],
+                      year_low: Optional[int] = None, year_high: Optional[int] = None,
+                      cap: int = DEFAULT_RESULT_CAP, first_year: int = DEFAULT_FIRST_YEAR,
+                      last_year: Optional[int] = None,
+                      can_split: Optional[Callable[[], bool]] = None) -> List[YearSlice]:
+    """
+    递归切分年份范围
+
+    先抓取整个范围的第一页，结果总数超过 cap 时把范围对半切开，两半并发继续切分。
+    切分时抓取的第一页保存在切片中，翻页时复用。
+
+    Args:
+        fetch_first: 抓取某个年份范围第一页的协程函数 fetch_first(year_low, year_high)
+        year_low: 起始年份（None 表示不限，切分时以 first_year 为界）
+        year_high: 结束年份（None 表示不限，切分时以 last_year 为界）
+        cap: 单个切片的结果数上限
+        first_year: 不限起始年份时的切分下界
+        last_year: 不限结束年份时的切分上界（默认今年）
+        can_split: 切开一个范围前调用，返回 False 时该范围不再切分（例如请求预算不足）
+
+    Returns:
+        按年份从早到晚排列的切片列表
+    """
+    lo = year_low if year_low is not None else first_year
+    hi = year_high if year_high is not None else (last_year or datetime.now().year)
+
+    async def visit(slice_low, slice_high, lo, hi):
+        page = await fetch_first(slice_low, slice_high)
+        total = page.total_results
+        if total is None or total <= cap or lo >= hi or (can_split and not can_split()):
+            return [YearSlice(slice_low, slice_high, page)]
+        mid = (lo + hi) // 2
+        left, right = await asyncio.gather(
+            visit(slice_low, mid, lo, mid),
+            visit(mid + 1, slice_high, mid + 1, hi))
+        return left + right
+
+    return await visit(year_low, year_high, lo, hi)